@@ -1,47 +1,195 @@
+import time
 import streamlit as st
-from models.mom_state import MeetingMinutesState
-from utils.file_handler import save_uploaded_file, export_to_pdf, export_to_docx
-from modules.transcript_parser import extract_transcript
-from modules.summarizer import summarize_transcript
-from modules.mom_generator import generate_mom, generate_summary_table, extract_speaker_analysis, extract_action_items_only
-from modules.reviser import revise_mom
+from functools import partial
+from models.mom_state import parse_mom
+from utils.file_handler import save_uploaded_file, get_pdf_bytes, get_docx_bytes
+from modules.transcript_compactor import prepare_transcript
+from modules.transcript_parser import iter_cues
+from modules.speaker_analytics import compute_speaker_stats
+from modules.pipeline import STAGE_LABELS
+from modules.job_queue import get_job_queue, ACTIVE_STATES, PARTIAL_STAGE, REVISED_STAGE
+from modules.meeting_index import get_meeting_index, index_meeting, meeting_key
+from modules.model_router import estimate_run, call_tokens
+from modules.reviser import revise_mom, revise_mom_patch
+from modules.llm_errors import LLMError, RateLimitError
+from modules.llm_client import warm_ollama
+from modules.metrics import collect_timings, summarize_timings, start_metrics_server, write_prometheus
+from config import DEFAULT_PIPELINE_MODE, EAGER_STAGES
 
 st.set_page_config(page_title="Teams MoM Generator", layout="wide", page_icon="📋")
 
+# Serves /metrics when METRICS_PORT is set (started once per process)
+start_metrics_server()
+
 st.title("📋 Microsoft Teams MoM Generator")
 st.markdown("*Generate structured Meeting Minutes with Action Items and Discussion Tracking*")
 st.markdown("---")
 
-# Caching functions to prevent reprocessing
+# Transcript extraction is cached for the estimate; the LLM stages run as background jobs
 @st.cache_data
-def process_transcript(file_path, llm_type, api_key):
-    """ Extracts transcript, generates summary & MoM using selected LLM """
-    transcript = extract_transcript(file_path)
+def load_transcript(file_path):
+    """ Parses and compacts the transcript into the text sent to the model """
+    return prepare_transcript(file_path)
 
-    if llm_type in ["openai", "groq"] and not api_key:
-        st.error("⚠️ Please enter a valid API Key.")
-        return "", "", "", "", "", ""
+@st.cache_data
+def load_speaker_stats(file_path):
+    """ Computes talk time, turns and interruptions locally from the transcript cues """
+    try:
+        return compute_speaker_stats(iter_cues(file_path))
+    except Exception:
+        return None
 
-    summary = summarize_transcript(transcript, llm_type=llm_type, api_key=api_key)
-    mom = generate_mom(transcript, llm_type=llm_type, api_key=api_key)
-    summary_table = generate_summary_table(transcript, llm_type=llm_type, api_key=api_key)
-    speaker_analysis = extract_speaker_analysis(transcript, llm_type=llm_type, api_key=api_key)
-    action_items = extract_action_items_only(transcript, llm_type=llm_type, api_key=api_key)
+def set_mom(state, mom):
+    """ Stores the MoM together with its parsed Meeting, so views, revisions and exports never reparse it """
+    state["mom"] = mom
+    state["meeting"] = parse_mom(mom)
 
-    return transcript, summary, mom, summary_table, speaker_analysis, action_items
+def save_revision(state, mom):
+    """ Applies a revised MoM and saves it to its job and the meeting index, so reloads and searches see it """
+    set_mom(state, mom)
+    job = state.get("job")
+    if job:
+        get_job_queue().store.put_result(job["id"], REVISED_STAGE, mom)
+    if "transcript" in state:
+        index_meeting(meeting_key(state["transcript"]), state["meeting"] or mom, state.get("summary"),
+                      job["file_name"] if job else "", job["llm_type"] if job else "", state.get("speakers"))
 
-@st.cache_data
-def get_pdf(content):
-    return export_to_pdf(content)
+def load_job(job):
+    """ Copies a job's finished stages into session state, keeping failed stages apart as errors """
+    state = {"file_path": job["file_path"], "errors": {},
+             "job": {key: job[key] for key in ("id", "status", "error", "file_name", "llm_type", "reused_from")}}
+    for stage, result in job["results"].items():
+        if isinstance(result, LLMError):
+            # Failed stages are kept apart so their error never renders as content
+            state["errors"][stage] = result
+        elif stage not in (PARTIAL_STAGE, REVISED_STAGE):
+            state[stage] = result
+    # A revision saved before a reload replaces the generated MoM
+    if REVISED_STAGE in job["results"]:
+        state["mom"] = job["results"][REVISED_STAGE]
+    if "mom" in state:
+        set_mom(state, state["mom"])
+    st.session_state.state = state
+    return state
 
-@st.cache_data
-def get_docx(content):
-    return export_to_docx(content)
+@st.fragment(run_every=1.0)
+def show_job_progress(job_id, seen):
+    """ Polls the running job; the whole page reruns when a stage finishes so the other tabs fill in """
+    job = get_job_queue().store.get(job_id)
+    results = job["results"]
+    if job["status"] not in ACTIVE_STATES or len(results) - (PARTIAL_STAGE in results) != seen:
+        st.rerun()
+
+    with st.status(f"🔄 Processing {job['file_name']}... you can leave or reload this page.", expanded=True):
+        tokens = results.get("prompt_tokens")
+        if tokens and tokens[0]:
+            st.write(f"✂️ Transcript compacted from ~{tokens[0]:,} to ~{tokens[1]:,} tokens "
+                     f"({1 - tokens[1] / tokens[0]:.0%} smaller)")
+        for stage, label in STAGE_LABELS.items():
+            if isinstance(results.get(stage), LLMError):
+                st.write(f"❌ {label} failed: {results[stage]}")
+            elif stage in results:
+                st.write(f"✅ {label} ready")
+            elif stage in EAGER_STAGES or job["mode"] == "structured":
+                st.write(f"⏳ {label}")
+        if job["mode"] != "structured":
+            st.caption("💤 The other views are generated the first time you open them.")
+
+    # The minutes stream in here while they are generated
+    if PARTIAL_STAGE in results and "mom" not in results:
+        st.markdown(f"### 📝 Official Meeting Minutes\n\n{results[PARTIAL_STAGE]}▌")
+    if st.button("⏹️ Cancel processing"):
+        get_job_queue().cancel(job_id)
+
+def request_view(stage, api_key):
+    """
+    Generates a view that was left for later the first time its tab or expander is opened, and
+    shows its progress or error. Returns False when no transcript has been processed yet.
+    """
+    state = st.session_state.get("state", {})
+    job = state.get("job")
+    if not job:
+        return False
+    jobs = get_job_queue()
+    error = state["errors"].get(stage)
+    if error is not None and not jobs.pending(job["id"], stage):
+        st.error(f"❌ {STAGE_LABELS[stage]} failed: {error}")
+        if not st.button("🔁 Try again", key=f"retry_{stage}"):
+            return True
+        del state["errors"][stage]
+    if jobs.request_stages(job["id"], [stage], api_key, retry=error is not None) is None:
+        st.info("⏳ This view can be generated once the transcript has been read.")
+    else:
+        wait_for_view(job["id"], stage, api_key)
+    return True
+
+@st.fragment(run_every=1.0)
+def wait_for_view(job_id, stage, api_key):
+    """ Polls a requested view; once stored it is copied into session state and the page reruns """
+    jobs = get_job_queue()
+    if not jobs.pending(job_id, stage):
+        results = jobs.store.get(job_id)["results"]
+        if stage not in results:
+            # The request was lost (e.g. the server restarted), so ask again
+            jobs.request_stages(job_id, [stage], api_key)
+        else:
+            state = st.session_state.state
+            if isinstance(results[stage], LLMError):
+                state["errors"][stage] = results[stage]
+            else:
+                state[stage] = results[stage]
+            state["timing_events"] = results.get("timing_events", [])
+            st.rerun()
+    st.info(f"⏳ Generating the {STAGE_LABELS[stage]}...")
+
+def confirm_run(file_path, llm_type, mode):
+    """ Shows the routed models, estimated cost and time for the transcript, and a button to start """
+    # Only the eager stages are generated up front, the other views when they are opened
+    stages = [stage for stage in EAGER_STAGES
+              if stage != "speaker_analysis" or load_speaker_stats(file_path) is None]
+    estimate = estimate_run(load_transcript(file_path).text, llm_type, mode, stages)
+    if llm_type == "ollama" and estimate["calls"]:
+        # Loads the local model while the estimate is read, with the size every stage will use
+        warm_ollama(estimate["calls"][0]["model"], call_tokens(llm_type, estimate["tokens"]))
+    models = ", ".join(dict.fromkeys(call["model"] for call in estimate["calls"]))
+    path = f"{len(estimate['calls'])} chunks" if estimate["chunked"] else f"{len(estimate['calls'])} calls"
+    cost = f"~${estimate['cost']:.4f}" if estimate["cost"] else "free (local)"
+    st.info(f"🧮 ~{estimate['tokens']:,} transcript tokens → {path} on **{models}** · "
+            f"estimated cost {cost} · estimated time ~{estimate['seconds']:.0f}s")
+    return st.button("🚀 Generate Minutes", type="primary")
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+def download_buttons(content, file_stem, title, pdf_label, docx_label, columns=None, **button_args):
+    """ PDF/DOCX download buttons that only render the file when clicked """
+    col1, col2 = columns or st.columns(2)
+    with col1:
+        st.download_button(
+            pdf_label,
+            data=partial(get_pdf_bytes, content, title),
+            file_name=f"{file_stem}.pdf",
+            mime="application/pdf",
+            on_click="ignore",
+            key=f"{file_stem}_pdf",
+            **button_args
+        )
+    with col2:
+        st.download_button(
+            docx_label,
+            data=partial(get_docx_bytes, content, title),
+            file_name=f"{file_stem}.docx",
+            mime=DOCX_MIME,
+            on_click="ignore",
+            key=f"{file_stem}_docx",
+            **button_args
+        )
 
 # ---------------------- UI Controls ------------------------
 
-# Create tabs for different views
-tab1, tab2, tab3, tab4 = st.tabs(["🔧 Generate MoM", "📊 Summary Dashboard", "👥 Speaker Analysis", "✅ Action Items Tracker"])
+# Create tabs for different views; the selected tab is tracked so views are only generated once opened
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["🔧 Generate MoM", "📊 Summary Dashboard", "👥 Speaker Analysis",
+                                        "✅ Action Items Tracker", "🔎 Search Meetings"],
+                                       key="view", on_change="rerun")
 
 with tab1:
     st.header("🔧 Meeting Minutes Generator")
@@ -74,6 +222,13 @@ with tab1:
         st.info("🏠 Using local Ollama model - no API key required")
         st.warning("⚠️ **If you get memory errors**, please run: `ollama pull llama3.2:3b` in your terminal first")
 
+    single_pass = st.checkbox(
+        "⚡ Single-pass extraction",
+        value=DEFAULT_PIPELINE_MODE == "structured",
+        help="Send the transcript to the model once and build every view from the same extracted items"
+    )
+    pipeline_mode = "structured" if single_pass else "multi"
+
     # Upload Transcript
     st.subheader("📂 Upload Meeting Transcript")
     uploaded_file = st.file_uploader(
@@ -84,238 +239,277 @@ with tab1:
 
     # -------------------- Processing Flow ----------------------
 
+    jobs = get_job_queue()
+
     if uploaded_file:
-        with st.spinner("🔄 Processing transcript... please wait."):
-            file_path = save_uploaded_file(uploaded_file)
-            
-            # Initialize session state
-            if 'state' not in st.session_state:
-                st.session_state.state = {"file_path": file_path}
-
-            try:
-                (st.session_state.state["transcript"], 
-                 st.session_state.state["summary"], 
-                 st.session_state.state["mom"],
-                 st.session_state.state["summary_table"],
-                 st.session_state.state["speaker_analysis"],
-                 st.session_state.state["action_items"]) = process_transcript(file_path, llm_type, api_key)
-                
-                st.success("✅ Transcript processed successfully!")
-                
-            except Exception as e:
-                st.error(f"❌ Error during processing: {e}")
-                if "system memory" in str(e).lower():
-                    st.error("💾 **Memory Issue**: Your system doesn't have enough RAM for the selected model.")
-                    st.info("🔧 **Solutions**:")
-                    st.info("1. Use Groq Cloud instead (recommended)")
-                    st.info("2. Or run: `ollama pull llama3.2:3b` for a smaller model")
-                    st.info("3. Or run: `ollama pull phi3:mini` for an even smaller model")
-
-        # Display results in organized sections
-        if 'state' in st.session_state and 'mom' in st.session_state.state and not st.session_state.state['mom'].startswith("Ollama Error"):
-            
-            # Main Meeting Minutes (Manager's requested format)
-            st.subheader("📝 Official Meeting Minutes")
-            st.info("📋 This format matches your manager's requirements")
-            
-            with st.container():
-                st.markdown(st.session_state.state['mom'])
-
-            # Quick Summary
-            with st.expander("📄 **Quick Summary**", expanded=False):
-                if not st.session_state.state['summary'].startswith("Ollama Error"):
-                    st.markdown(st.session_state.state['summary'])
-                else:
-                    st.error("Summary generation failed due to model issues. Please try Groq Cloud.")
-
-            # Feedback + Revise Section
-            st.subheader("💡 Improve Meeting Minutes")
-            
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                feedback = st.text_area(
-                    "Provide feedback for revision:",
-                    placeholder="e.g., 'Add more details about the budget discussion' or 'Assign the API task to John instead of Sarah'"
-                )
-            
-            with col2:
-                st.markdown("**💡 Revision Tips:**")
-                st.markdown("- Be specific about changes")
-                st.markdown("- Mention names for reassignments")
-                st.markdown("- Request additional details")
-                
-            if st.button("🔄 Revise MoM", type="primary"):
-                if feedback:
-                    with st.spinner("🔄 Revising based on your feedback..."):
-                        st.session_state.state["human_feedback"] = feedback
-                        revised_mom = revise_mom(
-                            st.session_state.state["mom"], 
-                            feedback, 
-                            llm_type=llm_type, 
-                            api_key=api_key
-                        )
-                        if not revised_mom.startswith("Ollama Error"):
-                            st.session_state.state["mom"] = revised_mom
-                            st.success("✅ MoM has been revised based on your feedback!")
-                            st.markdown("### 📝 Revised Meeting Minutes")
-                            st.markdown(st.session_state.state['mom'])
-                        else:
-                            st.error("Revision failed due to model issues. Please try Groq Cloud.")
-                else:
-                    st.warning("⚠️ Please provide feedback before revising.")
-
-            # Download Buttons
-            st.subheader("📥 Download Options")
-            col1, col2, col3 = st.columns(3)
+        file_path = save_uploaded_file(uploaded_file)
+        # The path is a hash of the content; the API key is left out so changing it never reprocesses
+        run_key = (file_path, llm_type, pipeline_mode)
+
+        if llm_type in ["openai", "groq"] and not api_key:
+            st.error("⚠️ Please enter a valid API Key.")
+
+        # Only reprocess when the transcript or model changed, once the estimate was confirmed
+        elif st.session_state.get("run_key") != run_key and confirm_run(file_path, llm_type, pipeline_mode):
+            # The job keeps running through reruns; its ID in the URL lets a reloaded page reattach
+            st.query_params["job"] = jobs.submit(file_path, llm_type, api_key, pipeline_mode, uploaded_file.name)
+            st.session_state.run_key = run_key
+
+    # A reloaded page has no session state, so the job is picked up from the URL
+    job_id = st.query_params.get("job")
+    if job_id and st.session_state.get("loaded_job") != job_id:
+        job = jobs.store.get(job_id)
+        if job is None:
+            st.warning("⚠️ This processing job no longer exists. Please upload the transcript again.")
+            del st.query_params["job"]
+        else:
+            load_job(job)
+            if job["status"] in ACTIVE_STATES:
+                show_job_progress(job_id, len(job["results"]) - (PARTIAL_STAGE in job["results"]))
+            else:
+                # Finished jobs are loaded once, so revisions made afterwards are not overwritten
+                st.session_state.loaded_job = job_id
+                write_prometheus()
+
+    job_info = st.session_state.state.get("job", {}) if 'state' in st.session_state else {}
+    if job_info.get("status") == "failed":
+        st.error(f"❌ Error during processing: {job_info['error']}")
+        if "system memory" in (job_info["error"] or "").lower():
+            st.error("💾 **Memory Issue**: Your system doesn't have enough RAM for the selected model.")
+            st.info("🔧 **Solutions**:")
+            st.info("1. Use Groq Cloud instead (recommended)")
+            st.info("2. Or run: `ollama pull llama3.2:3b` for a smaller model")
+            st.info("3. Or run: `ollama pull phi3:mini` for an even smaller model")
+    elif job_info.get("reused_from"):
+        st.success("♻️ This transcript was already processed with the same model, so its results were reused.")
+    elif job_info.get("status") in ("cancelled", "interrupted"):
+        st.warning(f"⚠️ Processing was {job_info['status']} before it finished; showing the views that were ready.")
+
+    # Display results in organized sections
+    errors = st.session_state.state.get("errors", {}) if 'state' in st.session_state else {}
+    if 'state' in st.session_state and 'mom' in st.session_state.state:
+        
+        # Main Meeting Minutes (Manager's requested format)
+        st.subheader("📝 Official Meeting Minutes")
+        st.info("📋 This format matches your manager's requirements")
+        
+        with st.container():
+            st.markdown(st.session_state.state['mom'])
+
+        meeting = st.session_state.state.get("meeting")
+        if meeting:
+            counts = meeting.counts()
+            st.caption(f"📌 {counts['information']} information items · {counts['actions']} action items · "
+                       f"{counts['with_due']} with due dates · {counts['unassigned']} unassigned")
+
+        # Quick Summary
+        summary_view = st.expander("📄 **Quick Summary**", expanded=False, key="summary_view", on_change="rerun")
+        with summary_view:
+            if 'summary' in st.session_state.state:
+                st.markdown(st.session_state.state['summary'])
+            elif not summary_view.open:
+                pass
+            elif not request_view("summary", api_key):
+                # No job to generate it from
+                st.info("📄 Please upload and process a transcript first.")
+            elif "summary" in errors:
+                # request_view has shown the failure and a retry button
+                st.info("💡 If the summary keeps failing, try Groq Cloud.")
+
+        # Feedback + Revise Section
+        st.subheader("💡 Improve Meeting Minutes")
+        
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            feedback = st.text_area(
+                "Provide feedback for revision:",
+                placeholder="e.g., 'Add more details about the budget discussion' or 'Assign the API task to John instead of Sarah'"
+            )
+        
+        with col2:
+            st.markdown("**💡 Revision Tips:**")
+            st.markdown("- Be specific about changes")
+            st.markdown("- Mention names for reassignments")
+            st.markdown("- Request additional details")
             
-            with col1:
-                try:
-                    pdf_path = get_pdf(st.session_state.state["mom"])
-                    with open(pdf_path, "rb") as pdf_file:
-                        st.download_button(
-                            "📄 Download as PDF", 
-                            pdf_file, 
-                            file_name="Meeting_Minutes.pdf", 
-                            mime="application/pdf",
-                            use_container_width=True
-                        )
-                except:
-                    st.error("PDF generation failed")
-
-            with col2:
-                try:
-                    docx_path = get_docx(st.session_state.state["mom"])
-                    with open(docx_path, "rb") as docx_file:
-                        st.download_button(
-                            "📝 Download as DOCX", 
-                            docx_file, 
-                            file_name="Meeting_Minutes.docx", 
-                            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                            use_container_width=True
+        quick_edit = st.checkbox(
+            "✏️ Quick edit",
+            value=True,
+            help="Only change the rows your feedback mentions instead of regenerating the whole MoM"
+        )
+
+        if st.button("🔄 Revise MoM", type="primary"):
+            if feedback:
+                with st.spinner("🔄 Revising based on your feedback..."):
+                    st.session_state.state["human_feedback"] = feedback
+                    previous_mom = st.session_state.state["mom"]
+                    edits = None
+                    revised_mom = None
+                    with collect_timings() as timing_events:
+                        try:
+                            if quick_edit:
+                                try:
+                                    revised_mom, edits = revise_mom_patch(meeting or previous_mom, feedback, llm_type=llm_type, api_key=api_key)
+                                except ValueError:
+                                    st.info("ℹ️ Could not apply a quick edit, regenerating the full MoM instead.")
+                            if revised_mom is None:
+                                revised_mom = revise_mom(
+                                    previous_mom,
+                                    feedback,
+                                    llm_type=llm_type,
+                                    api_key=api_key
+                                )
+                        except LLMError as e:
+                            st.error(f"Revision failed: {e}")
+                    st.session_state.state.setdefault("timing_events", []).extend(timing_events)
+                    if revised_mom is not None:
+                        st.session_state.state.setdefault("mom_history", []).append(
+                            {"mom": previous_mom, "feedback": feedback, "edits": edits}
                         )
-                except:
-                    st.error("DOCX generation failed")
-            
-            with col3:
-                # Copy to clipboard functionality
-                st.markdown("📋 **Copy to Clipboard**")
-                st.code(st.session_state.state["mom"], language="markdown")
+                        save_revision(st.session_state.state, revised_mom)
+                        st.success("✅ MoM has been revised based on your feedback!")
+                        st.markdown("### 📝 Revised Meeting Minutes")
+                        st.markdown(st.session_state.state['mom'])
+            else:
+                st.warning("⚠️ Please provide feedback before revising.")
 
-        elif 'state' in st.session_state and 'mom' in st.session_state.state and st.session_state.state['mom'].startswith("Ollama Error"):
-            st.error("❌ Model processing failed. Please try one of these solutions:")
-            st.info("1. **Switch to Groq Cloud** (recommended - fastest and most reliable)")
-            st.info("2. **Install smaller Ollama model**: Run `ollama pull llama3.2:3b`")
-            st.info("3. **Or try even smaller**: Run `ollama pull phi3:mini`")
+        history = st.session_state.state.get("mom_history", [])
+        if history:
+            with st.expander(f"🕘 **Revision History** ({len(history)} revisions)", expanded=False):
+                for number, version in enumerate(history, start=1):
+                    change = f"{len(version['edits'])} edits" if version["edits"] else "full rewrite"
+                    st.markdown(f"**{number}.** \"{version['feedback']}\" ({change})")
+                if st.button("↩️ Undo last revision"):
+                    save_revision(st.session_state.state, history.pop()["mom"])
+                    st.rerun()
+
+        # Download Buttons
+        st.subheader("📥 Download Options")
+        col1, col2, col3 = st.columns(3)
+        download_buttons(
+            st.session_state.state.get("meeting") or st.session_state.state["mom"], "Meeting_Minutes", "Meeting Minutes",
+            "📄 Download as PDF", "📝 Download as DOCX",
+            columns=(col1, col2), width="stretch"
+        )
+
+        with col3:
+            # Copy to clipboard functionality
+            st.markdown("📋 **Copy to Clipboard**")
+            st.code(st.session_state.state["mom"], language="markdown")
+
+    elif "mom" in errors:
+        st.error(f"❌ Model processing failed: {errors['mom']}")
+        if isinstance(errors["mom"], RateLimitError):
+            st.info("⏳ The provider's rate limit was reached. Wait a minute and upload again, or switch model.")
+        st.error("Please try one of these solutions:")
+        st.info("1. **Switch to Groq Cloud** (recommended - fastest and most reliable)")
+        st.info("2. **Install smaller Ollama model**: Run `ollama pull llama3.2:3b`")
+        st.info("3. **Or try even smaller**: Run `ollama pull phi3:mini`")
+
+    # Per-meeting timings: where the time went for parsing, each prompt and revisions
+    timing_events = st.session_state.state.get("timing_events") if 'state' in st.session_state else None
+    if timing_events and st.checkbox("⏱️ Show processing timings"):
+        rows = summarize_timings(timing_events)
+        st.dataframe(
+            [{
+                "Step": row["step"],
+                "Calls": row["count"],
+                "Total (s)": round(row["seconds"], 2),
+                "Slowest (s)": round(row["max_seconds"], 2),
+                "Queued (s)": round(row["queue_seconds"], 2),
+                "Prompt tokens": row["prompt_tokens"],
+                "Completion tokens": row["completion_tokens"],
+            } for row in rows],
+            width="stretch",
+            hide_index=True
+        )
 
 with tab2:
     st.header("📊 Meeting Summary Dashboard")
     
-    if 'state' in st.session_state and 'summary_table' in st.session_state.state and not st.session_state.state['summary_table'].startswith("Ollama Error"):
+    if 'state' in st.session_state and 'summary_table' in st.session_state.state:
         st.markdown(st.session_state.state['summary_table'])
         
         # Download summary table
-        col1, col2 = st.columns(2)
-        with col1:
-            try:
-                pdf_path = get_pdf(st.session_state.state["summary_table"])
-                with open(pdf_path, "rb") as pdf_file:
-                    st.download_button(
-                        "📥 Download Dashboard as PDF", 
-                        pdf_file, 
-                        file_name="Meeting_Summary_Dashboard.pdf", 
-                        mime="application/pdf"
-                    )
-            except:
-                st.error("PDF generation failed")
-        
-        with col2:
-            try:
-                docx_path = get_docx(st.session_state.state["summary_table"])
-                with open(docx_path, "rb") as docx_file:
-                    st.download_button(
-                        "📥 Download Dashboard as DOCX", 
-                        docx_file, 
-                        file_name="Meeting_Summary_Dashboard.docx", 
-                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                    )
-            except:
-                st.error("DOCX generation failed")
-    else:
+        download_buttons(
+            st.session_state.state["summary_table"], "Meeting_Summary_Dashboard", "Meeting Summary Dashboard",
+            "📥 Download Dashboard as PDF", "📥 Download Dashboard as DOCX"
+        )
+    elif not (tab2.open and request_view("summary_table", api_key)):
         st.info("📋 Please upload and process a transcript in the 'Generate MoM' tab first.")
 
 with tab3:
     st.header("👥 Speaker Analysis & Participation")
     
-    if 'state' in st.session_state and 'speaker_analysis' in st.session_state.state and not st.session_state.state['speaker_analysis'].startswith("Ollama Error"):
+    if 'state' in st.session_state and 'speaker_analysis' in st.session_state.state:
         st.markdown(st.session_state.state['speaker_analysis'])
         
         # Download speaker analysis
-        col1, col2 = st.columns(2)
-        with col1:
-            try:
-                pdf_path = get_pdf(st.session_state.state["speaker_analysis"])
-                with open(pdf_path, "rb") as pdf_file:
-                    st.download_button(
-                        "📥 Download Analysis as PDF", 
-                        pdf_file, 
-                        file_name="Speaker_Analysis.pdf", 
-                        mime="application/pdf"
-                    )
-            except:
-                st.error("PDF generation failed")
-        
-        with col2:
-            try:
-                docx_path = get_docx(st.session_state.state["speaker_analysis"])
-                with open(docx_path, "rb") as docx_file:
-                    st.download_button(
-                        "📥 Download Analysis as DOCX", 
-                        docx_file, 
-                        file_name="Speaker_Analysis.docx", 
-                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                    )
-            except:
-                st.error("DOCX generation failed")
-    else:
+        download_buttons(
+            st.session_state.state["speaker_analysis"], "Speaker_Analysis", "Speaker Analysis",
+            "📥 Download Analysis as PDF", "📥 Download Analysis as DOCX"
+        )
+    elif not (tab3.open and request_view("speaker_analysis", api_key)):
         st.info("👥 Please upload and process a transcript in the 'Generate MoM' tab first.")
 
 with tab4:
     st.header("✅ Action Items Tracker")
     
-    if 'state' in st.session_state and 'action_items' in st.session_state.state and not st.session_state.state['action_items'].startswith("Ollama Error"):
+    if 'state' in st.session_state and 'action_items' in st.session_state.state:
         st.info("🎯 Focused view of all action items from the meeting")
         st.markdown(st.session_state.state['action_items'])
         
         # Download action items
-        col1, col2 = st.columns(2)
-        with col1:
-            try:
-                pdf_path = get_pdf(st.session_state.state["action_items"])
-                with open(pdf_path, "rb") as pdf_file:
-                    st.download_button(
-                        "📥 Download Action Items as PDF", 
-                        pdf_file, 
-                        file_name="Action_Items_Tracker.pdf", 
-                        mime="application/pdf"
-                    )
-            except:
-                st.error("PDF generation failed")
-        
-        with col2:
-            try:
-                docx_path = get_docx(st.session_state.state["action_items"])
-                with open(docx_path, "rb") as docx_file:
-                    st.download_button(
-                        "📥 Download Action Items as DOCX", 
-                        docx_file, 
-                        file_name="Action_Items_Tracker.docx", 
-                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                    )
-            except:
-                st.error("DOCX generation failed")
-    else:
+        download_buttons(
+            st.session_state.state["action_items"], "Action_Items_Tracker", "Action Items Tracker",
+            "📥 Download Action Items as PDF", "📥 Download Action Items as DOCX"
+        )
+    elif not (tab4.open and request_view("action_items", api_key)):
         st.info("✅ Please upload and process a transcript in the 'Generate MoM' tab first.")
 
+with tab5:
+    st.header("🔎 Search Across Meetings")
+    st.info("🗂️ Every processed meeting is indexed locally: search its items by owner, status, due date or words")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        search_text = st.text_input("Words in the item", placeholder="e.g. budget review")
+        search_assignee = st.text_input("Assigned to", placeholder="e.g. Priya")
+    with col2:
+        search_status = st.selectbox("Status", ["Any", "Open", "In Progress", "Done"])
+        search_type = st.selectbox("Type", ["Any", "Action", "Information"])
+    with col3:
+        search_due = st.date_input("Due on or before", value=None)
+        search_last = st.number_input("Only the last N meetings (0 = all)", min_value=0, value=0, step=10)
+
+    # The index is only queried while this tab is open
+    if tab5.open:
+        started = time.perf_counter()
+        found = get_meeting_index().search_items(
+            text=search_text, assignee=search_assignee,
+            status=None if search_status == "Any" else search_status,
+            item_type=None if search_type == "Any" else search_type,
+            due_before=search_due.isoformat() if search_due else None,
+            last_meetings=search_last or None
+        )
+        index_stats = get_meeting_index().stats()
+        st.caption(f"{len(found)} items from {index_stats['meetings']} indexed meetings "
+                   f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+        if found:
+            st.dataframe(
+                [{
+                    "Meeting": row["meeting"],
+                    "Date": row["meeting_date"],
+                    "Type": row["type"],
+                    "Description": row["description"],
+                    "Assignees": row["assignees"],
+                    "Due": row["due"],
+                    "Status": row["status"],
+                } for row in found],
+                width="stretch",
+                hide_index=True
+            )
+
 # Footer
 st.markdown("---")
 st.markdown("*Built for automated Meeting Minutes generation from Microsoft Teams transcripts*")
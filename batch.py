@@ -0,0 +1,244 @@
+"""
+Headless batch processing of Teams transcripts.
+
+    python batch.py transcripts/ "archive/2025-*/*.vtt" --out minutes/ --llm groq --workers 4
+
+Every transcript gets its own folder under --out with the MoM, summary, dashboard,
+speaker analysis and action tracker as markdown plus the MoM as PDF/DOCX. A
+manifest.json records status and timings per file; files already marked done (and
+unchanged since) are skipped, so an interrupted run can simply be started again.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from config import ALLOWED_EXTENSIONS, DEFAULT_PIPELINE_MODE, PIPELINE_MODES, LLM_CONCURRENCY, GROQ_API_KEY
+
+MANIFEST_NAME = "manifest.json"
+
+# Artifact file names per pipeline stage
+ARTIFACTS = {
+    "mom": "Meeting_Minutes.md",
+    "summary": "Summary.md",
+    "summary_table": "Meeting_Summary_Dashboard.md",
+    "speaker_analysis": "Speaker_Analysis.md",
+    "action_items": "Action_Items_Tracker.md",
+}
+
+def find_transcripts(inputs):
+    """ Expands files, directories (recursively) and glob patterns into transcript paths """
+    found = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "**", "*"), recursive=True)
+        else:
+            matches = glob.glob(pattern, recursive=True) or [pattern]
+        for path in sorted(matches):
+            if os.path.isfile(path) and path.rsplit(".", 1)[-1].lower() in ALLOWED_EXTENSIONS:
+                found.append(os.path.abspath(path))
+    return list(dict.fromkeys(found))
+
+def output_name(file_path):
+    """ Stable per-transcript folder name: readable stem plus a short hash of the full path """
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    digest = hashlib.sha1(file_path.encode("utf-8")).hexdigest()[:8]
+    return f"{stem}-{digest}"
+
+def fingerprint(file_path):
+    stat = os.stat(file_path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+def _init_worker(concurrency, workers=1):
+    # Each worker process gets its share of the per-provider request and rate budget. The scheduler
+    # (and so priority) is per process: across processes, batch work is only held back by that split
+    from config import RATE_LIMITS
+    from modules.llm_client import set_provider_concurrency, set_rate_limit, set_default_priority, PRIORITY_BATCH
+    for llm_type, limit in concurrency.items():
+        set_provider_concurrency(llm_type, limit)
+        limits = RATE_LIMITS.get(llm_type, {})
+        set_rate_limit(llm_type, limits.get("rpm"), limits.get("tpm"), share=1 / workers)
+    set_default_priority(PRIORITY_BATCH)
+
+def process_file(file_path, out_dir, llm_type="groq", api_key=None, mode=DEFAULT_PIPELINE_MODE, formats=("pdf", "docx")):
+    """ Runs parse -> pipeline -> export for one transcript and returns its manifest record """
+    from modules.llm_errors import LLMError
+    from modules.meeting_index import index_meeting, meeting_key
+    from modules.pipeline import iter_pipeline
+    from modules.speaker_analytics import compute_speaker_stats
+    from modules.transcript_compactor import prepare_transcript
+    from modules.transcript_parser import iter_cues
+    from utils.file_handler import export_to_pdf, export_to_docx
+
+    started = time.perf_counter()
+    timings = {}
+    record = {"file": file_path, "output": out_dir, "status": "done", "errors": {}, **fingerprint(file_path)}
+
+    try:
+        compact = prepare_transcript(file_path)
+        speaker_stats = compute_speaker_stats(iter_cues(file_path))
+        timings["parse"] = time.perf_counter() - started
+        record["prompt_tokens"] = {"before": compact.tokens_before, "after": compact.tokens_after}
+
+        os.makedirs(out_dir, exist_ok=True)
+        results = {}
+        for stage, result in iter_pipeline(compact.text, llm_type=llm_type, api_key=api_key, mode=mode,
+                                           speaker_stats=speaker_stats):
+            if stage not in ARTIFACTS:
+                continue
+            # Stages run concurrently, so this is the time at which each one finished
+            timings[stage] = time.perf_counter() - started
+            if isinstance(result, LLMError):
+                record["errors"][stage] = f"{type(result).__name__}: {result}"
+                continue
+            results[stage] = result
+            with open(os.path.join(out_dir, ARTIFACTS[stage]), "w", encoding="utf-8") as f:
+                f.write(result)
+
+        if "mom" in results:
+            index_meeting(meeting_key(compact.text), results["mom"], results.get("summary"),
+                          os.path.basename(file_path), llm_type, speaker_stats["speakers"] if speaker_stats else None)
+
+        export_started = time.perf_counter()
+        if "mom" in results:
+            if "pdf" in formats:
+                export_to_pdf(results["mom"], folder=out_dir)
+            if "docx" in formats:
+                export_to_docx(results["mom"], folder=out_dir)
+        timings["export"] = time.perf_counter() - export_started
+
+        if record["errors"]:
+            record["status"] = "failed"
+    except Exception as e:
+        record["status"] = "failed"
+        record["errors"]["pipeline"] = f"{type(e).__name__}: {e}"
+
+    timings["total"] = time.perf_counter() - started
+    record["timings"] = {name: round(seconds, 3) for name, seconds in timings.items()}
+    return record
+
+def estimate_batch(inputs, llm_type="groq", mode=DEFAULT_PIPELINE_MODE, log=print):
+    """ Prints the routed models, estimated cost and time per transcript without calling any model """
+    from modules.model_router import estimate_run
+    from modules.pipeline import PIPELINE_STAGES
+    from modules.transcript_compactor import prepare_transcript
+
+    # Speaker analysis is built locally from the cues, so it costs no call
+    stages = [stage for stage in PIPELINE_STAGES if stage != "speaker_analysis"]
+    total_cost = total_seconds = 0.0
+    for file_path in find_transcripts(inputs):
+        estimate = estimate_run(prepare_transcript(file_path).text, llm_type, mode, stages)
+        models = ", ".join(dict.fromkeys(call["model"] for call in estimate["calls"]))
+        total_cost += estimate["cost"]
+        total_seconds += estimate["seconds"]
+        log(f"{os.path.basename(file_path)}: ~{estimate['tokens']:,} tokens, {len(estimate['calls'])} calls on "
+            f"{models}{' (chunked)' if estimate['chunked'] else ''}, ~${estimate['cost']:.4f}, ~{estimate['seconds']:.0f}s")
+    log(f"Total: ~${total_cost:.4f}, ~{total_seconds / 60:.1f} min with one transcript at a time")
+    return total_cost, total_seconds
+
+def load_manifest(out_root):
+    path = os.path.join(out_root, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return {"files": {}}
+
+def save_manifest(out_root, manifest):
+    # Written to a temp file first so an interrupted run never leaves a corrupt manifest
+    path = os.path.join(out_root, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def run_batch(inputs, out_root, llm_type="groq", api_key=None, mode=DEFAULT_PIPELINE_MODE, workers=2,
+              concurrency=None, formats=("pdf", "docx"), force=False, log=print):
+    """ Processes every transcript matched by inputs on a process pool and returns the manifest """
+    os.makedirs(out_root, exist_ok=True)
+    manifest = load_manifest(out_root)
+    files = find_transcripts(inputs)
+
+    pending = []
+    for file_path in files:
+        previous = manifest["files"].get(file_path)
+        if not force and previous and previous["status"] == "done" and \
+                {k: previous.get(k) for k in ("size", "mtime")} == fingerprint(file_path):
+            continue
+        pending.append(file_path)
+
+    log(f"{len(files)} transcripts found, {len(files) - len(pending)} already done, {len(pending)} to process")
+    if not pending:
+        return manifest
+
+    # The per-provider cap applies to the whole run, so it is split across worker processes
+    total = concurrency or LLM_CONCURRENCY.get(llm_type, 1)
+    per_worker = {llm_type: max(1, total // workers)}
+
+    started = time.perf_counter()
+    completed = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(per_worker, workers)) as pool:
+        futures = {
+            pool.submit(process_file, file_path, os.path.join(out_root, output_name(file_path)),
+                        llm_type, api_key, mode, tuple(formats)): file_path
+            for file_path in pending
+        }
+        for future in as_completed(futures):
+            record = future.result()
+            manifest["files"][futures[future]] = record
+            completed += record["status"] == "done"
+            save_manifest(out_root, manifest)
+            log(f"[{record['status']}] {os.path.basename(record['file'])} in {record['timings']['total']:.1f}s")
+
+    elapsed = time.perf_counter() - started
+    manifest["last_run"] = {
+        "llm_type": llm_type,
+        "mode": mode,
+        "workers": workers,
+        "concurrency": total,
+        "processed": len(pending),
+        "succeeded": completed,
+        "elapsed_seconds": round(elapsed, 3),
+        "meetings_per_minute": round(len(pending) / elapsed * 60, 2) if elapsed else 0.0,
+    }
+    save_manifest(out_root, manifest)
+    log(f"Processed {len(pending)} transcripts ({completed} ok) in {elapsed:.1f}s "
+        f"= {manifest['last_run']['meetings_per_minute']} meetings/min")
+    return manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="Transcript files, folders or glob patterns")
+    parser.add_argument("--out", default="batch_output", help="Output folder (default: batch_output)")
+    parser.add_argument("--llm", choices=["groq", "openai", "ollama"], default="groq")
+    parser.add_argument("--api-key", help="Provider API key (default: $OPENAI_API_KEY / $GROQ_API_KEY)")
+    parser.add_argument("--mode", choices=PIPELINE_MODES, default=DEFAULT_PIPELINE_MODE)
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes")
+    parser.add_argument("--concurrency", type=int, help="Max in-flight requests to the provider across all workers")
+    parser.add_argument("--formats", nargs="*", choices=["pdf", "docx"], default=["pdf", "docx"])
+    parser.add_argument("--force", action="store_true", help="Reprocess files already marked done")
+    parser.add_argument("--estimate", action="store_true", help="Only print the estimated cost and time")
+    args = parser.parse_args(argv)
+
+    if args.estimate:
+        estimate_batch(args.inputs, llm_type=args.llm, mode=args.mode)
+        return 0
+
+    api_key = args.api_key
+    if not api_key and args.llm == "openai":
+        api_key = os.getenv("OPENAI_API_KEY")
+    elif not api_key and args.llm == "groq":
+        api_key = GROQ_API_KEY
+    if args.llm == "openai" and not api_key:
+        parser.error("OpenAI requires --api-key or $OPENAI_API_KEY")
+
+    manifest = run_batch(args.inputs, args.out, llm_type=args.llm, api_key=api_key, mode=args.mode,
+                         workers=max(1, args.workers), concurrency=args.concurrency,
+                         formats=args.formats, force=args.force)
+    failed = [path for path, record in manifest["files"].items() if record["status"] != "done"]
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
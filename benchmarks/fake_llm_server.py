@@ -0,0 +1,288 @@
+"""
+Local stand-in for the OpenAI, Groq and Ollama HTTP APIs, for benchmarks and offline runs.
+
+Answers chat completions (plain and streamed) and Ollama /api/generate with canned meeting
+minutes or JSON built from the speakers in the prompt, after a configurable time to first
+token and at a configurable tokens/sec. A share of requests can be failed with 429 or 500.
+With --prompt-tokens-per-second, Ollama requests also pay for evaluating the prompt, minus the
+prefix shared with the previous prompt for the same model (like Ollama's prompt cache).
+
+    python benchmarks/fake_llm_server.py --port 8765 --latency-ms 300 --tokens-per-second 200
+
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 GROQ_BASE_URL=http://127.0.0.1:8765 \\
+    OLLAMA_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHARS_PER_TOKEN = 4
+
+class FakeLLMSettings:
+    """ Behaviour of the fake server; can be changed while it runs """
+
+    def __init__(self, latency_ms=200.0, tokens_per_second=250.0, completion_tokens=400,
+                 error_rate=0.0, rate_limit_rate=0.0, retry_after=1.0, seed=None, prompt_tokens_per_second=0.0):
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.last_prompts = {}   # model -> previous Ollama prompt, for the simulated prompt cache
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def pick_failure(self):
+        """ Returns None, 429 or 500 for the next request """
+        with self.lock:
+            self.requests += 1
+            roll = self.random.random()
+            if roll < self.rate_limit_rate:
+                self.failures += 1
+                return 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.failures += 1
+                return 500
+            return None
+
+    def evaluate_prompt(self, model, prompt):
+        """ Returns the prompt tokens an Ollama runner would evaluate after reusing its cached prefix """
+        with self.lock:
+            previous = self.last_prompts.get(model, "")
+            self.last_prompts[model] = prompt
+        shared = len(os.path.commonprefix([previous, prompt]))
+        return (len(prompt) - shared) // CHARS_PER_TOKEN
+
+# ---------------------- Canned Replies ------------------------
+
+def _speakers(prompt):
+    legend = re.search(r"SPEAKERS: (.+?) \(use full names", prompt)
+    if legend:
+        return [entry.split(" = ", 1)[-1].strip() for entry in legend.group(1).split(";")]
+    names = re.findall(r"^\s*([A-Z][\w ,.'()-]{1,60}?):", prompt, re.MULTILINE)
+    return list(dict.fromkeys(names))[:8] or ["Alex Morgan", "Sam Lee"]
+
+def _structured_reply(speakers, completion_tokens):
+    items, actions = [], []
+    budget = completion_tokens * CHARS_PER_TOKEN
+    index = 0
+    while len(json.dumps(items + actions)) < budget:
+        name = speakers[index % len(speakers)]
+        items.append({"description": f"Status update {index + 1} on the rollout plan", "shared_by": name})
+        actions.append({"description": f"Follow up on open point {index + 1}", "assignees": [name],
+                        "due": "", "priority": ("High", "Medium", "Low")[index % 3], "notes": ""})
+        index += 1
+    return json.dumps({
+        "title": "Project Sync",
+        "date": "",
+        "time": "",
+        "duration": "",
+        "participants": [{"name": name, "contributions": ["Rollout plan"]} for name in speakers],
+        "information_items": items,
+        "action_items": actions,
+        "topics": [{"topic": "Rollout plan", "discussed_by": speakers[0], "outcome": "Action"}],
+        "summary": ["The team agreed on the rollout plan and owners for the open points."],
+    })
+
+def _markdown_reply(speakers, completion_tokens):
+    lines = [
+        "# Meeting Minutes: Project Sync",
+        "",
+        "**Date**: 2025-01-01",
+        f"**Invitees**: {', '.join(speakers)}",
+        "",
+        "| Type | Description | Assignees | Due | Status |",
+        "|------|-------------|-----------|-----|--------|",
+    ]
+    budget = completion_tokens * CHARS_PER_TOKEN
+    index = 0
+    while sum(len(line) + 1 for line in lines) < budget:
+        name = speakers[index % len(speakers)]
+        kind = "Action" if index % 3 == 2 else "Information"
+        lines.append(f"| {kind} | Discussed point {index + 1} of the rollout plan | {name} | | Open |")
+        index += 1
+    lines += ["", "**How was the meeting?** Check out the feedback!"]
+    return "\n".join(lines)
+
+def build_reply(prompt, completion_tokens):
+    """ A reply shaped like what the prompt asks for: JSON for extraction, markdown otherwise """
+    speakers = _speakers(prompt)
+    if "JSON" in prompt:
+        return _structured_reply(speakers, completion_tokens)
+    return _markdown_reply(speakers, completion_tokens)
+
+def _pieces(text):
+    """ Splits text into roughly token-sized pieces for streaming """
+    return re.findall(r".{1,%d}" % CHARS_PER_TOKEN, text, re.DOTALL)
+
+# ---------------------- HTTP Handler ------------------------
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    settings = FakeLLMSettings()
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_failure(self, status):
+        if status == 429:
+            self._send_json(429, {"error": {"message": "Rate limit reached (fake server)", "type": "rate_limit"}},
+                            {"retry-after": str(self.settings.retry_after)})
+        else:
+            self._send_json(500, {"error": {"message": "Internal error (fake server)", "type": "server_error"}})
+
+    def _start_stream(self, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _generate(self, prompt):
+        """ Yields reply pieces paced at the configured latency and tokens/sec """
+        settings = self.settings
+        time.sleep(settings.latency_ms / 1000)
+        interval = 1 / settings.tokens_per_second if settings.tokens_per_second else 0
+        for piece in _pieces(build_reply(prompt, settings.completion_tokens)):
+            if interval:
+                time.sleep(interval)
+            yield piece
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("", "/health", "/api/tags", "/v1/models", "/openai/v1/models"):
+            self._send_json(200, {"status": "ok", "models": [], "data": []})
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        failure = self.settings.pick_failure()
+        if failure:
+            self._send_failure(failure)
+            return
+
+        if self.path.endswith("/chat/completions"):
+            self._chat_completion(body)
+        elif self.path.endswith("/api/generate"):
+            self._ollama_generate(body)
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def _chat_completion(self, body):
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        model = body.get("model", "fake-model")
+        prompt_tokens = len(prompt) // CHARS_PER_TOKEN
+
+        if not body.get("stream"):
+            text = "".join(self._generate(prompt))
+            self._send_json(200, {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(text) // CHARS_PER_TOKEN,
+                          "total_tokens": prompt_tokens + len(text) // CHARS_PER_TOKEN},
+            })
+            return
+
+        self._start_stream("text/event-stream")
+        for piece in self._generate(prompt):
+            chunk = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._end_stream()
+
+    def _ollama_generate(self, body):
+        model = body.get("model")
+        if "prompt" not in body:
+            # A request without a prompt only loads the model
+            self._send_json(200, {"model": model, "response": "", "done": True, "done_reason": "load"})
+            return
+        evaluated = self.settings.evaluate_prompt(model, body["prompt"])
+        if self.settings.prompt_tokens_per_second:
+            time.sleep(evaluated / self.settings.prompt_tokens_per_second)
+        # langchain's Ollama always reads /api/generate as a stream of JSON lines
+        self._start_stream("application/x-ndjson")
+        for piece in self._generate(body["prompt"]):
+            self._write_chunk((json.dumps({"model": model, "response": piece, "done": False}) + "\n").encode("utf-8"))
+        self._write_chunk((json.dumps({"model": model, "response": "", "done": True,
+                                       "prompt_eval_count": evaluated}) + "\n").encode("utf-8"))
+        self._end_stream()
+
+def start_server(settings=None, host="127.0.0.1", port=0):
+    """ Starts the fake server on a daemon thread and returns (server, base_url) """
+    handler = type("ConfiguredFakeLLMHandler", (FakeLLMHandler,), {"settings": settings or FakeLLMSettings()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def provider_env(base_url):
+    """ Environment variables that point every provider at the fake server """
+    return {
+        "OPENAI_BASE_URL": f"{base_url}/v1",
+        "GROQ_BASE_URL": base_url,
+        "OLLAMA_BASE_URL": base_url,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=250.0, help="0 = send the reply at once")
+    parser.add_argument("--completion-tokens", type=int, default=400, help="Approximate reply length")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failed with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests failed with 429")
+    parser.add_argument("--prompt-tokens-per-second", type=float, default=0.0,
+                        help="Ollama prompt evaluation speed; 0 = free")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    settings = FakeLLMSettings(args.latency_ms, args.tokens_per_second, args.completion_tokens,
+                               args.error_rate, args.rate_limit_rate, seed=args.seed,
+                               prompt_tokens_per_second=args.prompt_tokens_per_second)
+    server, base_url = start_server(settings, args.host, args.port)
+    print(f"Fake LLM server on {base_url}")
+    for name, value in provider_env(base_url).items():
+        print(f"  export {name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Import-time benchmark for the non-UI modules.
+
+Imports the pipeline, parser and exporter modules in a fresh interpreter and fails if
+any heavy provider SDK or exporter library was loaded eagerly, or if the import took
+longer than the budget.
+
+    python benchmarks/import_time.py [--budget-ms 300] [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a worker imports at startup
+ENTRY_MODULES = [
+    "modules.pipeline",
+    "modules.transcript_parser",
+    "modules.reviser",
+    "utils.file_handler",
+]
+
+# Libraries that must only be imported on first use
+LAZY_MODULES = [
+    "openai",
+    "groq",
+    "httpx",
+    "langchain_community",
+    "langchain_core",
+    "fpdf",
+    "docx",
+    "webvtt",
+    "numpy",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {entries!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "eager": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+def measure_once():
+    """ Imports the entry modules in a fresh interpreter and returns its report """
+    code = PROBE.format(entries=ENTRY_MODULES, lazy=LAZY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="Fail if the median import time exceeds this")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    reports = [measure_once() for _ in range(args.runs)]
+    timings = [report["ms"] for report in reports]
+    eager = sorted({name for report in reports for name in report["eager"]})
+    median = statistics.median(timings)
+
+    print(f"import time: median {median:.1f} ms, min {min(timings):.1f} ms, max {max(timings):.1f} ms")
+    failed = False
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"FAIL: median import time above budget of {args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
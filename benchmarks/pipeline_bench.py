@@ -0,0 +1,197 @@
+"""
+End-to-end pipeline benchmark against the local fake LLM server.
+
+Generates synthetic Teams transcripts, starts benchmarks/fake_llm_server.py in-process,
+points the provider clients at it and runs the same steps as the app's background
+jobs (modules/job_queue.py): parse + compact, speaker stats, the LLM stages (MoM streamed)
+and the PDF/DOCX exports. Reports p50/p95 per phase, meetings/min and peak RSS. No API keys
+or real models are needed, and the response cache is disabled.
+
+    python benchmarks/pipeline_bench.py --minutes 10 60 240 --iterations 5
+    python benchmarks/pipeline_bench.py --json results.json
+    python benchmarks/pipeline_bench.py --baseline results.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_llm_server import FakeLLMSettings, start_server, provider_env  # noqa: E402
+from synthetic_transcripts import generate  # noqa: E402
+
+PHASES = ["parse", "first_token", "pipeline", "export", "total"]
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+def peak_rss_mb():
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_meeting(file_path, llm_type, api_key, mode):
+    """ One transcript through parse -> pipeline -> export; returns seconds per phase """
+    from modules.llm_errors import LLMError
+    from modules.pipeline import iter_pipeline, STREAM_EVENT
+    from modules.speaker_analytics import compute_speaker_stats
+    from modules.transcript_compactor import prepare_transcript
+    from modules.transcript_parser import iter_cues
+    from utils.file_handler import render_pdf, render_docx
+
+    timings, errors = {}, []
+    started = time.perf_counter()
+    compact = prepare_transcript(file_path)
+    speaker_stats = compute_speaker_stats(iter_cues(file_path))
+    timings["parse"] = time.perf_counter() - started
+
+    llm_started = time.perf_counter()
+    results = {}
+    for stage, result in iter_pipeline(compact.text, llm_type=llm_type, api_key=api_key, mode=mode,
+                                       stream_stage="mom", speaker_stats=speaker_stats):
+        if stage == STREAM_EVENT:
+            timings.setdefault("first_token", time.perf_counter() - llm_started)
+            continue
+        if isinstance(result, LLMError):
+            errors.append(f"{stage}: {result}")
+        elif isinstance(result, str):
+            results[stage] = result
+    timings["pipeline"] = time.perf_counter() - llm_started
+    # Structured mode and cache hits have no stream, so the MoM arriving is the first output
+    timings.setdefault("first_token", timings["pipeline"])
+
+    export_started = time.perf_counter()
+    if "mom" in results:
+        # The uncached renderers, so every iteration pays for a full export
+        render_pdf(results["mom"])
+        render_docx(results["mom"])
+    timings["export"] = time.perf_counter() - export_started
+    timings["total"] = time.perf_counter() - started
+    return timings, errors, compact.tokens_before, compact.tokens_after
+
+def bench_transcript(file_path, args):
+    runs, errors = [], []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(run_meeting, file_path, args.llm, "fake-key", args.mode)
+                   for _ in range(args.iterations)]
+        for future in futures:
+            timings, run_errors, tokens_before, tokens_after = future.result()
+            runs.append(timings)
+            errors += run_errors
+    elapsed = time.perf_counter() - started
+
+    return {
+        "file": os.path.basename(file_path),
+        "size_kb": round(os.path.getsize(file_path) / 1024, 1),
+        "tokens": {"before": tokens_before, "after": tokens_after},
+        "phases": {
+            phase: {
+                "p50_ms": round(statistics.median(run[phase] for run in runs) * 1000, 1),
+                "p95_ms": round(percentile([run[phase] for run in runs], 0.95) * 1000, 1),
+            }
+            for phase in PHASES
+        },
+        "meetings_per_minute": round(len(runs) / elapsed * 60, 2),
+        "errors": len(errors),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+def print_report(results):
+    header = f"{'transcript':<24}{'tokens':>14}" + "".join(f"{phase + ' p50/p95 ms':>26}" for phase in PHASES) + \
+             f"{'mtg/min':>10}{'errors':>8}{'rss MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        tokens = f"{result['tokens']['before']}->{result['tokens']['after']}"
+        phases = "".join(f"{result['phases'][p]['p50_ms']:>14.1f} /{result['phases'][p]['p95_ms']:>9.1f}"
+                         for p in PHASES)
+        print(f"{result['file']:<24}{tokens:>14}{phases}{result['meetings_per_minute']:>10}"
+              f"{result['errors']:>8}{result['peak_rss_mb']:>9}")
+
+def compare(results, baseline, tolerance):
+    """ Returns the phases whose p50 got slower than the baseline by more than tolerance """
+    previous = {result["file"]: result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get(result["file"])
+        if not before:
+            continue
+        for phase in PHASES:
+            old, new = before["phases"][phase]["p50_ms"], result["phases"][phase]["p50_ms"]
+            # Sub-millisecond phases are noise, not regressions
+            if old >= 1 and new > old * (1 + tolerance):
+                regressions.append(f"{result['file']} {phase}: {old:.1f} -> {new:.1f} ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, nargs="+", default=[10, 60, 240], help="Transcript lengths")
+    parser.add_argument("--formats", nargs="+", choices=["vtt", "docx"], default=["vtt", "docx"])
+    parser.add_argument("--llm", choices=["openai", "groq", "ollama"], default="openai")
+    parser.add_argument("--mode", choices=["multi", "structured"], default="multi")
+    parser.add_argument("--iterations", type=int, default=5, help="Runs per transcript")
+    parser.add_argument("--concurrency", type=int, default=1, help="Meetings processed at the same time")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Fake server time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=250.0, help="Fake server output speed")
+    parser.add_argument("--completion-tokens", type=int, default=400)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failed with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests failed with 429")
+    parser.add_argument("--respect-rate-limits", action="store_true",
+                        help="Keep the configured provider rate limits instead of lifting them")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Results file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p50 slowdown vs the baseline")
+    args = parser.parse_args()
+
+    settings = FakeLLMSettings(args.latency_ms, args.tokens_per_second, args.completion_tokens,
+                               args.error_rate, args.rate_limit_rate, retry_after=0.2, seed=0)
+    server, base_url = start_server(settings)
+    # Must be set before config is imported by the modules under test
+    os.environ.update(provider_env(base_url))
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+
+    from modules.llm_client import set_rate_limit
+    if not args.respect_rate_limits:
+        set_rate_limit(args.llm, None, None)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        transcripts = generate(out_dir, args.minutes, args.formats)
+        results = [bench_transcript(path, args) for _, path in transcripts]
+    server.shutdown()
+
+    print(f"{args.llm} / {args.mode}, {args.iterations} iterations, concurrency {args.concurrency}, "
+          f"fake server {args.latency_ms:.0f} ms + {args.tokens_per_second:.0f} tok/s, "
+          f"{settings.requests} requests ({settings.failures} failed)")
+    print_report(results)
+
+    report = {"settings": vars(args), "results": results}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("FAIL: slower than baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("OK: no regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
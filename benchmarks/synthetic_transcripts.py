@@ -0,0 +1,117 @@
+"""
+Synthetic Microsoft Teams transcripts for benchmarks.
+
+Writes VTT files in the Teams format (cue ids, <v Speaker> voice tags) and DOCX files with
+Teams' "Speaker   0:03:12" headers, of any length, with a steady mix of speakers, filler
+words and action-style sentences so compaction and extraction have realistic input.
+
+    python benchmarks/synthetic_transcripts.py --minutes 10 60 240 --out bench_transcripts/
+"""
+import argparse
+import os
+import random
+import sys
+import uuid
+
+SPEAKERS = [
+    "Choudhari, Aman (external - Project)",
+    "Sharma, Priya",
+    "Miller, Jordan",
+    "Okafor, Chinedu",
+    "Nakamura, Yui",
+    "Garcia, Lucia",
+]
+
+OPENERS = ["So", "Okay", "Right", "Yeah", "Um", "Uh", "Well", "Actually", "I think", "You know"]
+
+SUBJECTS = ["the rollout plan", "the API migration", "the billing dashboard", "the Q3 budget",
+            "the onboarding flow", "the security review", "the data pipeline", "the release notes"]
+
+STATEMENTS = [
+    "we are on track with {subject} and the first milestone is done",
+    "there is still a blocker on {subject} that we need to clear",
+    "the customer feedback on {subject} has been mostly positive",
+    "I shared the latest numbers for {subject} in the channel",
+    "we should review the scope of {subject} before the next sprint",
+    "the test results for {subject} came back this morning",
+]
+
+ACTIONS = [
+    "{name}, can you follow up on {subject} by Friday?",
+    "I will take the action to update {subject} before next week",
+    "let's ask {name} to prepare a short summary of {subject}",
+]
+
+def _clock(seconds, hours=True):
+    hours_part, rest = divmod(int(seconds), 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours_part:02d}:{minutes:02d}:{secs:02d}.{int(seconds % 1 * 1000):03d}"
+    return f"{hours_part}:{minutes:02d}:{secs:02d}" if hours_part else f"{minutes}:{secs:02d}"
+
+def iter_utterances(minutes, speakers=4, seed=0):
+    """ Yields (start, end, speaker, text) covering the given meeting length """
+    rng = random.Random(seed)
+    names = SPEAKERS[:max(1, min(speakers, len(SPEAKERS)))]
+    clock, current = 0.0, names[0]
+    while clock < minutes * 60:
+        # Speakers often keep the floor for a few cues in a row
+        if rng.random() < 0.6:
+            current = rng.choice(names)
+        subject = rng.choice(SUBJECTS)
+        if rng.random() < 0.15:
+            other = rng.choice(names).split(",")[-1].strip()
+            sentence = rng.choice(ACTIONS).format(name=other, subject=subject)
+        else:
+            sentence = rng.choice(STATEMENTS).format(subject=subject)
+        text = f"{rng.choice(OPENERS)}, {sentence}."
+        # Roughly 2.5 words per second of speech
+        duration = max(1.5, len(text.split()) / 2.5 + rng.uniform(-0.5, 1.0))
+        yield clock, clock + duration, current, text
+        clock += duration + rng.uniform(0.0, 0.8)
+
+def write_vtt(path, minutes, speakers=4, seed=0):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("WEBVTT\n\n")
+        for index, (start, end, speaker, text) in enumerate(iter_utterances(minutes, speakers, seed)):
+            f.write(f"{uuid.UUID(int=index)}/{index}-0\n{_clock(start)} --> {_clock(end)}\n<v {speaker}>{text}</v>\n\n")
+    return path
+
+def write_docx(path, minutes, speakers=4, seed=0):
+    from docx import Document  # Only needed when DOCX transcripts are generated
+
+    doc = Document()
+    for start, _, speaker, text in iter_utterances(minutes, speakers, seed):
+        # Teams puts the speaker header and the text in one paragraph, split by a line break
+        paragraph = doc.add_paragraph()
+        paragraph.add_run(f"{speaker}   {_clock(start, hours=False)}").add_break()
+        paragraph.add_run(text)
+    doc.save(path)
+    return path
+
+def generate(out_dir, minutes_list=(10, 60, 240), formats=("vtt", "docx"), speakers=4, seed=0):
+    """ Writes one transcript per (length, format) and returns [(minutes, path)] """
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for minutes in minutes_list:
+        for fmt in formats:
+            path = os.path.join(out_dir, f"synthetic_{minutes}min.{fmt}")
+            (write_vtt if fmt == "vtt" else write_docx)(path, minutes, speakers, seed)
+            written.append((minutes, path))
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, nargs="+", default=[10, 60, 240])
+    parser.add_argument("--formats", nargs="+", choices=["vtt", "docx"], default=["vtt", "docx"])
+    parser.add_argument("--speakers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_transcripts")
+    args = parser.parse_args()
+
+    for minutes, path in generate(args.out, args.minutes, args.formats, args.speakers, args.seed):
+        print(f"{minutes:>4} min  {os.path.getsize(path) / 1024:8.0f} KB  {path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,6 +19,47 @@ GROQ_MODEL = "mistral-saba-24b"  # You can also try "llama3-70b-8192" for better
 # Use environment variable for Groq API Key, with fallback to your provided key
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "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")
 
+# Provider endpoints. Leave unset for the public APIs / a local Ollama; point them at
+# benchmarks/fake_llm_server.py (or any compatible proxy) to run without real models.
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+
+# Sampling temperature sent with every call; None keeps each provider's default
+LLM_TEMPERATURE = None
+
+# === Model Routing ===
+
+# Known models per provider: context window (tokens), price in USD per 1M input/output
+# tokens and rough speed, used for routing and for the estimate shown before processing
+MODEL_CATALOG = {
+    "ollama": {
+        OLLAMA_MODEL: {"context": 32768, "input_cost": 0.0, "output_cost": 0.0, "tokens_per_second": 30, "first_token_seconds": 1.5},
+    },
+    "openai": {
+        "gpt-3.5-turbo": {"context": 16385, "input_cost": 0.50, "output_cost": 1.50, "tokens_per_second": 100, "first_token_seconds": 0.5},
+        "gpt-4o-mini": {"context": 128000, "input_cost": 0.15, "output_cost": 0.60, "tokens_per_second": 90, "first_token_seconds": 0.5},
+    },
+    "groq": {
+        "llama-3.1-8b-instant": {"context": 131072, "input_cost": 0.05, "output_cost": 0.08, "tokens_per_second": 750, "first_token_seconds": 0.3},
+        "mistral-saba-24b": {"context": 32768, "input_cost": 0.79, "output_cost": 0.79, "tokens_per_second": 330, "first_token_seconds": 0.4},
+        "llama-3.3-70b-versatile": {"context": 131072, "input_cost": 0.59, "output_cost": 0.79, "tokens_per_second": 275, "first_token_seconds": 0.4},
+    },
+}
+
+# Size-based routing: each prompt goes to the first route whose max_tokens covers it
+# (None = no upper bound). Prompts above CHUNK_TOKEN_BUDGET take the chunked path instead.
+MODEL_ROUTING_ENABLED = True
+MODEL_ROUTES = {
+    "ollama": [{"max_tokens": None, "model": OLLAMA_MODEL}],
+    "openai": [{"max_tokens": 12000, "model": OPENAI_MODEL}, {"max_tokens": None, "model": "gpt-4o-mini"}],
+    "groq": [{"max_tokens": 3000, "model": "llama-3.1-8b-instant"}, {"max_tokens": None, "model": "llama-3.3-70b-versatile"}],
+}
+
+# Per-stage overrides, e.g. {"summary": {"groq": "llama-3.1-8b-instant"}}. Stages are
+# the pipeline stages plus "structured" (single-pass/chunk extraction) and "revise".
+STAGE_MODEL_OVERRIDES = {}
+
 # === File Handling Configurations ===
 
 UPLOAD_FOLDER = "uploads/"
@@ -31,3 +72,126 @@ ALLOWED_EXTENSIONS = {"vtt", "docx"}
 MOM_TEMPLATE_COLUMNS = ["Type", "Description", "Assignees", "Due", "Status"]
 VALID_TYPES = ["Information", "Action"]
 DEFAULT_STATUS = "Open"
+
+# === Pipeline Concurrency ===
+
+# Maximum number of in-flight LLM requests per provider.
+# Ollama runs on the local machine, so stages are queued one at a time there.
+LLM_CONCURRENCY = {"ollama": 1, "openai": 5, "groq": 3}
+
+# Worker threads used to fan the pipeline stages out
+PIPELINE_MAX_WORKERS = 5
+
+# === Provider Rate Limits ===
+
+# Requests and tokens per minute allowed per (provider, API key); None means unlimited.
+# Defaults follow the free/tier-1 quotas, raise them to match your account.
+RATE_LIMITS = {
+    "ollama": {"rpm": None, "tpm": None},
+    "openai": {"rpm": 500, "tpm": 200000},
+    "groq": {"rpm": 30, "tpm": 6000},
+}
+
+# Completion tokens reserved per call when checking the tokens/min budget
+LLM_EXPECTED_COMPLETION_TOKENS = 1000
+
+# Retries for rate limits, timeouts and 5xx, with jittered exponential backoff
+LLM_MAX_RETRIES = 4
+LLM_BACKOFF_BASE_SECONDS = 1.0
+LLM_BACKOFF_MAX_SECONDS = 60.0
+
+# === Pipeline Mode ===
+
+# "multi": one LLM call per view (summary, MoM, dashboard, speakers, actions)
+# "structured": one JSON extraction call, every view rendered locally from it
+PIPELINE_MODES = ["multi", "structured"]
+DEFAULT_PIPELINE_MODE = "multi"
+
+# === Long Transcript Chunking ===
+
+# Transcripts estimated above this many tokens are split on speaker turns and
+# processed map-reduce style. Ollama calls get a context window sized to the prompt
+# (see OLLAMA_MIN_NUM_CTX); the budget is also capped by the largest context among
+# the provider's MODEL_ROUTES and by its per-key RATE_LIMITS tpm (Groq: ~4550 tokens).
+CHUNK_TOKEN_BUDGET = {"ollama": 6000, "openai": 60000, "groq": 20000}
+
+# === LLM Response Cache ===
+
+# Responses are cached on disk, keyed by a hash of provider, model, prompts and the
+# generation params sent (temperature, Ollama's num_ctx)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_PATH = "cache/llm_cache.sqlite3"
+LLM_CACHE_MAX_ENTRIES = 5000
+LLM_CACHE_MAX_BYTES = 200 * 1024 * 1024   # 200 MB
+LLM_CACHE_TTL_SECONDS = 30 * 24 * 3600    # 30 days
+
+# === Provider HTTP Clients ===
+
+# Clients are reused per (provider, api_key) so their connection pools stay warm
+LLM_CLIENT_REGISTRY_SIZE = 32       # Max cached clients before the oldest is closed
+LLM_HTTP_POOL_SIZE = 10             # Max connections per client
+LLM_HTTP_KEEPALIVE_SECONDS = 60     # Idle time before a pooled connection is dropped
+LLM_CONNECT_TIMEOUT_SECONDS = 10
+LLM_TIMEOUT_SECONDS = 120
+
+# === Local Ollama ===
+
+# The model stays loaded between calls and is loaded ahead of time once a transcript is uploaded.
+# num_ctx is sized once per transcript (transcript plus the longest stage instructions and the reply,
+# rounded up to a power of two) instead of Ollama's 2048 default, so every stage and the warmup use the
+# same size and Ollama keeps the same runner, reusing the transcript prefix it already evaluated.
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_MIN_NUM_CTX = 2048
+
+# === Transcript Compaction ===
+
+# Merge same-speaker cues, drop filler and abbreviate speakers before prompting
+TRANSCRIPT_COMPACTION = True
+
+# === Background Jobs ===
+
+# Uploads are processed on background threads; progress and results are kept in SQLite
+# so the tabs can poll them and a reloaded page (?job=<id>) reattaches to its job
+JOB_STORE_PATH = "cache/jobs.sqlite3"
+JOB_WORKERS = 2                    # Meetings processed at the same time
+JOB_RETENTION_DAYS = 7             # Older jobs and their results are deleted on startup
+JOB_STREAM_FLUSH_SECONDS = 0.5     # How often the streamed MoM is saved while it is generated
+# Finished jobs double as a result store: an upload with the same content, provider, mode and
+# model setup reuses their results. Bump when prompts or rendering change to stop reusing old ones.
+PIPELINE_VERSION = "2"
+
+# === On-Demand Views ===
+
+# Stages generated as soon as a job starts. The other views are generated the first time their tab or
+# expander is opened and then kept with the job (and in the LLM cache) for that transcript. Structured
+# and chunked runs always produce every view, as they come out of the same extraction call.
+EAGER_STAGES = ("mom",)
+# Also generate the remaining views after the eager ones, one at a time at background priority,
+# so interactive calls always go first. Off by default: views nobody opens cost nothing.
+PREFETCH_STAGES = False
+
+# === Meeting Index ===
+
+# Items, participants and summaries of every processed meeting, searchable across meetings (SQLite FTS5)
+MEETING_INDEX_ENABLED = True
+MEETING_INDEX_PATH = "cache/meetings.sqlite3"
+
+# === Live Meetings ===
+
+# A VTT that is still being written is polled and only the new cues are sent to the model
+LIVE_POLL_SECONDS = 30             # How often the file is checked for new cues
+LIVE_MIN_UPDATE_TOKENS = 300       # New content needed before the model is called again
+
+# === Export Configuration ===
+
+# Rendered PDF/DOCX files kept in memory, keyed by a hash of their content
+EXPORT_CACHE_SIZE = 32
+
+
+# === Metrics ===
+
+# Timings and token counts for parsing, LLM calls, revision and exports
+METRICS_ENABLED = True
+METRICS_JSON_LOGS = os.getenv("METRICS_JSON_LOGS", "0") == "1"   # One JSON line per event on stderr
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE") or None          # Prometheus textfile, rewritten after each run
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0")) or None        # Serves /metrics when set
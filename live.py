@@ -0,0 +1,100 @@
+"""
+Live meeting minutes from a Teams VTT transcript that is still being written.
+
+    python live.py meeting.vtt --out live_minutes/ --llm groq --interval 30
+
+The file is polled every --interval seconds. Only the cues appended since the last
+poll are parsed and sent to the model, and the extracted items are merged into the
+minutes so far, so each update costs about the same however long the meeting runs.
+The MoM, summary, dashboard, speaker analysis and action tracker are rewritten as
+markdown after every update. Stop with Ctrl+C; the remaining cues are processed first.
+"""
+import argparse
+import os
+import sys
+import time
+
+from config import GROQ_API_KEY, LIVE_POLL_SECONDS, LIVE_MIN_UPDATE_TOKENS
+from batch import ARTIFACTS
+
+def write_views(views, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    for stage, result in views.items():
+        # Written to a temp file first so an editor or viewer never sees a half-written file
+        path = os.path.join(out_dir, ARTIFACTS[stage])
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(result)
+        os.replace(path + ".tmp", path)
+
+def run_live(file_path, out_dir, llm_type="groq", api_key=None, interval=LIVE_POLL_SECONDS,
+             min_tokens=LIVE_MIN_UPDATE_TOKENS, idle_minutes=None, log=print):
+    """ Tails file_path until interrupted (or idle for idle_minutes) and returns the LiveMeeting """
+    from modules.live_meeting import LiveMeeting
+    from modules.llm_errors import LLMError
+    from modules.meeting_index import index_meeting, meeting_key
+    from modules.structured_extractor import meeting_from_structured
+
+    meeting = LiveMeeting(file_path, llm_type=llm_type, api_key=api_key, min_tokens=min_tokens)
+    last_growth, last_offset = time.monotonic(), 0
+    force = False
+    while True:
+        try:
+            started = time.perf_counter()
+            views = meeting.update(force=force)
+            if views:
+                write_views(views, out_dir)
+                # Indexed under the file, so each update replaces the previous one
+                index_meeting(meeting_key(f"live:{os.path.abspath(file_path)}"), meeting_from_structured(meeting.data),
+                              views["summary"], os.path.basename(file_path), llm_type)
+                log(f"Update {meeting.updates}: {len(meeting.cues)} cues, "
+                    f"{len(meeting.data['action_items'])} action items ({time.perf_counter() - started:.1f}s)")
+            if force:
+                return meeting
+            if meeting.offset != last_offset:
+                last_growth, last_offset = time.monotonic(), meeting.offset
+            elif idle_minutes and time.monotonic() - last_growth > idle_minutes * 60:
+                log(f"No new cues for {idle_minutes} min, stopping")
+                force = True
+                continue
+            time.sleep(interval)
+        except (LLMError, ValueError) as e:
+            # The cues stay pending and are retried on the next poll
+            log(f"Update failed, retrying in {interval}s: {type(e).__name__}: {e}")
+            if force:
+                return meeting
+            time.sleep(interval)
+        except KeyboardInterrupt:
+            if force:
+                return meeting
+            log("Stopping after a final update")
+            force = True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("transcript", help="VTT file that is being written")
+    parser.add_argument("--out", default="live_minutes", help="Output folder (default: live_minutes)")
+    parser.add_argument("--llm", choices=["groq", "openai", "ollama"], default="groq")
+    parser.add_argument("--api-key", help="Provider API key (default: $OPENAI_API_KEY / $GROQ_API_KEY)")
+    parser.add_argument("--interval", type=float, default=LIVE_POLL_SECONDS, help="Seconds between polls")
+    parser.add_argument("--min-tokens", type=int, default=LIVE_MIN_UPDATE_TOKENS,
+                        help="New transcript tokens needed before the model is called again")
+    parser.add_argument("--idle-minutes", type=float, help="Stop when the file has not grown for this long")
+    args = parser.parse_args(argv)
+
+    if not args.transcript.lower().endswith(".vtt"):
+        parser.error("Live mode needs a .vtt transcript")
+
+    api_key = args.api_key
+    if not api_key and args.llm == "openai":
+        api_key = os.getenv("OPENAI_API_KEY")
+    elif not api_key and args.llm == "groq":
+        api_key = GROQ_API_KEY
+    if args.llm == "openai" and not api_key:
+        parser.error("OpenAI requires --api-key or $OPENAI_API_KEY")
+
+    meeting = run_live(args.transcript, args.out, llm_type=args.llm, api_key=api_key, interval=args.interval,
+                       min_tokens=args.min_tokens, idle_minutes=args.idle_minutes)
+    return 0 if meeting.data is not None else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Search the items of every processed meeting (app, batch and live runs are indexed locally).
+
+    python meetings.py --assignee Priya --status Open --last 50
+    python meetings.py "budget review" --due-before 2025-09-30
+    python meetings.py --meetings --participant Priya
+
+Text and assignee are word matches, so "Priya" finds "Sharma, Priya". Due date filters
+only match items with an explicit date (2025-09-30, 30/09/2025, September 30, 2025, ...).
+"""
+import argparse
+import json
+import sys
+import time
+
+from modules.meeting_index import get_meeting_index, parse_date
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("text", nargs="*", help="Words that must appear in the item (or meeting, with --meetings)")
+    parser.add_argument("--assignee", help="Items assigned to this person")
+    parser.add_argument("--status", help="Item status, e.g. Open")
+    parser.add_argument("--type", choices=["Action", "Information"], help="Item type")
+    parser.add_argument("--due-before", help="Items due on or before this date")
+    parser.add_argument("--due-after", help="Items due on or after this date")
+    parser.add_argument("--last", type=int, help="Only search the most recently processed N meetings")
+    parser.add_argument("--meetings", action="store_true", help="List matching meetings instead of items")
+    parser.add_argument("--participant", help="With --meetings: meetings this person attended")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    dates = {}
+    for name in ("due_before", "due_after"):
+        value = getattr(args, name)
+        if value:
+            dates[name] = parse_date(value)
+            if not dates[name]:
+                parser.error(f"Unrecognized date: {value}")
+
+    index = get_meeting_index()
+    started = time.perf_counter()
+    if args.meetings:
+        rows = index.search_meetings(" ".join(args.text), participant=args.participant, limit=args.limit)
+    else:
+        rows = index.search_items(" ".join(args.text), assignee=args.assignee, status=args.status, item_type=args.type,
+                                  last_meetings=args.last, limit=args.limit, **dates)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    for row in rows:
+        if args.meetings:
+            print(f"{row['date'] or '-':<16} {row['title']:<40} {row['actions']:>3} actions  {row['file_name']}")
+        else:
+            print(f"[{row['status']}] {row['type']}: {row['description']} | {row['assignees'] or '-'} | "
+                  f"due {row['due'] or '-'} | {row['meeting']} ({row['meeting_date'] or 'no date'})")
+    stats = index.stats()
+    print(f"{len(rows)} results from {stats['meetings']} meetings in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Round-trip check for the MoM model.
+
+Parses MoM layouts models are known to produce and fails if serializing the Meeting
+changes the order of the lines above the table, is not stable when parsed again, or
+if a title edit adds a second heading.
+
+    python -m models.mom_roundtrip
+"""
+import sys
+
+from models.mom_state import parse_mom
+
+TABLE = """| Type | Description | Assignees | Due | Status |
+|------|-------------|-----------|-----|--------|
+| Information | Budget approved | Priya | | Open |
+| Action | Send the deck | Sam | Friday | Open |"""
+
+FOOTER = "**How was the meeting?** Check out the feedback!"
+
+LAYOUTS = {
+    "template": f"# Meeting Minutes: Sync\n\n**Date**: 2025-01-01\n**Time**: 10:00\n**Invitees**: Priya, Sam\n\n{TABLE}\n\n{FOOTER}",
+    "preface": f"Here are the minutes:\n\n# Meeting Minutes: Sync\n\n**Date**: 2025-01-01\n**Invitees**: Priya, Sam\n\n{TABLE}",
+    "fields first": f"**Date**: 2025-01-01\n# Meeting Minutes: Sync\n**Invitees**: Priya, Sam\nNotes follow.\n\n{TABLE}",
+    "no heading": f"**Date**: 2025-01-01\n**Location**: Room 4\n\n{TABLE}\n\n{FOOTER}",
+    "table only": TABLE,
+}
+
+def header_lines(text):
+    """ Non-blank lines above the table """
+    lines = []
+    for line in text.splitlines():
+        if line.lstrip().startswith("|"):
+            break
+        if line.strip():
+            lines.append(line.strip())
+    return lines
+
+def check(name, text):
+    problems = []
+    meeting = parse_mom(text)
+    if meeting is None:
+        return [f"{name}: no MoM table found"]
+    markdown = meeting.to_markdown()
+    if header_lines(markdown) != header_lines(text):
+        problems.append(f"{name}: header order changed: {header_lines(text)} -> {header_lines(markdown)}")
+    if parse_mom(markdown).to_markdown() != markdown:
+        problems.append(f"{name}: serializing is not stable")
+    meeting.set_field("Title", "Renamed")
+    headings = [line for line in meeting.to_markdown().splitlines() if line.startswith("# ")]
+    if headings != ["# Meeting Minutes: Renamed"]:
+        problems.append(f"{name}: title edit gave headings {headings}")
+    return problems
+
+def main():
+    problems = [problem for name, text in LAYOUTS.items() for problem in check(name, text)]
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if not problems:
+        print(f"OK: {len(LAYOUTS)} layouts round-trip")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,169 @@
-from typing import TypedDict, Optional
+import re
+from dataclasses import dataclass, field
+from typing import TypedDict, Optional, List
+from config import MOM_TEMPLATE_COLUMNS, DEFAULT_STATUS
+from utils.markdown_table import iter_table_spans, format_row
 
 class MeetingMinutesState(TypedDict, total=False):
     file_path: str
     transcript: str
     summary: str
     mom: str
+    meeting: Optional["Meeting"]  # mom parsed once, None when it has no MoM table
     summary_table: str
     speaker_analysis: str
     action_items: str
     human_feedback: str
+    mom_history: list      # Previous MoM versions: {"mom", "feedback", "edits"}
     review_approved: bool
     model_used: str        # "ollama", "openai", or "groq"
     api_key: Optional[str] # API key if needed for LLM
+
+# ---------------------- Structured MoM ------------------------
+
+@dataclass(slots=True)
+class Participant:
+    """ One invitee and the points they contributed """
+    name: str
+    contributions: List[str] = field(default_factory=list)
+
+@dataclass(slots=True)
+class Item:
+    """ One row of the MoM table, in MOM_TEMPLATE_COLUMNS order """
+    type: str
+    description: str
+    assignees: str = ""
+    due: str = ""
+    status: str = DEFAULT_STATUS
+
+    @property
+    def is_action(self):
+        return self.type.lower() == "action"
+
+    def to_row(self):
+        return [self.type, self.description, self.assignees, self.due, self.status]
+
+@dataclass(slots=True)
+class Meeting:
+    """
+    A MoM document: header fields, the item table and any text around them. Header fields
+    are None when the document does not have them, so serializing gives back the same layout.
+    """
+    heading: Optional[str] = None       # "Meeting Minutes: <title>"
+    date: Optional[str] = None
+    time: Optional[str] = None
+    invitees: Optional[str] = None
+    participants: List[Participant] = field(default_factory=list)  # Known from extraction, not parsed back
+    preamble: List[str] = field(default_factory=list)   # Other lines above the table
+    items: List[Item] = field(default_factory=list)
+    footer: str = ""                    # Everything below the table
+    # Order of the lines above the table as parsed: "heading", a field name or "preamble" per line
+    layout: List[str] = field(default_factory=list)
+
+    @property
+    def title(self):
+        return _TITLE_PREFIX_RE.sub("", self.heading or "").strip()
+
+    @property
+    def actions(self):
+        return [item for item in self.items if item.is_action]
+
+    @property
+    def information(self):
+        return [item for item in self.items if not item.is_action]
+
+    def counts(self):
+        """ Item counts for dashboards, computed from the table instead of asked of the model """
+        actions = self.actions
+        return {
+            "information": len(self.items) - len(actions),
+            "actions": len(actions),
+            "with_due": sum(1 for item in actions if item.due),
+            "unassigned": sum(1 for item in actions if item.assignees.strip() in ("", "All")),
+        }
+
+    def set_field(self, name, value):
+        """ Sets a header field by its label (Title, Date, Time, Invitees or any other bold label) """
+        key = name.strip().lower()
+        if key == "title":
+            self.heading = f"Meeting Minutes: {value}"
+        elif key in _HEADER_FIELDS:
+            setattr(self, key, value)
+        else:
+            label = re.compile(rf"^\s*\*\*{re.escape(name.strip())}\*\*\s*:", re.IGNORECASE)
+            line = f"**{name.strip().capitalize()}**: {value}"
+            for index, existing in enumerate(self.preamble):
+                if label.match(existing):
+                    self.preamble[index] = line
+                    return
+            self.preamble.append(line)
+
+    def _layout(self):
+        """ The parsed layout, with header parts added since placed where the template puts them """
+        layout = list(self.layout)
+        if self.heading is not None and "heading" not in layout:
+            layout.insert(0, "heading")
+        for key in _HEADER_FIELDS:
+            if getattr(self, key) is not None and key not in layout:
+                # After the last heading or field line, like the template
+                last = max((i for i, part in enumerate(layout) if part != "preamble"), default=-1)
+                layout.insert(last + 1, key)
+        layout += ["preamble"] * (len(self.preamble) - layout.count("preamble"))
+        return layout
+
+    def header_markdown(self):
+        lines, preamble = [], iter(self.preamble)
+        for part in self._layout():
+            if part == "heading" and self.heading is not None:
+                lines += ["", f"# {self.heading}", ""]
+            elif part == "preamble":
+                lines.append(next(preamble, ""))
+            elif part in _HEADER_FIELDS and getattr(self, part) is not None:
+                lines.append(f"**{part.capitalize()}**: {getattr(self, part)}")
+        return "\n".join(lines).strip()
+
+    def table_markdown(self):
+        lines = [format_row(MOM_TEMPLATE_COLUMNS),
+                 "|" + "|".join("-" * (len(name) + 2) for name in MOM_TEMPLATE_COLUMNS) + "|"]
+        lines += [format_row(item.to_row()) for item in self.items]
+        return "\n".join(lines)
+
+    def to_markdown(self):
+        parts = [self.header_markdown(), self.table_markdown(), self.footer]
+        return "\n\n".join(part for part in parts if part)
+
+_HEADER_FIELDS = ("date", "time", "invitees")
+_HEADER_FIELD_RE = re.compile(r"^\s*\*\*(Date|Time|Invitees)\*\*\s*:\s*(.*)$", re.IGNORECASE)
+_HEADING_RE = re.compile(r"^\s*#{1,6}\s+(.*)$")
+_TITLE_PREFIX_RE = re.compile(r"^\s*Meeting Minutes\s*:?", re.IGNORECASE)
+
+def parse_mom(text):
+    """
+    Parses MoM markdown into a Meeting in one pass over its lines.
+    Returns None when the text has no table with the MOM_TEMPLATE_COLUMNS header.
+    """
+    lines = (text or "").splitlines()
+    wanted = [name.lower() for name in MOM_TEMPLATE_COLUMNS]
+    table = next((span for span in iter_table_spans(lines)
+                  if [name.lower().strip("* ") for name in span[2]] == wanted), None)
+    if table is None:
+        return None
+    start, end, _, rows = table
+
+    meeting = Meeting()
+    for line in lines[:start]:
+        header_field = _HEADER_FIELD_RE.match(line)
+        heading = _HEADING_RE.match(line)
+        if header_field and getattr(meeting, header_field.group(1).lower()) is None:
+            setattr(meeting, header_field.group(1).lower(), header_field.group(2).strip())
+            meeting.layout.append(header_field.group(1).lower())
+        elif heading and meeting.heading is None:
+            # The first heading is the title even when the model wrote a sentence before it
+            meeting.heading = heading.group(1).strip()
+            meeting.layout.append("heading")
+        elif line.strip():
+            meeting.preamble.append(line.rstrip())
+            meeting.layout.append("preamble")
+    meeting.items = [Item(*row) for row in rows]
+    meeting.footer = "\n".join(lines[end:]).strip()
+    return meeting
@@ -0,0 +1,196 @@
+import re
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+from config import PIPELINE_MAX_WORKERS
+from modules.tokens import estimate_tokens, CHARS_PER_TOKEN
+from modules.structured_extractor import extract_structured, PRIORITY_ORDER
+from modules.llm_errors import LLMError
+from modules.transcript_compactor import split_legend
+from modules.model_router import max_prompt_tokens
+
+# Action items whose descriptions are at least this similar are treated as duplicates
+DUPLICATE_SIMILARITY = 0.85
+
+def chunk_budget(llm_type):
+    """ Returns the per-chunk token budget for the provider (see model_router.max_prompt_tokens) """
+    return max_prompt_tokens(llm_type)
+
+def needs_chunking(transcript, llm_type="ollama"):
+    """ True when the transcript would not fit the provider's prompt budget in one call """
+    return estimate_tokens(transcript) > chunk_budget(llm_type)
+
+def split_transcript(transcript, max_tokens):
+    """
+    Splits the transcript into chunks of whole speaker turns that fit max_tokens each. The speaker
+    legend of a compacted transcript opens every chunk (and counts against its budget), so every
+    chunk can map the short speaker IDs back to full names.
+    """
+    legend, body = split_legend(transcript)
+    if legend:
+        max_tokens = max(max_tokens - estimate_tokens(legend + "\n"), max_tokens // 2)
+    chunks, current, current_tokens = [], [], 0
+
+    for turn in body.splitlines():
+        if not turn.strip():
+            continue
+        for piece in _split_long_turn(turn, max_tokens):
+            tokens = estimate_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+
+    if current:
+        chunks.append("\n".join(current))
+    return [f"{legend}\n{chunk}" for chunk in chunks] if legend else chunks
+
+def _split_long_turn(turn, max_tokens):
+    """ Breaks a single turn that exceeds the budget on sentence boundaries """
+    if estimate_tokens(turn) <= max_tokens:
+        return [turn]
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces, current = [], ""
+    for sentence in re.split(r"(?<=[.!?])\s+", turn):
+        while len(sentence) > max_chars:
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+def extract_chunked(transcript, llm_type="ollama", api_key=None):
+    """ Map: extracts items from each chunk in parallel. Reduce: merges them into one result """
+    chunks = split_transcript(transcript, chunk_budget(llm_type))
+
+    def extract(chunk):
+        try:
+            return extract_structured(chunk, llm_type=llm_type, api_key=api_key)
+        except (LLMError, ValueError) as e:
+            return e
+
+    # Each chunk runs in a copy of the caller's context so its LLM priority carries over
+    with ThreadPoolExecutor(max_workers=min(PIPELINE_MAX_WORKERS, max(1, len(chunks)))) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, extract, chunk) for chunk in chunks]
+        parts = [future.result() for future in futures]
+
+    for number, part in enumerate(parts, start=1):
+        if isinstance(part, LLMError):
+            raise type(part)(f"Chunk {number}/{len(parts)} failed: {part}", part.provider)
+        if isinstance(part, Exception):
+            raise ValueError(f"Chunk {number}/{len(parts)} failed: {part}")
+
+    return merge_structured(parts)
+
+# ---------------------- Reduce Step ------------------------
+
+def _normalize(text):
+    return re.sub(r"[^a-z0-9 ]", "", text.lower()).strip()
+
+def _similar(a, b):
+    """ Compares two normalized texts, trying SequenceMatcher's cheap upper bounds before the full ratio """
+    if a == b:
+        return True
+    matcher = SequenceMatcher(None, a, b)
+    return (matcher.real_quick_ratio() >= DUPLICATE_SIMILARITY
+            and matcher.quick_ratio() >= DUPLICATE_SIMILARITY
+            and matcher.ratio() >= DUPLICATE_SIMILARITY)
+
+def _index(entries, text):
+    index = {}
+    for entry in entries:
+        index.setdefault(_normalize(text(entry)), entry)
+    return index
+
+def _find_duplicate(index, text):
+    """ Returns the indexed entry text duplicates: an exact normalized match, else the first fuzzy one """
+    key = _normalize(text)
+    if key in index:
+        return index[key]
+    return next((entry for other, entry in index.items() if _similar(key, other)), None)
+
+def _merge_names(existing, new):
+    seen = {name.lower() for name in existing}
+    existing += [name for name in new if name.lower() not in seen]
+
+def merge_structured(parts):
+    """ Merges per-chunk extractions, deduplicating participants, items, topics and key points """
+    merged = {
+        "title": "Meeting",
+        "date": "",
+        "time": "",
+        "duration": "",
+        "participants": [],
+        "information_items": [],
+        "action_items": [],
+        "topics": [],
+        "summary": [],
+    }
+    for part in parts:
+        merge_into(merged, part)
+    return merged
+
+def merge_into(merged, part):
+    """
+    Merges one extraction into merged in place.
+
+    Exact repeats are found through an index on the normalized description. A new item
+    is still compared with every merged item of its kind, so an update costs
+    O(merged x part) comparisons, most of them rejected by SequenceMatcher's quick bounds.
+    """
+    # Header fields come from the first chunk that mentions them
+    for key in ("date", "time", "duration"):
+        merged[key] = merged[key] or part[key]
+    if merged["title"] == "Meeting":
+        merged["title"] = part["title"]
+
+    people = {person["name"].lower(): person for person in merged["participants"]}
+    for person in part["participants"]:
+        key = person["name"].lower()
+        if key not in people:
+            people[key] = {"name": person["name"], "contributions": []}
+            merged["participants"].append(people[key])
+        _merge_names(people[key]["contributions"], person["contributions"])
+
+    information = _index(merged["information_items"], lambda item: item["description"])
+    for item in part["information_items"]:
+        if _find_duplicate(information, item["description"]) is None:
+            merged["information_items"].append(dict(item))
+            information[_normalize(item["description"])] = merged["information_items"][-1]
+
+    actions = _index(merged["action_items"], lambda item: item["description"])
+    for item in part["action_items"]:
+        match = _find_duplicate(actions, item["description"])
+        if match is None:
+            merged["action_items"].append(dict(item, assignees=list(item["assignees"])))
+            actions[_normalize(item["description"])] = merged["action_items"][-1]
+            continue
+        # The same task came up in several chunks: keep the most specific details
+        _merge_names(match["assignees"], item["assignees"])
+        if len(match["assignees"]) > 1 and "All" in match["assignees"]:
+            match["assignees"].remove("All")
+        match["due"] = match["due"] or item["due"]
+        if PRIORITY_ORDER[item["priority"]] < PRIORITY_ORDER[match["priority"]]:
+            match["priority"] = item["priority"]
+        if item["notes"] and item["notes"] not in match["notes"]:
+            match["notes"] = "; ".join(filter(None, [match["notes"], item["notes"]]))
+
+    topics = {_normalize(topic["topic"]) for topic in merged["topics"]}
+    for topic in part["topics"]:
+        if _normalize(topic["topic"]) not in topics:
+            topics.add(_normalize(topic["topic"]))
+            merged["topics"].append(dict(topic))
+
+    summary = _index(merged["summary"], lambda point: point)
+    for point in part["summary"]:
+        if _find_duplicate(summary, point) is None:
+            merged["summary"].append(point)
+            summary[_normalize(point)] = point
+
+    return merged
@@ -0,0 +1,363 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from config import JOB_STORE_PATH, JOB_WORKERS, JOB_RETENTION_DAYS, JOB_STREAM_FLUSH_SECONDS, PIPELINE_VERSION
+from config import MODEL_ROUTES, MODEL_ROUTING_ENABLED, STAGE_MODEL_OVERRIDES, TRANSCRIPT_COMPACTION
+from config import EAGER_STAGES, PREFETCH_STAGES
+from modules import llm_errors
+from modules.chunker import needs_chunking
+from modules.llm_client import llm_priority
+from modules.llm_errors import LLMError
+from modules.rate_limiter import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from modules.metrics import collect_timings
+from modules.meeting_index import index_meeting, meeting_key
+from modules.model_router import DEFAULT_MODELS
+from modules.pipeline import iter_pipeline, PIPELINE_STAGES, STREAM_EVENT
+from utils.file_handler import file_digest
+
+# Stage under which the partially streamed MoM is kept while a job runs
+PARTIAL_STAGE = "mom_partial"
+# Latest revision of the MoM; kept apart so reused results always start from the generated MoM
+REVISED_STAGE = "mom_revised"
+
+# Job states; "interrupted" jobs were queued or running when the process stopped
+ACTIVE_STATES = ("queued", "running")
+FINAL_STATES = ("done", "failed", "cancelled", "interrupted")
+
+def _encode(value):
+    """ Serializes a stage result; LLM errors keep their type so the UI can tell them apart """
+    if isinstance(value, LLMError):
+        return json.dumps({"error": type(value).__name__, "message": str(value), "provider": value.provider})
+    return json.dumps({"value": value}, ensure_ascii=False)
+
+def _decode(text):
+    payload = json.loads(text)
+    if "error" in payload:
+        error_type = getattr(llm_errors, payload["error"], LLMError)
+        return error_type(payload["message"], payload["provider"])
+    return payload["value"]
+
+def result_key(file_path, llm_type, mode):
+    """
+    Identifies the results a job will produce: transcript content, provider, pipeline mode and
+    version, and the model setup. The API key is left out, so it never affects reuse.
+    """
+    setup = json.dumps([DEFAULT_MODELS.get(llm_type), MODEL_ROUTING_ENABLED, MODEL_ROUTES.get(llm_type),
+                        STAGE_MODEL_OVERRIDES, TRANSCRIPT_COMPACTION], sort_keys=True, default=str)
+    payload = "\0".join([file_digest(file_path), llm_type, mode, PIPELINE_VERSION, setup])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class JobStore:
+    """ SQLite-backed record of processing jobs and their per-stage results """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        # Opened lazily so importing the module never touches the disk
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # The API key is deliberately not stored: it only lives in the worker's memory
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, status TEXT NOT NULL, file_path TEXT NOT NULL, file_name TEXT,"
+                " llm_type TEXT NOT NULL, mode TEXT NOT NULL, created REAL NOT NULL,"
+                " started REAL, finished REAL, error TEXT, result_key TEXT, reused_from TEXT)"
+            )
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column in ("result_key", "reused_from"):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_result_key ON jobs (result_key, finished)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_results ("
+                " job_id TEXT NOT NULL, stage TEXT NOT NULL, value TEXT NOT NULL, updated REAL NOT NULL,"
+                " PRIMARY KEY (job_id, stage))"
+            )
+        return self._conn
+
+    def create(self, file_path, llm_type, mode, file_name=None, result_key=None):
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO jobs (id, status, file_path, file_name, llm_type, mode, created, result_key)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, "queued", file_path, file_name or os.path.basename(file_path), llm_type, mode, time.time(),
+                 result_key)
+            )
+            conn.commit()
+        return job_id
+
+    def find_reusable(self, result_key):
+        """ The newest job with these results that is still running or finished without errors """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT id, status FROM jobs WHERE result_key = ? AND (status IN ('queued', 'running')"
+                " OR (status = 'done' AND error IS NULL)) ORDER BY created DESC LIMIT 1",
+                (result_key,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def copy(self, source_id, file_path, file_name=None):
+        """ New finished job with the results of source_id (without its revisions); returns its ID """
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO jobs (id, status, file_path, file_name, llm_type, mode, created, started, finished,"
+                " result_key, reused_from) SELECT ?, 'done', ?, ?, llm_type, mode, ?, ?, ?, result_key, id"
+                " FROM jobs WHERE id = ?",
+                (job_id, file_path, file_name or os.path.basename(file_path), now, now, now, source_id)
+            )
+            conn.execute(
+                "INSERT INTO job_results (job_id, stage, value, updated)"
+                " SELECT ?, stage, value, updated FROM job_results WHERE job_id = ? AND stage != ?",
+                (job_id, source_id, REVISED_STAGE)
+            )
+            conn.commit()
+        return job_id
+
+    def set_status(self, job_id, status, error=None):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            if status == "running":
+                conn.execute("UPDATE jobs SET status = ?, started = ? WHERE id = ?", (status, now, job_id))
+            else:
+                conn.execute("UPDATE jobs SET status = ?, finished = ?, error = ? WHERE id = ?",
+                             (status, now if status in FINAL_STATES else None, error, job_id))
+            conn.commit()
+
+    def put_result(self, job_id, stage, value):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO job_results (job_id, stage, value, updated) VALUES (?, ?, ?, ?)",
+                         (job_id, stage, _encode(value), time.time()))
+            conn.commit()
+
+    def delete_result(self, job_id, stage):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM job_results WHERE job_id = ? AND stage = ?", (job_id, stage))
+            conn.commit()
+
+    def get(self, job_id):
+        """ Returns the job with a "results" dict of stage -> result, or None if unknown """
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            results = conn.execute("SELECT stage, value FROM job_results WHERE job_id = ? ORDER BY updated",
+                                   (job_id,)).fetchall()
+        job = dict(row)
+        job["results"] = {stage: _decode(value) for stage, value in results}
+        return job
+
+    def recent(self, limit=20):
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute("SELECT * FROM jobs ORDER BY created DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def mark_interrupted(self):
+        """ Flags jobs left queued/running by a previous process; their threads are gone """
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f"UPDATE jobs SET status = 'interrupted', finished = ? WHERE status IN {ACTIVE_STATES}",
+                         (time.time(),))
+            conn.commit()
+
+    def purge(self, older_than_seconds):
+        cutoff = time.time() - older_than_seconds
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM job_results WHERE job_id IN (SELECT id FROM jobs WHERE created < ?)", (cutoff,))
+            conn.execute("DELETE FROM jobs WHERE created < ?", (cutoff,))
+            conn.commit()
+
+def iter_meeting(file_path, llm_type, api_key, mode, stages=None):
+    """
+    Parse -> compact -> pipeline for one transcript, yielding (stage, result) like iter_pipeline.
+    stages limits the LLM stages run in multi mode; None runs them all.
+    """
+    from modules.speaker_analytics import compute_speaker_stats
+    from modules.transcript_compactor import prepare_transcript
+    from modules.transcript_parser import iter_cues
+
+    compact = prepare_transcript(file_path)
+    yield "prompt_tokens", (compact.tokens_before, compact.tokens_after)
+    yield "transcript", compact.text
+    try:
+        speaker_stats = compute_speaker_stats(iter_cues(file_path))
+    except Exception:
+        speaker_stats = None
+    if speaker_stats:
+        yield "speakers", speaker_stats["speakers"]
+    if mode == "structured" or needs_chunking(compact.text, llm_type):
+        # One extraction renders every view, so none is left for later
+        stages = None
+    elif stages is not None and speaker_stats and "speaker_analysis" not in stages:
+        # Built locally from the cues (and the MoM items), it costs no call
+        stages = [*stages, "speaker_analysis"]
+    yield from iter_pipeline(compact.text, llm_type=llm_type, api_key=api_key, mode=mode, stream_stage="mom",
+                             speaker_stats=speaker_stats, stages=stages)
+
+class JobQueue:
+    """
+    Runs meeting jobs on background threads and records their progress in a JobStore. A job only
+    generates EAGER_STAGES; the other views are generated when requested (request_stages) or prefetched.
+    """
+
+    def __init__(self, store, max_workers=JOB_WORKERS):
+        self.store = store
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mom-job")
+        # Views get their own threads, so an opened tab never waits behind other meetings' jobs
+        self._views = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mom-view")
+        self._prefetch = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mom-prefetch")
+        self._cancelled = set()
+        self._pending = set()   # (job_id, stage) being generated
+        self._submit_lock = threading.Lock()
+        store.mark_interrupted()
+        store.purge(JOB_RETENTION_DAYS * 24 * 3600)
+
+    def submit(self, file_path, llm_type, api_key=None, mode="multi", file_name=None, reuse=True):
+        """
+        Queues the transcript and returns the job ID to poll with store.get(). With reuse, a transcript
+        already processed the same way returns a finished copy of those results at once, and one that
+        is being processed right now returns the running job.
+        """
+        key = result_key(file_path, llm_type, mode)
+        with self._submit_lock:
+            previous = self.store.find_reusable(key) if reuse else None
+            if previous and previous["status"] in ACTIVE_STATES:
+                return previous["id"]
+            if previous:
+                return self.store.copy(previous["id"], file_path, file_name)
+            job_id = self.store.create(file_path, llm_type, mode, file_name, key)
+        self._pool.submit(self._run, job_id, file_path, llm_type, api_key, mode, file_name)
+        return job_id
+
+    def cancel(self, job_id):
+        """ Stops the job after its current step """
+        self._cancelled.add(job_id)
+
+    def request_stages(self, job_id, stages, api_key=None, retry=False):
+        """
+        Generates the given views of a job that were left for later. Returns the stages now being
+        generated (including ones already underway), or None while the job has no transcript yet.
+        Stages that failed are only generated again with retry.
+        """
+        job = self.store.get(job_id)
+        if job is None or "transcript" not in job["results"]:
+            return None
+        results = job["results"]
+        missing = [stage for stage in stages if stage not in results
+                   or (retry and isinstance(results[stage], LLMError))]
+        with self._submit_lock:
+            claimed = [stage for stage in missing if (job_id, stage) not in self._pending]
+            self._pending.update((job_id, stage) for stage in claimed)
+        if claimed:
+            self._views.submit(self._run_stages, job, claimed, api_key, PRIORITY_INTERACTIVE)
+        return missing
+
+    def pending(self, job_id, stage):
+        return (job_id, stage) in self._pending
+
+    def _prefetch_stages(self, job_id, stages, api_key):
+        # One stage at a time, so a view opened meanwhile can still claim the ones not started yet
+        for stage in stages:
+            job = self.store.get(job_id)
+            with self._submit_lock:
+                if job is None or stage in job["results"] or (job_id, stage) in self._pending:
+                    continue
+                self._pending.add((job_id, stage))
+            self._run_stages(job, [stage], api_key, PRIORITY_BACKGROUND)
+
+    def _run_stages(self, job, stages, api_key, priority):
+        """ Runs stages (already claimed in _pending) against the job's stored transcript """
+        results = job["results"]
+        try:
+            with collect_timings() as timing_events, llm_priority(priority):
+                for stage, result in iter_pipeline(results["transcript"], llm_type=job["llm_type"], api_key=api_key,
+                                                   stages=stages, mode=job["mode"]):
+                    self.store.put_result(job["id"], stage, result)
+                    mom = results.get(REVISED_STAGE, results.get("mom"))
+                    if stage == "summary" and isinstance(result, str) and isinstance(mom, str):
+                        # The summary is part of the meeting's index entry
+                        index_meeting(meeting_key(results["transcript"]), mom, result, job["file_name"],
+                                      job["llm_type"], results.get("speakers"))
+            # Re-read so timings of views generated at the same time are kept
+            stored = self.store.get(job["id"])["results"].get("timing_events", [])
+            self.store.put_result(job["id"], "timing_events", stored + timing_events)
+        except Exception as e:
+            for stage in stages:
+                self.store.put_result(job["id"], stage, LLMError(f"{type(e).__name__}: {e}", job["llm_type"]))
+        finally:
+            with self._submit_lock:
+                self._pending.difference_update((job["id"], stage) for stage in stages)
+
+    def _run(self, job_id, file_path, llm_type, api_key, mode, file_name=None):
+        results, failed = {}, []
+        if job_id in self._cancelled:
+            self.store.set_status(job_id, "cancelled")
+            return
+        self.store.set_status(job_id, "running")
+        streamed, flushed = [], time.monotonic()
+        try:
+            with collect_timings() as timing_events:
+                for stage, result in iter_meeting(file_path, llm_type, api_key, mode, list(EAGER_STAGES)):
+                    if job_id in self._cancelled:
+                        self.store.set_status(job_id, "cancelled")
+                        return
+                    if stage == STREAM_EVENT:
+                        # Partial output is written at most every few hundred ms to keep SQLite writes cheap
+                        streamed.append(result)
+                        if time.monotonic() - flushed >= JOB_STREAM_FLUSH_SECONDS:
+                            self.store.put_result(job_id, PARTIAL_STAGE, "".join(streamed))
+                            flushed = time.monotonic()
+                        continue
+                    self.store.put_result(job_id, stage, result)
+                    if isinstance(result, LLMError):
+                        failed.append(stage)
+                    else:
+                        results[stage] = result
+            self.store.put_result(job_id, "timing_events", timing_events)
+            if "mom" in results:
+                index_meeting(meeting_key(results["transcript"]), results["mom"], results.get("summary"),
+                              file_name or os.path.basename(file_path), llm_type, results.get("speakers"))
+            self.store.delete_result(job_id, PARTIAL_STAGE)
+            # Jobs with failed stages are finished but never reused
+            self.store.set_status(job_id, "done", error=f"Failed stages: {', '.join(failed)}" if failed else None)
+            later = [stage for stage in PIPELINE_STAGES if stage not in results and stage not in failed]
+            if PREFETCH_STAGES and later:
+                self._prefetch.submit(self._prefetch_stages, job_id, later, api_key)
+        except Exception as e:
+            self.store.set_status(job_id, "failed", error=f"{type(e).__name__}: {e}")
+        finally:
+            self._cancelled.discard(job_id)
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_job_queue():
+    """ Returns the process-wide job queue, shared by every Streamlit session and rerun """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue(JobStore(JOB_STORE_PATH))
+    return _queue
@@ -0,0 +1,74 @@
+import os
+from config import LIVE_MIN_UPDATE_TOKENS, TRANSCRIPT_COMPACTION
+from modules.tokens import estimate_tokens
+from modules.transcript_parser import read_new_vtt_cues, format_cues
+from modules.transcript_compactor import compact_cues
+from modules.structured_extractor import extract_structured, render_all
+from modules.chunker import needs_chunking, extract_chunked, merge_structured, merge_into
+from modules.speaker_analytics import compute_speaker_stats, render_speaker_analysis, contributions_from_structured
+from modules.model_router import llm_stage
+from modules.metrics import span
+
+class LiveMeeting:
+    """
+    Running minutes for a VTT transcript that is still being written. Each update parses
+    only the bytes appended since the last one, extracts items from those new cues and
+    merges them into the minutes so far, so the transcript is never re-sent as a whole.
+    """
+
+    def __init__(self, file_path, llm_type="ollama", api_key=None, min_tokens=LIVE_MIN_UPDATE_TOKENS):
+        self.file_path = file_path
+        self.llm_type = llm_type
+        self.api_key = api_key
+        self.min_tokens = min_tokens
+        self.reset()
+
+    def reset(self):
+        self.offset = 0
+        self.cues = []              # Every cue so far, for the local speaker stats
+        self.pending = []           # Cues not sent to the model yet
+        self.pending_tokens = 0
+        self.data = None            # Merged structured extraction
+        self.updates = 0
+
+    def poll(self):
+        """ Reads the cues appended since the last poll and returns how many arrived """
+        if os.path.getsize(self.file_path) < self.offset:
+            # The file was truncated or replaced, so the offset no longer points at a cue boundary
+            self.reset()
+        cues, self.offset = read_new_vtt_cues(self.file_path, self.offset)
+        self.cues += cues
+        self.pending += cues
+        self.pending_tokens += sum(estimate_tokens(cue.text) for cue in cues)
+        return len(cues)
+
+    def update(self, force=False):
+        """
+        Extracts items from the new cues and merges them into the running minutes.
+        Returns the rendered views, or None while there is too little new content (unless force).
+        LLM errors propagate and the cues stay pending, so the next update retries them.
+        """
+        self.poll()
+        if not self.pending or (self.pending_tokens < self.min_tokens and not force):
+            return None
+
+        delta = compact_cues(self.pending).text if TRANSCRIPT_COMPACTION else format_cues(self.pending)
+        extract = extract_chunked if needs_chunking(delta, self.llm_type) else extract_structured
+        with span("live_update", cues=len(self.pending)), llm_stage("live"):
+            part = extract(delta, llm_type=self.llm_type, api_key=self.api_key)
+
+        self.data = merge_structured([part]) if self.data is None else merge_into(self.data, part)
+        self.pending, self.pending_tokens = [], 0
+        self.updates += 1
+        return self.render()
+
+    def render(self):
+        """ Every view of the minutes so far; speaker analysis uses the exact stats from the cues """
+        if self.data is None:
+            return None
+        views = render_all(self.data)
+        stats = compute_speaker_stats(self.cues)
+        if stats:
+            contributions = contributions_from_structured(self.data, stats["speakers"])
+            views["speaker_analysis"] = render_speaker_analysis(stats, contributions)
+        return views
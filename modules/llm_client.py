@@ -1,60 +1,551 @@
-import openai
 import os
-from langchain_community.llms import Ollama
-from config import OLLAMA_MODEL, OPENAI_MODEL, GROQ_MODEL, GROQ_API_KEY
+import time
+import random
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+from collections import OrderedDict
+from config import OLLAMA_MODEL, OPENAI_MODEL, GROQ_MODEL, GROQ_API_KEY, LLM_CONCURRENCY
+from config import OLLAMA_BASE_URL, OPENAI_BASE_URL, GROQ_BASE_URL, LLM_TEMPERATURE
+from config import LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_MAX_BYTES, LLM_CACHE_TTL_SECONDS
+from config import LLM_CLIENT_REGISTRY_SIZE, LLM_HTTP_POOL_SIZE, LLM_HTTP_KEEPALIVE_SECONDS
+from config import LLM_CONNECT_TIMEOUT_SECONDS, LLM_TIMEOUT_SECONDS
+from config import OLLAMA_KEEP_ALIVE, OLLAMA_MIN_NUM_CTX
+from config import RATE_LIMITS, LLM_EXPECTED_COMPLETION_TOKENS
+from config import LLM_MAX_RETRIES, LLM_BACKOFF_BASE_SECONDS, LLM_BACKOFF_MAX_SECONDS
+from modules.llm_cache import LLMCache
+from modules.llm_errors import LLMError, RateLimitError, AuthenticationError, InvalidRequestError, translate_error
+from modules.rate_limiter import ProviderScheduler, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, PRIORITY_BATCH
+from modules.tokens import estimate_tokens
+from modules.metrics import record_llm_call, record_cache_lookup
+from modules.model_router import select_model, model_info
 
-# Import Groq SDK
-from groq import Groq
+# Provider SDKs (openai, groq, httpx, langchain) are imported on first use so
+# that app and worker startup only pay for the provider actually selected.
 
-# Initialize Ollama
-ollama_llm = Ollama(model=OLLAMA_MODEL)
+_ollama_llms = {}
+_ollama_lock = threading.Lock()
 
-def invoke_openai(prompt, api_key):
+def get_ollama(model=OLLAMA_MODEL):
+    """ Returns the shared Ollama LLM for model, constructing it on first use """
+    llm = _ollama_llms.get(model)
+    if llm is None:
+        with _ollama_lock:
+            llm = _ollama_llms.get(model)
+            if llm is None:
+                from langchain_community.llms import Ollama
+                llm = _ollama_llms[model] = Ollama(model=model, base_url=OLLAMA_BASE_URL, keep_alive=OLLAMA_KEEP_ALIVE)
+    return llm
+
+def ollama_num_ctx(model, prompt_tokens):
+    """
+    Context window for an Ollama call: prompt plus expected reply, rounded up to a power of two
+    so calls of similar size reuse the loaded runner (a new num_ctx makes Ollama reload the model)
+    """
+    needed = prompt_tokens + LLM_EXPECTED_COMPLETION_TOKENS
+    num_ctx = OLLAMA_MIN_NUM_CTX
+    while num_ctx < needed:
+        num_ctx *= 2
+    context = model_info("ollama", model).get("context")
+    return min(num_ctx, context) if context else num_ctx
+
+_ollama_size = contextvars.ContextVar("ollama_prompt_size", default=None)
+
+@contextmanager
+def ollama_prompt_size(prompt_tokens):
+    """
+    Sizes num_ctx of the Ollama calls made inside the block for prompt_tokens rather than for each
+    prompt, so every stage of one transcript gets the same size (and keeps Ollama's loaded runner)
+    """
+    token = _ollama_size.set(prompt_tokens)
+    try:
+        yield
+    finally:
+        _ollama_size.reset(token)
+
+def _num_ctx(model, prompt):
+    return ollama_num_ctx(model, max(_ollama_size.get() or 0, estimate_tokens(prompt)))
+
+_ollama_warmed = set()
+
+def warm_ollama(model=OLLAMA_MODEL, prompt_tokens=0):
+    """
+    Loads model into Ollama with the context size prompt_tokens will need, on a background
+    thread, so the first stage does not pay for the load. Each (model, size) is loaded once per process.
+    """
+    num_ctx = ollama_num_ctx(model, prompt_tokens)
+    with _ollama_lock:
+        if (model, num_ctx) in _ollama_warmed:
+            return
+        _ollama_warmed.add((model, num_ctx))
+    threading.Thread(target=_load_ollama, args=(model, num_ctx), daemon=True, name="ollama-warmup").start()
+
+def _load_ollama(model, num_ctx):
+    import httpx
+
+    # A generate request without a prompt only loads the model
+    payload = {"model": model, "keep_alive": OLLAMA_KEEP_ALIVE, "options": {"num_ctx": num_ctx}}
+    try:
+        httpx.post(f"{OLLAMA_BASE_URL.rstrip('/')}/api/generate", json=payload, timeout=LLM_TIMEOUT_SECONDS)
+    except Exception:
+        # Not fatal: the first real call loads the model and reports the error if Ollama is down
+        with _ollama_lock:
+            _ollama_warmed.discard((model, num_ctx))
+
+SYSTEM_PROMPT = "Generate structured output from transcript."
+
+PROVIDER_MODELS = {"ollama": OLLAMA_MODEL, "openai": OPENAI_MODEL, "groq": GROQ_MODEL}
+
+response_cache = LLMCache(
+    LLM_CACHE_PATH,
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    max_bytes=LLM_CACHE_MAX_BYTES,
+    ttl_seconds=LLM_CACHE_TTL_SECONDS,
+)
+
+# ---------------------- Scheduling ------------------------
+
+# Every call in the process goes through one scheduler: per-provider concurrency cap,
+# requests/tokens per minute per (provider, api key) and priority ordering
+scheduler = ProviderScheduler(RATE_LIMITS, LLM_CONCURRENCY)
+
+_priority = contextvars.ContextVar("llm_priority", default=None)
+_default_priority = PRIORITY_INTERACTIVE
+
+def set_provider_concurrency(llm_type, limit):
+    """ Overrides the number of concurrent requests allowed for a provider """
+    LLM_CONCURRENCY[llm_type] = max(1, int(limit))
+    scheduler.set_concurrency(llm_type, LLM_CONCURRENCY[llm_type])
+
+def set_rate_limit(llm_type, rpm=None, tpm=None, share=1.0):
+    """
+    Overrides the requests/tokens per minute allowed per API key for a provider; share is
+    the part of that budget this process may use
+    """
+    scheduler.set_limits(llm_type, rpm, tpm, share)
+
+def set_default_priority(priority):
+    """ Priority for calls made outside an llm_priority block, e.g. PRIORITY_BATCH in batch workers """
+    global _default_priority
+    _default_priority = priority
+
+@contextmanager
+def llm_priority(priority):
+    """ Runs the calls made inside the block (in this thread/context) at the given priority """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority():
+    priority = _priority.get()
+    return _default_priority if priority is None else priority
+
+def _request_tokens(llm_type, prompt):
+    """ Tokens to reserve for a call: prompt plus expected completion, corrected once usage is known """
+    tokens = estimate_tokens(SYSTEM_PROMPT + prompt) + LLM_EXPECTED_COMPLETION_TOKENS
+    limit = scheduler.token_limit(llm_type)
+    if limit and tokens > limit:
+        # The provider rejects a request above the key's tokens/min outright (Groq: 413)
+        raise InvalidRequestError(
+            f"This request needs about {tokens} tokens but {llm_type} allows {limit} tokens/min per API key. "
+            f"Use a shorter input, or raise RATE_LIMITS['{llm_type}']['tpm'] if your account allows more.",
+            llm_type)
+    return tokens
+
+def _backoff(attempt, error):
+    """ Seconds to wait before retry number attempt + 1 """
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after:
+        return min(retry_after, LLM_BACKOFF_MAX_SECONDS)
+    # Full jitter keeps callers that failed together from retrying together
+    return random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+def _should_retry(llm_type, api_key, error, attempt):
+    """ Decides whether to retry and, for rate limits, holds back the whole provider lane """
+    if not error.retryable or attempt >= LLM_MAX_RETRIES:
+        return None
+    delay = _backoff(attempt, error)
+    if isinstance(error, RateLimitError):
+        scheduler.penalize(llm_type, api_key, delay)
+    return delay
+
+def _usage(response):
+    usage = getattr(response, "usage", None)
+    return {name: getattr(usage, name, None) for name in ("prompt_tokens", "completion_tokens", "total_tokens")}
+
+def _record_call(llm_type, model, prompt, started, queued=0.0, retries=0, usage=None, result=None, error=None,
+                 cache_hit=False, streamed=False):
+    usage = usage or {}
+    record_llm_call(
+        llm_type, model, time.perf_counter() - started - queued,
+        # Ollama and streamed responses report no usage, so fall back to the estimate
+        prompt_tokens=usage.get("prompt_tokens") or estimate_tokens(SYSTEM_PROMPT + prompt),
+        completion_tokens=usage.get("completion_tokens") or (estimate_tokens(result) if result else None),
+        cache_hit=cache_hit, queue_seconds=queued, retries=retries, error=error, streamed=streamed,
+    )
+
+async def _acquire_async(llm_type, api_key, tokens, priority):
+    # The scheduler blocks, so waiting happens on a worker thread; a lease granted
+    # after the caller was cancelled is released straight away
+    task = asyncio.ensure_future(asyncio.to_thread(scheduler.acquire, llm_type, api_key, tokens, priority))
     try:
-        client = openai.OpenAI(api_key=api_key)
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        task.add_done_callback(lambda done: done.cancelled() or done.exception() or done.result().release())
+        raise
+
+# ---------------------- Client Registry ------------------------
+
+_clients = OrderedDict()
+_clients_lock = threading.Lock()
+
+def _http_settings():
+    import httpx
+    timeout = httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS)
+    limits = httpx.Limits(
+        max_connections=LLM_HTTP_POOL_SIZE,
+        max_keepalive_connections=LLM_HTTP_POOL_SIZE,
+        keepalive_expiry=LLM_HTTP_KEEPALIVE_SECONDS,
+    )
+    return timeout, limits
+
+def _build_client(provider, api_key, is_async):
+    import httpx
+    if provider == "openai":
+        import openai
+    else:
+        import groq
+
+    timeout, limits = _http_settings()
+    if is_async:
+        http_client = httpx.AsyncClient(timeout=timeout, limits=limits)
+        sdk_client = openai.AsyncOpenAI if provider == "openai" else groq.AsyncGroq
+    else:
+        http_client = httpx.Client(timeout=timeout, limits=limits)
+        sdk_client = openai.OpenAI if provider == "openai" else groq.Groq
+    base_url = OPENAI_BASE_URL if provider == "openai" else GROQ_BASE_URL
+    # Retries are handled by the scheduler so they respect the shared rate limits
+    return sdk_client(api_key=api_key, base_url=base_url, timeout=timeout, http_client=http_client, max_retries=0)
+
+def get_client(provider, api_key, is_async=False):
+    """ Returns a long-lived SDK client for (provider, api_key), creating it on first use """
+    key = (provider, api_key, is_async)
+    # Async connection pools are tied to the event loop they were opened on
+    if is_async:
+        key += (id(asyncio.get_running_loop()),)
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            _clients.move_to_end(key)
+            return client
+
+        client = _build_client(provider, api_key, is_async)
+        _clients[key] = client
+        while len(_clients) > LLM_CLIENT_REGISTRY_SIZE:
+            stale_key, stale = _clients.popitem(last=False)
+            # Async clients can only be closed from their own event loop
+            if not stale_key[2]:
+                stale.close()
+        return client
+
+def close_clients():
+    """ Closes every pooled sync client, e.g. on worker shutdown """
+    with _clients_lock:
+        for key, client in _clients.items():
+            if not key[2]:
+                client.close()
+        _clients.clear()
+
+def _generation_params(llm_type, model, prompt):
+    """
+    Options sent with a call besides model and messages. They change the reply (Ollama
+    truncates a prompt longer than num_ctx), so the cache key includes them too.
+    """
+    params = {} if LLM_TEMPERATURE is None else {"temperature": LLM_TEMPERATURE}
+    if llm_type == "ollama":
+        params["num_ctx"] = _num_ctx(model, prompt)
+    return params
+
+def _messages(prompt):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+# ---------------------- Provider Calls ------------------------
+
+# These raise LLMError subclasses (see modules.llm_errors) and make a single attempt;
+# retries and rate limiting happen in invoke_llm / stream_llm / ainvoke_llm.
+
+def invoke_openai(prompt, api_key, usage=None, model=OPENAI_MODEL):
+    try:
+        client = get_client("openai", api_key)
         response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "Generate structured output from transcript."},
-                {"role": "user", "content": prompt}
-            ]
+            model=model,
+            messages=_messages(prompt),
+            **_generation_params("openai", model, prompt)
         )
-        return response.choices[0].message.content
     except Exception as e:
-        return f"OpenAI Error: {str(e)}"
+        raise translate_error("openai", e) from e
+    if usage is not None:
+        usage.update(_usage(response))
+    return response.choices[0].message.content
 
-def invoke_ollama(prompt):
+def invoke_ollama(prompt, usage=None, model=OLLAMA_MODEL):
     try:
-        return ollama_llm.invoke(prompt)
+        return get_ollama(model).invoke(prompt, **_generation_params("ollama", model, prompt))
     except Exception as e:
-        return f"Ollama Error: {str(e)}"
+        raise translate_error("ollama", e) from e
 
-def invoke_groq(prompt, api_key=None):
+def invoke_groq(prompt, api_key=None, usage=None, model=GROQ_MODEL):
+    if api_key is None:
+        api_key = GROQ_API_KEY
     try:
-        # Fix: Groq client initialization - pass api_key as keyword argument
-        if api_key is None:
-            api_key = GROQ_API_KEY
-            
-        client = Groq(api_key=api_key)  # Fixed: use keyword argument
-        
+        client = get_client("groq", api_key)
         response = client.chat.completions.create(
-            model=GROQ_MODEL,
-            messages=[
-                {"role": "system", "content": "Generate structured output from transcript."},
-                {"role": "user", "content": prompt}
-            ],
+            model=model,
+            messages=_messages(prompt),
+            **_generation_params("groq", model, prompt),
             stream=False
         )
-        return response.choices[0].message.content
     except Exception as e:
-        return f"Groq Error: {str(e)}"
+        raise translate_error("groq", e) from e
+    if usage is not None:
+        usage.update(_usage(response))
+    return response.choices[0].message.content
 
-def invoke_llm(prompt, llm_type="ollama", api_key=None):
-    if llm_type == "openai":
-        if not api_key:
-            raise ValueError("OpenAI API key required.")
-        return invoke_openai(prompt, api_key)
-    elif llm_type == "groq":
-        return invoke_groq(prompt, api_key)
-    else:
-        return invoke_ollama(prompt)
+def _stream_chat(provider, model, prompt, api_key):
+    try:
+        client = get_client(provider, api_key)
+        response = client.chat.completions.create(
+            model=model,
+            messages=_messages(prompt),
+            **_generation_params(provider, model, prompt),
+            stream=True
+        )
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        raise translate_error(provider, e) from e
+
+def stream_openai(prompt, api_key, model=OPENAI_MODEL):
+    return _stream_chat("openai", model, prompt, api_key)
+
+def stream_ollama(prompt, model=OLLAMA_MODEL):
+    try:
+        yield from get_ollama(model).stream(prompt, **_generation_params("ollama", model, prompt))
+    except Exception as e:
+        raise translate_error("ollama", e) from e
+
+def stream_groq(prompt, api_key=None, model=GROQ_MODEL):
+    return _stream_chat("groq", model, prompt, GROQ_API_KEY if api_key is None else api_key)
+
+async def ainvoke_openai(prompt, api_key, usage=None, model=OPENAI_MODEL):
+    try:
+        client = get_client("openai", api_key, is_async=True)
+        response = await client.chat.completions.create(
+            model=model,
+            messages=_messages(prompt),
+            **_generation_params("openai", model, prompt)
+        )
+    except Exception as e:
+        raise translate_error("openai", e) from e
+    if usage is not None:
+        usage.update(_usage(response))
+    return response.choices[0].message.content
+
+async def ainvoke_ollama(prompt, usage=None, model=OLLAMA_MODEL):
+    try:
+        return await get_ollama(model).ainvoke(prompt, **_generation_params("ollama", model, prompt))
+    except Exception as e:
+        raise translate_error("ollama", e) from e
+
+async def ainvoke_groq(prompt, api_key=None, usage=None, model=GROQ_MODEL):
+    if api_key is None:
+        api_key = GROQ_API_KEY
+    try:
+        client = get_client("groq", api_key, is_async=True)
+        response = await client.chat.completions.create(
+            model=model,
+            messages=_messages(prompt),
+            **_generation_params("groq", model, prompt),
+            stream=False
+        )
+    except Exception as e:
+        raise translate_error("groq", e) from e
+    if usage is not None:
+        usage.update(_usage(response))
+    return response.choices[0].message.content
+
+def cache_stats():
+    """ Returns hit/miss counters and size of the response cache """
+    return response_cache.stats()
+
+def _cache_key(llm_type, model, prompt):
+    # The API key is deliberately not part of the key: same request, same answer
+    return LLMCache.make_key(llm_type, model, SYSTEM_PROMPT, prompt, _generation_params(llm_type, model, prompt))
+
+def _cache_get(llm_type, cache_key):
+    """ Cached response or None; every lookup is counted in the metrics (see cache_stats for totals) """
+    cached = response_cache.get(cache_key)
+    record_cache_lookup(llm_type, cached is not None)
+    return cached
+
+def _resolve(llm_type, api_key, model, prompt):
+    """ Normalizes provider and key, and routes the prompt to a model unless one was given """
+    if llm_type == "openai" and not api_key:
+        raise AuthenticationError("OpenAI API key required.", "openai")
+    if llm_type not in PROVIDER_MODELS:
+        llm_type = "ollama"
+    if llm_type == "groq" and api_key is None:
+        api_key = GROQ_API_KEY
+    if model is None:
+        model = select_model(llm_type, estimate_tokens(SYSTEM_PROMPT + prompt))
+    return llm_type, api_key, model
+
+def invoke_llm(prompt, llm_type="ollama", api_key=None, use_cache=LLM_CACHE_ENABLED, model=None):
+    """
+    Returns the completion for prompt; raises an LLMError once retries are exhausted.
+    Without an explicit model the prompt is routed by size and stage (see modules.model_router).
+    """
+    llm_type, api_key, model = _resolve(llm_type, api_key, model, prompt)
+    started = time.perf_counter()
+
+    cache_key = _cache_key(llm_type, model, prompt)
+    if use_cache:
+        cached = _cache_get(llm_type, cache_key)
+        if cached is not None:
+            _record_call(llm_type, model, prompt, started, result=cached, cache_hit=True)
+            return cached
+
+    tokens = _request_tokens(llm_type, prompt)
+    priority = current_priority()
+    queued = 0.0
+    try:
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            usage = {}
+            waiting = time.perf_counter()
+            # Blocks until the provider has a free slot and rate-limit budget for this key
+            with scheduler.acquire(llm_type, api_key, tokens, priority):
+                queued += time.perf_counter() - waiting
+                try:
+                    if llm_type == "openai":
+                        result = invoke_openai(prompt, api_key, usage, model)
+                    elif llm_type == "groq":
+                        result = invoke_groq(prompt, api_key, usage, model)
+                    else:
+                        result = invoke_ollama(prompt, usage, model)
+                    break
+                except LLMError as e:
+                    delay = _should_retry(llm_type, api_key, e, attempt)
+                    if delay is None:
+                        raise
+            time.sleep(delay)
+    except LLMError as e:
+        _record_call(llm_type, model, prompt, started, queued, attempt, error=e)
+        raise
+
+    _record_call(llm_type, model, prompt, started, queued, attempt, usage, result)
+    scheduler.record_usage(llm_type, api_key, tokens, usage.get("total_tokens"))
+    if use_cache and isinstance(result, str):
+        response_cache.set(cache_key, result)
+    return result
+
+def stream_llm(prompt, llm_type="ollama", api_key=None, use_cache=LLM_CACHE_ENABLED, model=None):
+    """ Streaming variant of invoke_llm: yields text deltas, caching the full text once done """
+    llm_type, api_key, model = _resolve(llm_type, api_key, model, prompt)
+    started = time.perf_counter()
+
+    cache_key = _cache_key(llm_type, model, prompt)
+    if use_cache:
+        cached = _cache_get(llm_type, cache_key)
+        if cached is not None:
+            _record_call(llm_type, model, prompt, started, result=cached, cache_hit=True, streamed=True)
+            yield cached
+            return
+
+    tokens = _request_tokens(llm_type, prompt)
+    priority = current_priority()
+    queued = 0.0
+    parts = []
+    try:
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            waiting = time.perf_counter()
+            # The provider slot is held until the stream is exhausted or closed
+            with scheduler.acquire(llm_type, api_key, tokens, priority):
+                queued += time.perf_counter() - waiting
+                if llm_type == "openai":
+                    deltas = stream_openai(prompt, api_key, model)
+                elif llm_type == "groq":
+                    deltas = stream_groq(prompt, api_key, model)
+                else:
+                    deltas = stream_ollama(prompt, model)
+
+                try:
+                    for delta in deltas:
+                        parts.append(delta)
+                        yield delta
+                    break
+                except LLMError as e:
+                    # Once text has been shown a retry would duplicate it, so only retry before the first delta
+                    delay = None if parts else _should_retry(llm_type, api_key, e, attempt)
+                    if delay is None:
+                        raise
+            time.sleep(delay)
+    except LLMError as e:
+        _record_call(llm_type, model, prompt, started, queued, attempt, error=e, streamed=True)
+        raise
+
+    result = "".join(parts)
+    _record_call(llm_type, model, prompt, started, queued, attempt, result=result, streamed=True)
+    if use_cache and parts:
+        response_cache.set(cache_key, result)
+
+async def ainvoke_llm(prompt, llm_type="ollama", api_key=None, use_cache=LLM_CACHE_ENABLED, model=None):
+    """ Async variant of invoke_llm sharing the same cache, scheduler and pooled clients """
+    llm_type, api_key, model = _resolve(llm_type, api_key, model, prompt)
+    started = time.perf_counter()
+
+    cache_key = _cache_key(llm_type, model, prompt)
+    if use_cache:
+        cached = _cache_get(llm_type, cache_key)
+        if cached is not None:
+            _record_call(llm_type, model, prompt, started, result=cached, cache_hit=True)
+            return cached
+
+    tokens = _request_tokens(llm_type, prompt)
+    priority = current_priority()
+    queued = 0.0
+    try:
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            usage = {}
+            waiting = time.perf_counter()
+            with await _acquire_async(llm_type, api_key, tokens, priority):
+                queued += time.perf_counter() - waiting
+                try:
+                    if llm_type == "openai":
+                        result = await ainvoke_openai(prompt, api_key, usage, model)
+                    elif llm_type == "groq":
+                        result = await ainvoke_groq(prompt, api_key, usage, model)
+                    else:
+                        result = await ainvoke_ollama(prompt, usage, model)
+                    break
+                except LLMError as e:
+                    delay = _should_retry(llm_type, api_key, e, attempt)
+                    if delay is None:
+                        raise
+            await asyncio.sleep(delay)
+    except LLMError as e:
+        _record_call(llm_type, model, prompt, started, queued, attempt, error=e)
+        raise
+
+    _record_call(llm_type, model, prompt, started, queued, attempt, usage, result)
+    scheduler.record_usage(llm_type, api_key, tokens, usage.get("total_tokens"))
+    if use_cache and isinstance(result, str):
+        response_cache.set(cache_key, result)
+    return result
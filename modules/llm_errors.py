@@ -0,0 +1,75 @@
+class LLMError(Exception):
+    """ Base class for failed LLM calls; str(e) is safe to show to the user """
+
+    def __init__(self, message, provider=None):
+        super().__init__(message)
+        self.provider = provider
+
+    @property
+    def retryable(self):
+        return False
+
+class RateLimitError(LLMError):
+    """ The provider rejected the call with 429 / rate limit exceeded """
+
+    def __init__(self, message, provider=None, retry_after=None):
+        super().__init__(message, provider)
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        return True
+
+class ProviderUnavailableError(LLMError):
+    """ Connection failure, timeout or 5xx from the provider """
+
+    @property
+    def retryable(self):
+        return True
+
+class AuthenticationError(LLMError):
+    """ Missing, invalid or unauthorized API key """
+
+class InvalidRequestError(LLMError):
+    """ The provider refused the request itself, e.g. the prompt exceeds the context window """
+
+def _retry_after(headers):
+    """ Reads Retry-After / retry-after-ms from response headers, in seconds """
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        # Retry-After may also be an HTTP date; fall back to our own backoff
+        return None
+    return None
+
+def translate_error(provider, error):
+    """ Maps an SDK / HTTP exception onto the typed LLMError hierarchy """
+    if isinstance(error, LLMError):
+        return error
+
+    label = {"openai": "OpenAI", "groq": "Groq", "ollama": "Ollama"}.get(provider, provider)
+    message = f"{label} Error: {error}"
+    name = type(error).__name__
+    status = getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+
+    # langchain's Ollama wrapper reports HTTP failures as "... status code 500 ..." ValueErrors
+    if status is None and provider == "ollama" and "status code" in str(error):
+        digits = str(error).split("status code", 1)[1].strip().split()[0].strip(".:,")
+        status = int(digits) if digits.isdigit() else None
+
+    if status == 429 or name == "RateLimitError":
+        return RateLimitError(message, provider, retry_after=_retry_after(headers))
+    if status in (401, 403) or name in ("AuthenticationError", "PermissionDeniedError"):
+        return AuthenticationError(message, provider)
+    if (status and status >= 500) or "Timeout" in name or "Connection" in name:
+        return ProviderUnavailableError(message, provider)
+    if status and 400 <= status < 500:
+        return InvalidRequestError(message, provider)
+    return LLMError(message, provider)
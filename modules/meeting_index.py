@@ -0,0 +1,203 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from config import MEETING_INDEX_PATH, MEETING_INDEX_ENABLED
+
+# Due dates and meeting dates are stored as ISO dates when they are written in one of these forms
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d %B %Y", "%B %d, %Y", "%B %d %Y", "%d %b %Y", "%b %d, %Y",
+                "%b %d %Y", "%A, %B %d, %Y"]
+
+def parse_date(text):
+    """ ISO date for the common explicit date formats, None for anything else ("Friday", "Not specified") """
+    text = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", (text or "").strip())
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+def meeting_key(transcript):
+    """ Stable ID for a meeting: the same transcript always maps to the same index entry """
+    return hashlib.sha256(transcript.encode("utf-8")).hexdigest()[:16]
+
+def _fts_query(text, column=None):
+    # Every word must match; quoting keeps user input from being read as FTS syntax
+    terms = [f'"{term}"' for term in re.findall(r"\w+", text or "")]
+    if not terms:
+        return None
+    query = " ".join(terms)
+    return f"{column} : ({query})" if column else query
+
+class MeetingIndex:
+    """ SQLite index of every processed meeting's items, participants and summary, with FTS5 search """
+
+    def __init__(self, path=MEETING_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        # Opened lazily so importing the module never touches the disk
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS meetings ("
+                " id TEXT PRIMARY KEY, title TEXT, date TEXT, held TEXT, file_name TEXT, llm_type TEXT,"
+                " invitees TEXT, summary TEXT, indexed REAL NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS items ("
+                " id INTEGER PRIMARY KEY, meeting_id TEXT NOT NULL, position INTEGER NOT NULL, type TEXT,"
+                " description TEXT, assignees TEXT, due TEXT, due_date TEXT, status TEXT);"
+                "CREATE TABLE IF NOT EXISTS participants (meeting_id TEXT NOT NULL, name TEXT NOT NULL COLLATE NOCASE);"
+                "CREATE INDEX IF NOT EXISTS meetings_indexed ON meetings (indexed);"
+                "CREATE INDEX IF NOT EXISTS items_meeting ON items (meeting_id);"
+                # No status index: a handful of statuses don't narrow the search, walking item IDs
+                # newest first and stopping at the limit is faster
+                "CREATE INDEX IF NOT EXISTS items_due ON items (due_date);"
+                "CREATE INDEX IF NOT EXISTS participants_name ON participants (name, meeting_id);"
+                "CREATE INDEX IF NOT EXISTS participants_meeting ON participants (meeting_id);"
+                # Full-text indexes keyed by the rowid of the row they mirror
+                "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(description, assignees);"
+                "CREATE VIRTUAL TABLE IF NOT EXISTS meetings_fts USING fts5(title, invitees, summary);"
+            )
+        return self._conn
+
+    def ingest(self, key, meeting, summary="", file_name="", llm_type="", participants=None):
+        """ Adds or replaces a meeting (a models.mom_state.Meeting); re-ingesting a revised MoM updates it """
+        participants = list(participants or [p.name for p in meeting.participants])
+        with self._lock:
+            conn = self._connect()
+            self._delete(conn, key)
+            conn.execute(
+                "INSERT INTO meetings (id, title, date, held, file_name, llm_type, invitees, summary, indexed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, meeting.title, meeting.date, parse_date(meeting.date), file_name, llm_type,
+                 meeting.invitees or ", ".join(participants), summary, time.time())
+            )
+            rowid = conn.execute("SELECT rowid FROM meetings WHERE id = ?", (key,)).fetchone()[0]
+            conn.execute("INSERT INTO meetings_fts (rowid, title, invitees, summary) VALUES (?, ?, ?, ?)",
+                         (rowid, meeting.title, meeting.invitees or ", ".join(participants), summary))
+            for position, item in enumerate(meeting.items):
+                cursor = conn.execute(
+                    "INSERT INTO items (meeting_id, position, type, description, assignees, due, due_date, status)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, position, item.type, item.description, item.assignees, item.due, parse_date(item.due),
+                     item.status)
+                )
+                conn.execute("INSERT INTO items_fts (rowid, description, assignees) VALUES (?, ?, ?)",
+                             (cursor.lastrowid, item.description, item.assignees))
+            conn.executemany("INSERT INTO participants (meeting_id, name) VALUES (?, ?)",
+                             [(key, name) for name in dict.fromkeys(participants)])
+            conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            conn = self._connect()
+            self._delete(conn, key)
+            conn.commit()
+
+    def _delete(self, conn, key):
+        conn.execute("DELETE FROM items_fts WHERE rowid IN (SELECT id FROM items WHERE meeting_id = ?)", (key,))
+        conn.execute("DELETE FROM meetings_fts WHERE rowid IN (SELECT rowid FROM meetings WHERE id = ?)", (key,))
+        conn.execute("DELETE FROM items WHERE meeting_id = ?", (key,))
+        conn.execute("DELETE FROM participants WHERE meeting_id = ?", (key,))
+        conn.execute("DELETE FROM meetings WHERE id = ?", (key,))
+
+    def search_items(self, text=None, assignee=None, status=None, item_type=None, due_before=None, due_after=None,
+                     last_meetings=None, limit=200):
+        """ Items across meetings matching every given filter, newest meeting first """
+        where, params = [], []
+        # Full-text: every word must appear, so "Priya" finds "Sharma, Priya"
+        match = " AND ".join(filter(None, [_fts_query(text), _fts_query(assignee, "assignees")]))
+        if match:
+            where.append("i.id IN (SELECT rowid FROM items_fts WHERE items_fts MATCH ?)")
+            params.append(match)
+        if status:
+            where.append("i.status = ? COLLATE NOCASE")
+            params.append(status)
+        if item_type:
+            where.append("i.type = ? COLLATE NOCASE")
+            params.append(item_type)
+        # ISO dates; only items with an explicit due date match
+        if due_before:
+            where.append("i.due_date <= ?")
+            params.append(due_before)
+        if due_after:
+            where.append("i.due_date >= ?")
+            params.append(due_after)
+        # Only the most recently indexed meetings
+        if last_meetings:
+            where.append("i.meeting_id IN (SELECT id FROM meetings ORDER BY indexed DESC LIMIT ?)")
+            params.append(int(last_meetings))
+
+        # Re-indexing a meeting gives its items new row IDs, so row order is newest meeting first
+        sql = ("SELECT i.type, i.description, i.assignees, i.due, i.due_date, i.status, m.id AS meeting_id,"
+               " m.title AS meeting, m.date AS meeting_date, m.file_name"
+               " FROM items i JOIN meetings m ON m.id = i.meeting_id"
+               + (" WHERE " + " AND ".join(where) if where else "")
+               + " ORDER BY i.id DESC LIMIT ?")
+        with self._lock:
+            rows = self._connect().execute(sql, params + [int(limit)]).fetchall()
+        return [dict(row) for row in rows]
+
+    def search_meetings(self, text=None, participant=None, limit=50):
+        """ Meetings whose title, invitees or summary match text, or that participant attended """
+        where, params = [], []
+        if _fts_query(text):
+            where.append("m.rowid IN (SELECT rowid FROM meetings_fts WHERE meetings_fts MATCH ?)")
+            params.append(_fts_query(text))
+        if participant:
+            where.append("m.id IN (SELECT meeting_id FROM participants WHERE name = ?"
+                         " UNION SELECT id FROM meetings WHERE rowid IN"
+                         " (SELECT rowid FROM meetings_fts WHERE meetings_fts MATCH ?))")
+            params += [participant, _fts_query(participant, "invitees") or '""']
+        sql = ("SELECT m.id, m.title, m.date, m.file_name, m.llm_type, m.invitees, m.indexed,"
+               " (SELECT COUNT(*) FROM items i WHERE i.meeting_id = m.id AND i.type = 'Action') AS actions"
+               " FROM meetings m" + (" WHERE " + " AND ".join(where) if where else "")
+               + " ORDER BY m.indexed DESC LIMIT ?")
+        with self._lock:
+            rows = self._connect().execute(sql, params + [int(limit)]).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            conn = self._connect()
+            meetings = conn.execute("SELECT COUNT(*) FROM meetings").fetchone()[0]
+            items = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        return {"meetings": meetings, "items": items}
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_meeting_index():
+    """ Returns the process-wide meeting index """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = MeetingIndex()
+    return _index
+
+def index_meeting(key, mom, summary="", file_name="", llm_type="", participants=None):
+    """
+    Parses the MoM (markdown or a Meeting) and indexes it under key, usually meeting_key(transcript).
+    Returns False when indexing is disabled or the MoM has no table.
+    """
+    from models.mom_state import parse_mom
+
+    if not MEETING_INDEX_ENABLED:
+        return False
+    meeting = parse_mom(mom) if isinstance(mom, str) else mom
+    if meeting is None:
+        return False
+    get_meeting_index().ingest(key, meeting, summary=summary or "", file_name=file_name, llm_type=llm_type,
+                               participants=participants)
+    return True
@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import logging
+import threading
+import contextvars
+import functools
+from contextlib import contextmanager
+from config import METRICS_ENABLED, METRICS_JSON_LOGS, METRICS_TEXTFILE, METRICS_PORT
+
+# Timings for parsing, LLM calls, revision and exports. Every event is kept in an
+# in-process registry (Prometheus text format), optionally logged as one JSON line,
+# and added to the per-meeting collector when one is active.
+
+logger = logging.getLogger("mom.metrics")
+
+# Seconds; LLM calls range from cache hits to multi-minute local generations
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_help = {}
+
+_collector = contextvars.ContextVar("metrics_collector", default=None)
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def inc(name, value=1, help_text="", **labels):
+    """ Adds value to a counter """
+    if not METRICS_ENABLED:
+        return
+    with _lock:
+        _help.setdefault(name, help_text)
+        key = _key(name, labels)
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(name, seconds, help_text="", **labels):
+    """ Records one duration in a histogram """
+    if not METRICS_ENABLED:
+        return
+    with _lock:
+        _help.setdefault(name, help_text)
+        key = _key(name, labels)
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0}
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                histogram["buckets"][index] += 1
+        histogram["sum"] += seconds
+        histogram["count"] += 1
+
+def emit(event, **fields):
+    """ Logs the event as a JSON line and hands it to the active per-meeting collector """
+    if not METRICS_ENABLED:
+        return
+    record = {"event": event, "ts": round(time.time(), 3), **fields}
+    collected = _collector.get()
+    if collected is not None:
+        collected.append(record)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(record, default=str))
+
+def record_stage(stage, seconds, **fields):
+    """ A timed step (parse, pipeline stage, revision, export) """
+    observe("mom_stage_seconds", seconds, "Time spent per processing step", stage=stage)
+    emit("stage", stage=stage, seconds=round(seconds, 4), **fields)
+
+def record_llm_call(provider, model, seconds, prompt_tokens=None, completion_tokens=None,
+                    cache_hit=False, queue_seconds=0.0, retries=0, error=None, streamed=False):
+    """ One invoke_llm / stream_llm / ainvoke_llm call, including retries """
+    outcome = "cache_hit" if cache_hit else (type(error).__name__ if error else "ok")
+    inc("mom_llm_requests_total", 1, "LLM calls by outcome", provider=provider, outcome=outcome)
+    if not cache_hit:
+        observe("mom_llm_request_seconds", seconds, "LLM call latency, excluding queueing",
+                provider=provider, model=model)
+        observe("mom_llm_queue_seconds", queue_seconds, "Time waiting for a provider slot or rate budget",
+                provider=provider)
+    if retries:
+        inc("mom_llm_retries_total", retries, "LLM attempts retried after a retryable error", provider=provider)
+    if prompt_tokens:
+        inc("mom_llm_tokens_total", prompt_tokens, "Tokens sent and received", provider=provider, kind="prompt")
+    if completion_tokens:
+        inc("mom_llm_tokens_total", completion_tokens, "Tokens sent and received", provider=provider,
+            kind="completion")
+    emit("llm_call", provider=provider, model=model, seconds=round(seconds, 4), queue_seconds=round(queue_seconds, 4),
+         prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cache_hit=cache_hit,
+         retries=retries, streamed=streamed, error=str(error) if error else None)
+
+def record_cache_lookup(provider, hit):
+    """ One response cache lookup, counted as a hit or a miss """
+    inc("mom_llm_cache_lookups_total", 1, "Response cache lookups by result", provider=provider,
+        result="hit" if hit else "miss")
+
+@contextmanager
+def span(stage, **fields):
+    """ Times the block as a processing step; failures are recorded with the error type """
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        record_stage(stage, time.perf_counter() - started, error=type(e).__name__, **fields)
+        raise
+    record_stage(stage, time.perf_counter() - started, **fields)
+
+def timed(stage):
+    """ Decorator form of span() """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@contextmanager
+def collect_timings():
+    """ Collects the events of everything run inside the block (and threads started with its context) """
+    events = []
+    token = _collector.set(events)
+    try:
+        yield events
+    finally:
+        _collector.reset(token)
+
+def summarize_timings(events):
+    """ Rows for a per-meeting timing table: one per step and one per provider for LLM calls """
+    rows = {}
+    for event in events:
+        if event["event"] == "stage":
+            name = event["stage"]
+        elif event["event"] == "llm_call":
+            name = f"llm:{event['provider']}" + (" (cached)" if event["cache_hit"] else "")
+        else:
+            continue
+        row = rows.setdefault(name, {"step": name, "count": 0, "seconds": 0.0, "max_seconds": 0.0,
+                                     "prompt_tokens": 0, "completion_tokens": 0, "queue_seconds": 0.0})
+        row["count"] += 1
+        row["seconds"] += event["seconds"]
+        row["max_seconds"] = max(row["max_seconds"], event["seconds"])
+        row["prompt_tokens"] += event.get("prompt_tokens") or 0
+        row["completion_tokens"] += event.get("completion_tokens") or 0
+        row["queue_seconds"] += event.get("queue_seconds") or 0.0
+    return list(rows.values())
+
+# ---------------------- Prometheus Exposition ------------------------
+
+def _labels(pairs, extra=()):
+    pairs = list(pairs) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (f'{k}="{v.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+def render_prometheus():
+    """ All metrics in the Prometheus text exposition format """
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: {**value, "buckets": list(value["buckets"])} for key, value in _histograms.items()}
+        help_texts = dict(_help)
+
+    lines = []
+    for kind, series in (("counter", counters), ("histogram", histograms)):
+        for name in sorted({key[0] for key in series}):
+            lines.append(f"# HELP {name} {help_texts.get(name, '')}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (metric, labels), value in sorted(series.items()):
+                if metric != name:
+                    continue
+                if kind == "counter":
+                    lines.append(f"{name}{_labels(labels)} {value}")
+                    continue
+                for bound, count in zip(BUCKETS, value["buckets"]):
+                    lines.append(f"{name}_bucket{_labels(labels, [('le', str(bound))])} {count}")
+                lines.append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {value['count']}")
+                lines.append(f"{name}_sum{_labels(labels)} {value['sum']:.6f}")
+                lines.append(f"{name}_count{_labels(labels)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(path=METRICS_TEXTFILE):
+    """ Writes the metrics for node_exporter's textfile collector (atomically) """
+    if not path:
+        return None
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(path + ".tmp", path)
+    return path
+
+_server = None
+_server_lock = threading.Lock()
+
+def start_metrics_server(port=METRICS_PORT, host="0.0.0.0"):
+    """ Serves /metrics on a daemon thread; safe to call on every Streamlit rerun """
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+            class MetricsHandler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    body = render_prometheus().encode("utf-8")
+                    self.send_response(200 if self.path.startswith("/metrics") else 404)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            _server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+def configure_json_logs(enabled=METRICS_JSON_LOGS):
+    """ Sends metric events to stderr as JSON lines """
+    if enabled and not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+configure_json_logs()
@@ -0,0 +1,108 @@
+import math
+import contextvars
+from contextlib import contextmanager
+from config import OLLAMA_MODEL, OPENAI_MODEL, GROQ_MODEL, LLM_CONCURRENCY, LLM_EXPECTED_COMPLETION_TOKENS, RATE_LIMITS
+from config import MODEL_CATALOG, MODEL_ROUTES, MODEL_ROUTING_ENABLED, STAGE_MODEL_OVERRIDES, CHUNK_TOKEN_BUDGET
+from modules.tokens import estimate_tokens
+
+DEFAULT_MODELS = {"ollama": OLLAMA_MODEL, "openai": OPENAI_MODEL, "groq": GROQ_MODEL}
+
+# Instruction text each stage prompt adds around the transcript, in tokens; covers the
+# longest one (the MoM prompt, ~425), as Ollama calls are sized with it (see call_tokens)
+PROMPT_OVERHEAD_TOKENS = 450
+
+_stage = contextvars.ContextVar("llm_stage", default=None)
+
+@contextmanager
+def llm_stage(stage):
+    """ Tags the LLM calls made inside the block with a stage, for per-stage model overrides """
+    token = _stage.set(stage)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+def current_stage():
+    return _stage.get()
+
+def model_info(llm_type, model):
+    """ Catalog entry for a model; unknown models get zero cost and no context limit """
+    return MODEL_CATALOG.get(llm_type, {}).get(model, {})
+
+def select_model(llm_type, prompt_tokens, stage=None):
+    """ Picks the model for a prompt of prompt_tokens: stage override first, then the size routes """
+    override = STAGE_MODEL_OVERRIDES.get(stage or current_stage(), {}).get(llm_type)
+    if override:
+        return override
+    if not MODEL_ROUTING_ENABLED:
+        return DEFAULT_MODELS[llm_type]
+    for route in MODEL_ROUTES.get(llm_type, []):
+        if route["max_tokens"] is None or prompt_tokens <= route["max_tokens"]:
+            return route["model"]
+    return DEFAULT_MODELS[llm_type]
+
+def max_prompt_tokens(llm_type):
+    """
+    Largest prompt a single call can take: chunk budget capped by the biggest routed context
+    and by the per-key tokens/min, as a provider refuses any call larger than that
+    """
+    budget = CHUNK_TOKEN_BUDGET.get(llm_type, CHUNK_TOKEN_BUDGET["ollama"])
+    # set_rate_limit updates RATE_LIMITS in place, so this follows runtime overrides
+    tpm = RATE_LIMITS.get(llm_type, {}).get("tpm")
+    if tpm:
+        budget = min(budget, tpm - LLM_EXPECTED_COMPLETION_TOKENS - PROMPT_OVERHEAD_TOKENS)
+    models = [route["model"] for route in MODEL_ROUTES.get(llm_type, [])] if MODEL_ROUTING_ENABLED \
+        else [DEFAULT_MODELS[llm_type]]
+    contexts = [model_info(llm_type, model).get("context") for model in models]
+    contexts = [context for context in contexts if context]
+    if contexts:
+        budget = min(budget, max(contexts) - LLM_EXPECTED_COMPLETION_TOKENS - PROMPT_OVERHEAD_TOKENS)
+    return budget
+
+def call_tokens(llm_type, transcript_tokens):
+    """ Largest prompt any call for a transcript makes: the transcript (or its biggest chunk) plus the longest instructions """
+    return min(transcript_tokens, max_prompt_tokens(llm_type)) + PROMPT_OVERHEAD_TOKENS
+
+# ---------------------- Estimates ------------------------
+
+def estimate_call(llm_type, prompt_tokens, completion_tokens=LLM_EXPECTED_COMPLETION_TOKENS, stage=None):
+    """ Model, cost (USD) and latency (seconds) of one call """
+    model = select_model(llm_type, prompt_tokens, stage)
+    info = model_info(llm_type, model)
+    cost = (prompt_tokens * info.get("input_cost", 0.0) + completion_tokens * info.get("output_cost", 0.0)) / 1e6
+    speed = info.get("tokens_per_second")
+    seconds = info.get("first_token_seconds", 0.0) + (completion_tokens / speed if speed else 0.0)
+    return {"stage": stage, "model": model, "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens, "cost": cost, "seconds": seconds}
+
+def estimate_run(transcript, llm_type, mode="multi", stages=("mom", "summary", "summary_table",
+                                                              "speaker_analysis", "action_items")):
+    """
+    Estimates the LLM calls the pipeline will make for transcript: one per stage in multi mode,
+    one extraction in structured mode, or one per chunk when the transcript is too long.
+    Returns {"calls", "tokens", "chunked", "cost", "seconds"}; seconds assume the provider's
+    concurrency limit, so parallel stages overlap.
+    """
+    from modules.chunker import split_transcript  # Avoids a cycle, the chunker routes through here too
+
+    tokens = estimate_tokens(transcript)
+    chunked = tokens > max_prompt_tokens(llm_type)
+    if chunked:
+        pieces = split_transcript(transcript, max_prompt_tokens(llm_type))
+        calls = [estimate_call(llm_type, estimate_tokens(piece) + PROMPT_OVERHEAD_TOKENS, stage="structured")
+                 for piece in pieces]
+    elif mode == "structured":
+        calls = [estimate_call(llm_type, tokens + PROMPT_OVERHEAD_TOKENS, stage="structured")]
+    else:
+        calls = [estimate_call(llm_type, tokens + PROMPT_OVERHEAD_TOKENS, stage=stage) for stage in stages]
+
+    concurrency = max(1, LLM_CONCURRENCY.get(llm_type, 1))
+    waves = math.ceil(len(calls) / concurrency) if calls else 0
+    slowest = max((call["seconds"] for call in calls), default=0.0)
+    return {
+        "calls": calls,
+        "tokens": tokens,
+        "chunked": chunked,
+        "cost": sum(call["cost"] for call in calls),
+        "seconds": waves * slowest,
+    }
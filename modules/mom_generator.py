@@ -1,14 +1,31 @@
-from modules.llm_client import invoke_llm
+from modules.llm_client import invoke_llm, stream_llm
 
 def generate_mom(transcript, llm_type="ollama", api_key=None):
     """ Generate structured Meeting Minutes in the exact tabular format requested """
+    return invoke_llm(build_mom_prompt(transcript), llm_type=llm_type, api_key=api_key)
 
-    prompt = f"""
-    Convert the following meeting transcript into structured Meeting Minutes (MoM) in the EXACT format shown below:
+def stream_mom(transcript, llm_type="ollama", api_key=None):
+    """ Same as generate_mom, but yields the MoM text as it is generated """
+    return stream_llm(build_mom_prompt(transcript), llm_type=llm_type, api_key=api_key)
+
+def transcript_prompt(transcript, task):
+    """
+    Every stage prompt starts with the same transcript block and puts its own instructions after it,
+    so a local model evaluates the transcript once and reuses it (prefix cache) for the other stages
+    """
+    return f"""
+    The following is a meeting transcript.
 
     TRANSCRIPT:
     {transcript}
 
+    TASK:{task}"""
+
+def build_mom_prompt(transcript):
+    """ Builds the MoM prompt shared by generate_mom and stream_mom """
+    return transcript_prompt(transcript, """
+    Convert the transcript above into structured Meeting Minutes (MoM) in the EXACT format shown below.
+
     Please generate the MoM with the following EXACT structure:
 
     # Meeting Minutes: [Extract meeting topic/title]
@@ -37,18 +54,13 @@ def generate_mom(transcript, llm_type="ollama", api_key=None):
     8. If no clear assignee, use "All" or the most relevant person
     9. Maintain the exact table format with proper markdown
     10. Extract meeting topic from the beginning of transcript or context
-    """
-
-    return invoke_llm(prompt, llm_type=llm_type, api_key=api_key)
+    """)
 
 def generate_summary_table(transcript, llm_type="ollama", api_key=None):
     """ Generate a concise summary table for quick reference """
     
-    prompt = f"""
-    Create a concise summary table from this meeting transcript:
-
-    TRANSCRIPT:
-    {transcript}
+    prompt = transcript_prompt(transcript, """
+    Create a concise summary table from the transcript above.
 
     Generate output in this format:
 
@@ -76,18 +88,15 @@ def generate_summary_table(transcript, llm_type="ollama", api_key=None):
     | Medium | [Regular task] | [Person] | [Date] |
 
     Focus on providing a quick overview of the meeting's productivity and outcomes.
-    """
+    """)
     
     return invoke_llm(prompt, llm_type=llm_type, api_key=api_key)
 
 def extract_speaker_analysis(transcript, llm_type="ollama", api_key=None):
     """ Analyze who spoke about what topics with contribution tracking """
     
-    prompt = f"""
-    Analyze the following transcript and create a detailed speaker participation analysis:
-
-    TRANSCRIPT:
-    {transcript}
+    prompt = transcript_prompt(transcript, """
+    Analyze the transcript above and create a detailed speaker participation analysis.
 
     Generate this analysis:
 
@@ -113,18 +122,15 @@ def extract_speaker_analysis(transcript, llm_type="ollama", api_key=None):
     | Total Speaking Turns | [Number] |
 
     Focus on quantifying participation and identifying key contributors.
-    """
+    """)
     
     return invoke_llm(prompt, llm_type=llm_type, api_key=api_key)
 
 def extract_action_items_only(transcript, llm_type="ollama", api_key=None):
     """ Extract only action items in a focused table """
     
-    prompt = f"""
-    From the following meeting transcript, extract ONLY the action items in this format:
-
-    TRANSCRIPT:
-    {transcript}
+    prompt = transcript_prompt(transcript, """
+    From the transcript above, extract ONLY the action items in this format:
 
     ## Action Items Tracker
 
@@ -145,6 +151,6 @@ def extract_action_items_only(transcript, llm_type="ollama", api_key=None):
     3. Extract assignee from context (who was asked, who volunteered, who mentioned they would do it)
     4. Estimate priority based on urgency mentioned in discussion
     5. Include relevant context in Notes column
-    """
+    """)
     
     return invoke_llm(prompt, llm_type=llm_type, api_key=api_key)
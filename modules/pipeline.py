@@ -0,0 +1,150 @@
+import queue
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from config import PIPELINE_MAX_WORKERS, DEFAULT_PIPELINE_MODE
+from modules.summarizer import summarize_transcript
+from modules.mom_generator import generate_mom, stream_mom, generate_summary_table, extract_speaker_analysis, extract_action_items_only
+from modules.structured_extractor import extract_structured, render_all
+from modules.chunker import needs_chunking, extract_chunked
+from modules.llm_errors import LLMError
+from modules.metrics import span
+from modules.model_router import llm_stage, call_tokens
+from modules.llm_client import ollama_prompt_size
+from modules.tokens import estimate_tokens
+from modules.speaker_analytics import render_speaker_analysis, contributions_from_mom, contributions_from_structured
+from models.mom_state import parse_mom
+
+# Stages are submitted in this order, so the MoM gets the first provider slot
+PIPELINE_STAGES = {
+    "mom": generate_mom,
+    "summary": summarize_transcript,
+    "summary_table": generate_summary_table,
+    "speaker_analysis": extract_speaker_analysis,
+    "action_items": extract_action_items_only,
+}
+
+# Stages that can stream their output token by token
+STREAMING_STAGES = {
+    "mom": stream_mom,
+}
+
+# Stage name used for (STREAM_EVENT, delta) events yielded while a stage streams
+STREAM_EVENT = "delta"
+
+STAGE_LABELS = {
+    "mom": "Meeting Minutes",
+    "summary": "Quick Summary",
+    "summary_table": "Summary Dashboard",
+    "speaker_analysis": "Speaker Analysis",
+    "action_items": "Action Items Tracker",
+}
+
+def iter_pipeline(transcript, llm_type="ollama", api_key=None, stages=None, mode=DEFAULT_PIPELINE_MODE,
+                  stream_stage=None, speaker_stats=None):
+    """
+    Runs the independent LLM stages concurrently and yields (stage, result) as each one finishes.
+    If stream_stage is given, its text deltas are also yielded as (STREAM_EVENT, delta) while it runs.
+    If speaker_stats (from compute_speaker_stats) is given, the speaker analysis is built locally
+    from it instead of being sent to the model.
+    A stage whose LLM call failed yields the LLMError itself as its result, the other stages carry on.
+    """
+    # Transcripts that overflow the context go through the map-reduce path whatever the mode
+    if mode == "structured" or needs_chunking(transcript, llm_type):
+        yield from iter_structured_pipeline(transcript, llm_type=llm_type, api_key=api_key, stages=stages,
+                                            speaker_stats=speaker_stats)
+        return
+
+    stages = list(PIPELINE_STAGES if stages is None else stages)
+    local_speakers = speaker_stats is not None and "speaker_analysis" in stages
+    if local_speakers:
+        stages.remove("speaker_analysis")
+        # The key contributions column is filled from the MoM items once they arrive
+        if "mom" not in stages:
+            yield "speaker_analysis", render_speaker_analysis(speaker_stats)
+            local_speakers = False
+
+    if not stages:
+        return
+
+    # Worker threads report deltas and finished futures through one queue
+    events = queue.Queue()
+    size = call_tokens(llm_type, estimate_tokens(transcript))
+
+    def run(stage):
+        try:
+            with span(stage), llm_stage(stage), ollama_prompt_size(size):
+                return run_stage(stage)
+        except LLMError as e:
+            return e
+
+    def run_stage(stage):
+        if stage != stream_stage or stage not in STREAMING_STAGES:
+            return PIPELINE_STAGES[stage](transcript, llm_type=llm_type, api_key=api_key)
+        parts = []
+        for delta in STREAMING_STAGES[stage](transcript, llm_type=llm_type, api_key=api_key):
+            parts.append(delta)
+            events.put((STREAM_EVENT, delta))
+        return "".join(parts)
+
+    # Provider limits are enforced inside invoke_llm, the pool only bounds local threads.
+    # Stages run in a copy of the caller's context so llm_priority() carries over to them.
+    with ThreadPoolExecutor(max_workers=min(PIPELINE_MAX_WORKERS, len(stages))) as pool:
+        futures = {}
+        for stage in stages:
+            future = pool.submit(contextvars.copy_context().run, run, stage)
+            futures[future] = stage
+            future.add_done_callback(events.put)
+
+        remaining = len(futures)
+        while remaining:
+            event = events.get()
+            if isinstance(event, tuple):
+                yield event
+                continue
+            remaining -= 1
+            stage, result = futures[event], event.result()
+            yield stage, result
+
+            if stage == "mom" and local_speakers:
+                contributions = None if isinstance(result, LLMError) else \
+                    contributions_from_mom(parse_mom(result), speaker_stats["speakers"])
+                yield "speaker_analysis", render_speaker_analysis(speaker_stats, contributions)
+
+def iter_structured_pipeline(transcript, llm_type="ollama", api_key=None, stages=None, speaker_stats=None):
+    """ Makes one extraction call (or one per chunk) and renders every requested view locally from its JSON """
+    stages = list(PIPELINE_STAGES if stages is None else stages)
+    extract = extract_chunked if needs_chunking(transcript, llm_type) else extract_structured
+    try:
+        with span("structured", chunked=extract is extract_chunked), llm_stage("structured"), \
+                ollama_prompt_size(call_tokens(llm_type, estimate_tokens(transcript))):
+            data = extract(transcript, llm_type=llm_type, api_key=api_key)
+    except LLMError as e:
+        # Every view depends on the one call, so they all report its error
+        for stage in stages:
+            yield stage, e
+        return
+    except ValueError as e:
+        # The call went through but the reply was not usable JSON
+        error = LLMError(str(e), llm_type)
+        for stage in stages:
+            yield stage, error
+        return
+
+    yield "structured", data
+    views = render_all(data)
+    if speaker_stats is not None:
+        contributions = contributions_from_structured(data, speaker_stats["speakers"])
+        views["speaker_analysis"] = render_speaker_analysis(speaker_stats, contributions)
+    for stage in stages:
+        yield stage, views[stage]
+
+def run_pipeline(transcript, llm_type="ollama", api_key=None, stages=None, mode=DEFAULT_PIPELINE_MODE,
+                 speaker_stats=None, on_result=None):
+    """ Runs the pipeline to completion and returns a dict of stage -> result """
+    results = {}
+    for stage, result in iter_pipeline(transcript, llm_type=llm_type, api_key=api_key, stages=stages, mode=mode,
+                                       speaker_stats=speaker_stats):
+        results[stage] = result
+        if on_result:
+            on_result(stage, result)
+    return results
@@ -0,0 +1,178 @@
+import hashlib
+import heapq
+import itertools
+import threading
+import time
+
+# Lower numbers are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 5
+PRIORITY_BATCH = 10
+
+class TokenBucket:
+    """ Refills continuously at per_minute / 60 per second up to per_minute """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """
+        Seconds until amount can be taken. A request larger than the bucket waits for a full
+        one: this happens when a process only has a share of the key's budget (see set_limits).
+        """
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+class _Lane:
+    """ Limits and waiting queue for one (provider, api key) pair """
+
+    def __init__(self, rpm, tpm, share=1.0):
+        self.requests = TokenBucket(max(1.0, rpm * share)) if rpm else None
+        self.tokens = TokenBucket(max(1.0, tpm * share)) if tpm else None
+        self.waiting = []          # Heap of (priority, sequence, tokens) tickets
+        self.blocked_until = 0.0
+
+    def delay(self, tokens, now):
+        """ Seconds until this lane's budget lets a call of tokens start """
+        return max(
+            self.blocked_until - now,
+            self.requests.wait_time(1, now) if self.requests else 0.0,
+            self.tokens.wait_time(tokens, now) if self.tokens else 0.0,
+        )
+
+class Lease:
+    """ Held while a request is in flight; releases the provider slot on exit """
+
+    def __init__(self, scheduler, provider):
+        self._scheduler = scheduler
+        self._provider = provider
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._scheduler._release(self._provider)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+class ProviderScheduler:
+    """
+    Shared admission control for LLM calls: a concurrency cap per provider, token buckets
+    for requests/min and tokens/min per (provider, api key), a back-off window after 429s,
+    and priority ordering so interactive calls go ahead of background and batch work.
+    Priorities order the calls of one process: a freed provider slot goes to the best waiting
+    call of any key whose budget allows it to start, so a busy key never holds back the others.
+    """
+
+    def __init__(self, rate_limits, concurrency):
+        self.rate_limits = rate_limits
+        self.concurrency = dict(concurrency)
+        self._cond = threading.Condition()
+        self._lanes = {}
+        self._in_flight = {}
+        self._counter = itertools.count()
+
+    def _lane(self, provider, api_key):
+        # Keys are hashed so raw API keys are never kept around as dict keys
+        key = (provider, hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16])
+        if key not in self._lanes:
+            limits = self.rate_limits.get(provider, {})
+            self._lanes[key] = _Lane(limits.get("rpm"), limits.get("tpm"), limits.get("share", 1.0))
+        return self._lanes[key]
+
+    def set_concurrency(self, provider, limit):
+        with self._cond:
+            self.concurrency[provider] = max(1, int(limit))
+            self._cond.notify_all()
+
+    def set_limits(self, provider, rpm=None, tpm=None, share=1.0):
+        """
+        Replaces the requests/tokens per minute budget of a provider's keys (None = unlimited).
+        share is the part of it this process may use, e.g. 1 / workers in batch worker processes.
+        """
+        with self._cond:
+            self.rate_limits[provider] = {"rpm": rpm, "tpm": tpm, "share": share}
+            for key, lane in self._lanes.items():
+                if key[0] == provider:
+                    fresh = _Lane(rpm, tpm, share)
+                    lane.requests, lane.tokens = fresh.requests, fresh.tokens
+            self._cond.notify_all()
+
+    def token_limit(self, provider):
+        """ Tokens per minute one key of provider allows (None = unlimited); no single call can be larger """
+        return self.rate_limits.get(provider, {}).get("tpm")
+
+    def _best_ready(self, provider, now):
+        """ Highest-priority ticket on provider that is first in its lane and within the lane's budget """
+        heads = [lane.waiting[0] for key, lane in self._lanes.items()
+                 if key[0] == provider and lane.waiting and lane.delay(lane.waiting[0][2], now) <= 0]
+        return min(heads, default=None)
+
+    def acquire(self, provider, api_key=None, tokens=0, priority=PRIORITY_INTERACTIVE):
+        """ Blocks until the call may start and returns a Lease that must be released """
+        limit = self.token_limit(provider)
+        if limit and tokens > limit:
+            # The provider refuses it however long it waits; callers check token_limit first
+            raise ValueError(f"A call of {tokens} tokens exceeds the {provider} limit of {limit} tokens/min")
+        with self._cond:
+            lane = self._lane(provider, api_key)
+            ticket = (priority, next(self._counter), tokens)
+            heapq.heappush(lane.waiting, ticket)
+            try:
+                while True:
+                    timeout = None
+                    if lane.waiting[0] == ticket:
+                        now = time.monotonic()
+                        delay = lane.delay(tokens, now)
+                        free = self._in_flight.get(provider, 0) < self.concurrency.get(provider, 1)
+                        # The slot is shared by every key of the provider, so it goes to the best ready ticket
+                        if delay <= 0 and free and self._best_ready(provider, now) == ticket:
+                            heapq.heappop(lane.waiting)
+                            if lane.requests:
+                                lane.requests.take(1)
+                            if lane.tokens:
+                                lane.tokens.take(tokens)
+                            self._in_flight[provider] = self._in_flight.get(provider, 0) + 1
+                            self._cond.notify_all()
+                            return Lease(self, provider)
+                        timeout = delay if delay > 0 else None
+                    self._cond.wait(timeout)
+            except BaseException:
+                lane.waiting.remove(ticket)
+                heapq.heapify(lane.waiting)
+                self._cond.notify_all()
+                raise
+
+    def _release(self, provider):
+        with self._cond:
+            self._in_flight[provider] -= 1
+            self._cond.notify_all()
+
+    def penalize(self, provider, api_key, seconds):
+        """ Holds back every call on this provider/key for the given time, e.g. after a 429 """
+        with self._cond:
+            lane = self._lane(provider, api_key)
+            lane.blocked_until = max(lane.blocked_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def record_usage(self, provider, api_key, estimated, actual):
+        """ Corrects the token bucket once the real token count of a call is known """
+        with self._cond:
+            lane = self._lane(provider, api_key)
+            if lane.tokens and actual is not None:
+                lane.tokens.tokens -= actual - estimated
@@ -1,5 +1,14 @@
+import copy
+import json
+import re
 from modules.llm_client import invoke_llm
+from modules.metrics import timed
+from modules.model_router import llm_stage
+from config import MOM_TEMPLATE_COLUMNS, VALID_TYPES, DEFAULT_STATUS
+from utils.markdown_table import format_row
+from models.mom_state import Meeting, Item, parse_mom
 
+@timed("revise")
 def revise_mom(mom_text, feedback, llm_type="ollama", api_key=None):
     """ Revises the Meeting Minutes based on human feedback """
 
@@ -28,4 +37,137 @@ def revise_mom(mom_text, feedback, llm_type="ollama", api_key=None):
     Make the requested changes while preserving the structure and format.
     """
 
-    return invoke_llm(prompt, llm_type=llm_type, api_key=api_key)
+    with llm_stage("revise"):
+        return invoke_llm(prompt, llm_type=llm_type, api_key=api_key)
+
+# ---------------------- Patch-Based Revision ------------------------
+
+@timed("revise_patch")
+def revise_mom_patch(mom_text, feedback, llm_type="ollama", api_key=None):
+    """
+    Asks the model for a small list of edits instead of a regenerated MoM and applies
+    them locally. mom_text may also be a parsed Meeting. Returns (revised_mom, edits);
+    raises ValueError if no usable edits came back.
+    """
+    meeting = _as_meeting(mom_text)
+    numbered = numbered_mom_rows(meeting) if meeting else ""
+    if not numbered:
+        raise ValueError("The MoM has no table to edit.")
+
+    prompt = f"""
+    Here are the header and numbered table rows of a Meeting Minutes document:
+
+    {mom_header(meeting)}
+
+    {numbered}
+
+    The reviewer has given the following feedback:
+    "{feedback}"
+
+    Respond with ONLY a JSON object listing the minimal edits that apply the feedback:
+
+    {{"edits": [
+      {{"op": "update", "row": 3, "fields": {{"Assignees": "John"}}}},
+      {{"op": "add", "fields": {{"Type": "Action", "Description": "...", "Assignees": "...", "Due": "", "Status": "Open"}}}},
+      {{"op": "delete", "row": 5}},
+      {{"op": "header", "field": "Date", "value": "..."}}
+    ]}}
+
+    IMPORTANT:
+    1. Row numbers refer to the numbers shown above
+    2. Only include fields that change; valid fields are {", ".join(MOM_TEMPLATE_COLUMNS)}
+    3. Use only "Information" or "Action" for Type
+    4. Header fields are Title, Date, Time and Invitees
+    5. Do not touch rows the feedback does not mention
+    """
+
+    with llm_stage("revise"):
+        text = invoke_llm(prompt, llm_type=llm_type, api_key=api_key)
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    try:
+        edits = json.loads(match.group(0))["edits"] if match else None
+    except (json.JSONDecodeError, KeyError, TypeError):
+        edits = None
+    if not isinstance(edits, list) or not edits:
+        raise ValueError(text or "Empty response from model")
+
+    return apply_mom_edits(meeting, edits), edits
+
+def _as_meeting(mom):
+    """ The helpers below take MoM markdown or a Meeting that was already parsed """
+    return mom if isinstance(mom, Meeting) else parse_mom(mom)
+
+def mom_header(mom):
+    """ Returns the lines above the MoM table (title, date, time, invitees) """
+    meeting = _as_meeting(mom)
+    return meeting.header_markdown() if meeting else mom.strip()
+
+def numbered_mom_rows(mom):
+    """ Lists the MoM table rows as '1. | Type | ... |' for the edit prompt """
+    meeting = _as_meeting(mom)
+    if not meeting:
+        return ""
+    return "\n".join(f"{number}. {format_row(item.to_row())}" for number, item in enumerate(meeting.items, start=1))
+
+def apply_mom_edits(mom, edits):
+    """
+    Applies an edit list to the MoM table and returns the new markdown. Row numbers always refer
+    to the original rows, so updates and deletes are resolved first and added rows are appended at the end.
+    Raises ValueError if any edit can't be applied (or none is given), so the caller can fall back
+    to a full rewrite instead of reporting an unchanged MoM as revised.
+    """
+    meeting = copy.deepcopy(_as_meeting(mom))
+    if not meeting:
+        raise ValueError("The MoM has no table to edit.")
+    # Item attributes are the lowercased column names
+    columns = {name.lower() for name in MOM_TEMPLATE_COLUMNS}
+    types = {name.lower(): name for name in VALID_TYPES}
+
+    def set_fields(item, fields):
+        for name, value in (fields or {}).items():
+            name = str(name).lower()
+            if name == "type":
+                # Models write "action" or "ACTION" as often as "Action"
+                value = types.get(str(value).strip().lower(), value)
+            if name in columns:
+                setattr(item, name, str(value))
+
+    deleted = set()
+    added = []
+    rejected = []
+    for number, edit in enumerate(edits, start=1):
+        if not isinstance(edit, dict):
+            rejected.append(f"edit {number} is not an object")
+            continue
+        op = str(edit.get("op", "")).lower()
+        try:
+            index = int(edit.get("row", 0)) - 1
+        except (TypeError, ValueError):
+            index = -1
+
+        if op in ("update", "delete") and not 0 <= index < len(meeting.items):
+            rejected.append(f"edit {number} ({op}) has no row {edit.get('row')!r}")
+        elif op == "update":
+            set_fields(meeting.items[index], edit.get("fields"))
+            if meeting.items[index].type not in VALID_TYPES:
+                rejected.append(f"edit {number} sets an unknown type {meeting.items[index].type!r}")
+        elif op == "delete":
+            deleted.add(index)
+        elif op == "add":
+            item = Item("", "", status=DEFAULT_STATUS)
+            set_fields(item, edit.get("fields"))
+            if item.type in VALID_TYPES and item.description:
+                added.append(item)
+            else:
+                rejected.append(f"edit {number} adds a row without a valid type and description")
+        elif op == "header" and str(edit.get("field", "")).strip():
+            meeting.set_field(str(edit.get("field", "")), str(edit.get("value", "")))
+        else:
+            rejected.append(f"edit {number} has an unknown op {op!r}")
+
+    if rejected:
+        raise ValueError("Could not apply the edits: " + "; ".join(rejected))
+    if not edits:
+        raise ValueError("No edits to apply.")
+    meeting.items = [item for index, item in enumerate(meeting.items) if index not in deleted] + added
+    return meeting.to_markdown()
@@ -0,0 +1,159 @@
+import math
+import re
+from modules.metrics import timed
+
+# numpy is imported inside the functions that use it, so importing the pipeline stays cheap
+
+# Number of windows the discussion timeline is split into
+TIMELINE_WINDOWS = 12
+
+@timed("speaker_stats")
+def compute_speaker_stats(cues):
+    """
+    Computes exact participation metrics from parsed cues: talk time, turns, words,
+    interruptions and a windowed timeline. Returns None if the cues carry no speakers.
+    """
+    import numpy as np
+
+    speakers, codes, starts, ends, words = {}, [], [], [], []
+    for cue in cues:
+        if not cue.speaker:
+            continue
+        codes.append(speakers.setdefault(cue.speaker, len(speakers)))
+        starts.append(np.nan if cue.start is None else cue.start)
+        ends.append(np.nan if cue.end is None else cue.end)
+        words.append(len(cue.text.split()))
+
+    if not codes:
+        return None
+
+    names = list(speakers)
+    count = len(names)
+    codes = np.asarray(codes, dtype=np.int64)
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+    words = np.asarray(words, dtype=np.int64)
+    durations = np.nan_to_num(np.clip(ends - starts, 0, None))
+
+    # A new turn starts wherever the speaker changes from the previous cue
+    turn_starts = np.r_[True, codes[1:] != codes[:-1]]
+    # Interruption: a different speaker starts before the previous cue has ended
+    interrupted = turn_starts[1:] & (starts[1:] < ends[:-1])
+    # Cues may lack times (a DOCX gives the last cue no end), so the span only uses finite ones
+    known_starts = starts[np.isfinite(starts)]
+    bounds = np.r_[known_starts, ends[np.isfinite(ends)]]
+
+    stats = {
+        "speakers": names,
+        "talk_time": np.bincount(codes, weights=durations, minlength=count),
+        "words": np.bincount(codes, weights=words, minlength=count).astype(np.int64),
+        "turns": np.bincount(codes[turn_starts], minlength=count),
+        "interruptions": np.bincount(codes[1:][interrupted], minlength=count),
+        "total_turns": int(turn_starts.sum()),
+        "duration": float(bounds.max() - known_starts.min()) if known_starts.size else 0.0,
+        "timeline": [],
+    }
+
+    if stats["duration"] > 0:
+        origin = known_starts.min()
+        window = max(60.0, np.ceil(stats["duration"] / TIMELINE_WINDOWS / 60) * 60)
+        windows = ((np.where(np.isfinite(starts), starts, origin) - origin) // window).astype(np.int64)
+        # Talk time per (window, speaker) in one pass
+        grid = np.bincount(windows * count + codes, weights=durations,
+                           minlength=(windows.max() + 1) * count).reshape(-1, count)
+        for index, row in enumerate(grid):
+            active = np.flatnonzero(row)
+            if active.size:
+                stats["timeline"].append({
+                    "start": origin + index * window,
+                    "end": origin + (index + 1) * window,
+                    "leader": names[int(row.argmax())],
+                    "speakers": [names[i] for i in active[np.argsort(-row[active])]],
+                })
+    return stats
+
+def contributions_from_mom(meeting, speakers):
+    """ Maps each speaker to the items of a parsed MoM (see models.mom_state.parse_mom) assigned to or shared by them """
+    contributions = {name: [] for name in speakers}
+    for item in meeting.items if meeting else []:
+        for name in speakers:
+            if _mentions(item.assignees, name):
+                contributions[name].append(item.description)
+    return contributions
+
+def contributions_from_structured(data, speakers):
+    """ Maps each speaker to the contributions listed in a structured extraction """
+    contributions = {name: [] for name in speakers}
+    for person in data["participants"]:
+        for name in speakers:
+            if _mentions(person["name"], name):
+                contributions[name].extend(person["contributions"])
+    return contributions
+
+def _name_parts(name):
+    # "Choudhari, Aman (external - Project)" -> {"choudhari", "aman"}
+    return {part for part in re.findall(r"[a-z]+", name.split("(")[0].lower()) if len(part) > 2}
+
+def _mentions(text, name):
+    """ True if text refers to the speaker by any part of their name """
+    return bool(_name_parts(name) & set(re.findall(r"[a-z]+", text.lower())))
+
+def _clock(seconds):
+    if not math.isfinite(seconds):
+        return "-"
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}" if seconds >= 3600 else f"{seconds // 60}:{seconds % 60:02d}"
+
+def render_speaker_analysis(stats, contributions=None):
+    """ Renders the speaker analysis tables from computed stats """
+    import numpy as np
+
+    contributions = contributions or {}
+    names = stats["speakers"]
+    total_time = float(stats["talk_time"].sum())
+    total_words = int(stats["words"].sum())
+    # Share of talk time, falling back to share of words when there are no timestamps
+    shares = stats["talk_time"] / total_time if total_time else stats["words"] / max(total_words, 1)
+    fair_share = 1 / len(names)
+
+    lines = [
+        "## Speaker Contribution Analysis",
+        "",
+        "| Speaker | Talk Time | Share | Turns | Words | Interruptions | Key Contributions | Participation Level |",
+        "|---------|-----------|-------|-------|-------|---------------|-------------------|---------------------|",
+    ]
+    for i in np.argsort(-shares, kind="stable"):
+        name = names[i]
+        level = "High" if shares[i] >= fair_share * 1.25 else "Medium" if shares[i] >= fair_share * 0.5 else "Low"
+        key = "; ".join(contributions.get(name) or []) or "-"
+        lines.append(
+            f"| {name} | {_clock(stats['talk_time'][i])} | {shares[i]:.0%} | {stats['turns'][i]} | "
+            f"{stats['words'][i]} | {stats['interruptions'][i]} | {key.replace('|', '/')} | {level} |"
+        )
+
+    if stats["timeline"]:
+        lines += [
+            "",
+            "## Discussion Timeline",
+            "| Time | Most Active | Speakers |",
+            "|------|-------------|----------|",
+        ]
+        for window in stats["timeline"]:
+            lines.append(
+                f"| {_clock(window['start'])} - {_clock(window['end'])} | {window['leader']} | {', '.join(window['speakers'])} |"
+            )
+
+    lines += [
+        "",
+        "## Meeting Engagement Metrics",
+        "| Metric | Value |",
+        "|--------|-------|",
+        f"| Most Active Speaker | {names[int(np.argmax(shares))]} |",
+        f"| Most Speaking Turns | {names[int(np.argmax(stats['turns']))]} |",
+        f"| Total Speaking Turns | {stats['total_turns']} |",
+        f"| Total Interruptions | {int(stats['interruptions'].sum())} |",
+        f"| Total Words Spoken | {total_words} |",
+    ]
+    if math.isfinite(stats["duration"]) and stats["duration"] > 0:
+        lines.append(f"| Meeting Duration | {_clock(stats['duration'])} |")
+    return "\n".join(lines)
@@ -0,0 +1,291 @@
+import json
+import re
+from modules.llm_client import invoke_llm
+from modules.mom_generator import transcript_prompt
+from config import DEFAULT_STATUS
+from models.mom_state import Meeting, Participant, Item
+
+PRIORITY_ORDER = {"High": 0, "Medium": 1, "Low": 2}
+
+def extract_structured(transcript, llm_type="ollama", api_key=None):
+    """ Extracts participants, items, topics and summary from the transcript in a single LLM call """
+
+    prompt = transcript_prompt(transcript, """
+    Extract the content of the transcript above as JSON.
+
+    Respond with ONLY a JSON object (no markdown, no commentary) using this exact schema:
+
+    {
+      "title": "Meeting topic/title",
+      "date": "Date if mentioned, otherwise empty string",
+      "time": "Time if mentioned, otherwise empty string",
+      "duration": "Meeting duration if mentioned, otherwise empty string",
+      "participants": [
+        {"name": "Full name", "contributions": ["Main topic or point this person contributed"]}
+      ],
+      "information_items": [
+        {"description": "Detailed description of information shared", "shared_by": "Person who shared it"}
+      ],
+      "action_items": [
+        {"description": "Specific task with clear deliverable", "assignees": ["Person assigned"],
+          "due": "Due date if explicitly mentioned, otherwise empty string",
+          "priority": "High, Medium or Low", "notes": "Additional context"}
+      ],
+      "topics": [
+        {"topic": "Topic name", "discussed_by": "Main speaker", "outcome": "Information or Action"}
+      ],
+      "summary": ["Key point, decision or outcome of the meeting"]
+    }
+
+    IMPORTANT INSTRUCTIONS:
+    1. Information items are for things discussed, shared, or explained
+    2. Action items are for tasks that need to be completed
+    3. Extract assignees from context (who was asked, who volunteered, who mentioned they would do it)
+    4. If no clear assignee, use "All" or the most relevant person
+    5. Estimate priority based on urgency mentioned in discussion
+    6. List every participant mentioned in the transcript exactly once
+    """)
+
+    return parse_structured_output(invoke_llm(prompt, llm_type=llm_type, api_key=api_key))
+
+def parse_structured_output(text):
+    """ Parses the model's JSON reply into a normalized dict, raising ValueError if it is not JSON """
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if not match:
+        raise ValueError(text or "Empty response from model")
+
+    try:
+        raw = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Model returned invalid JSON: {e}")
+
+    return normalize_structured(raw)
+
+def normalize_structured(raw):
+    """ Fills in defaults so the renderers never have to check for missing keys """
+
+    def text(value):
+        return str(value).strip() if value is not None else ""
+
+    def listed(value):
+        # A single value where a list was asked for
+        if value is None:
+            return []
+        return list(value) if isinstance(value, (list, tuple)) else [value]
+
+    def names(value):
+        if isinstance(value, str):
+            value = [part for part in re.split(r",|\band\b", value)]
+        return [text(name) for name in listed(value) if text(name)]
+
+    def entries(value, key):
+        """ The dict entries of a list; a bare string is taken as its key field, anything else is skipped """
+        for entry in listed(value):
+            if isinstance(entry, str):
+                yield {key: entry}
+            elif isinstance(entry, dict):
+                yield entry
+
+    data = {
+        "title": text(raw.get("title")) or "Meeting",
+        "date": text(raw.get("date")),
+        "time": text(raw.get("time")),
+        "duration": text(raw.get("duration")),
+        "participants": [],
+        "information_items": [],
+        "action_items": [],
+        "topics": [],
+        "summary": [text(point) for point in listed(raw.get("summary")) if text(point)],
+    }
+
+    for person in entries(raw.get("participants"), "name"):
+        if text(person.get("name")):
+            data["participants"].append({
+                "name": text(person.get("name")),
+                "contributions": [text(c) for c in listed(person.get("contributions")) if text(c)],
+            })
+
+    for item in entries(raw.get("information_items"), "description"):
+        if text(item.get("description")):
+            data["information_items"].append({
+                "description": text(item.get("description")),
+                "shared_by": text(item.get("shared_by")) or "All",
+            })
+
+    for item in entries(raw.get("action_items"), "description"):
+        if text(item.get("description")):
+            priority = text(item.get("priority")).capitalize()
+            if priority in ("Med", "Medium"):
+                priority = "Medium"
+            data["action_items"].append({
+                "description": text(item.get("description")),
+                "assignees": names(item.get("assignees")) or ["All"],
+                "due": text(item.get("due")),
+                "priority": priority if priority in PRIORITY_ORDER else "Medium",
+                "notes": text(item.get("notes")),
+            })
+
+    for topic in entries(raw.get("topics"), "topic"):
+        if text(topic.get("topic")):
+            data["topics"].append({
+                "topic": text(topic.get("topic")),
+                "discussed_by": text(topic.get("discussed_by")),
+                "outcome": text(topic.get("outcome")) or "Information",
+            })
+
+    return data
+
+# ---------------------- Local Renderers ------------------------
+
+def _cell(value):
+    """ Escapes a value so it can't break the markdown table """
+    return str(value).replace("|", "/").replace("\n", " ").strip()
+
+def meeting_from_structured(data):
+    """ Builds the Meeting model (header, participants and item table) from an extraction """
+    participants = [Participant(p["name"], list(p["contributions"])) for p in data["participants"]]
+    items = [Item("Information", _cell(item["description"]), _cell(item["shared_by"]), "", DEFAULT_STATUS)
+             for item in data["information_items"]]
+    items += [Item("Action", _cell(item["description"]), _cell(", ".join(item["assignees"])), _cell(item["due"]),
+                   DEFAULT_STATUS)
+              for item in data["action_items"]]
+    return Meeting(
+        heading=f"Meeting Minutes: {data['title']}",
+        date=data["date"] or "Not specified",
+        time=data["time"] or "Not specified",
+        invitees=", ".join(p.name for p in participants) or "Not specified",
+        participants=participants,
+        items=items,
+        footer="**How was the meeting?** Check out the feedback!",
+    )
+
+def render_mom(data):
+    """ Renders the MoM in the same tabular format as generate_mom """
+    return meeting_from_structured(data).to_markdown()
+
+def render_summary(data):
+    """ Renders the key points as a bullet list """
+    points = data["summary"] or [item["description"] for item in data["information_items"]]
+    return "\n".join(f"- {point}" for point in points) or "No key points were identified."
+
+def render_summary_table(data):
+    """ Renders the summary dashboard with counts computed from the extracted items """
+    actions = data["action_items"]
+    items = data["information_items"] + actions
+    with_assignees = len(data["information_items"]) + sum(1 for a in actions if a["assignees"] != ["All"])
+    lines = [
+        "## Meeting Summary Dashboard",
+        "",
+        "| Metric | Count/Details |",
+        "|--------|---------------|",
+        f"| **Total Participants** | {len(data['participants'])} |",
+        f"| **Information Items** | {len(data['information_items'])} |",
+        f"| **Action Items** | {len(actions)} |",
+        f"| **Items with Assignees** | {with_assignees} of {len(items)} |",
+        f"| **Items with Due Dates** | {sum(1 for a in actions if a['due'])} |",
+        f"| **Meeting Duration** | {_cell(data['duration']) or 'Not mentioned'} |",
+        "",
+        "## Key Topics Covered",
+        "| Topic | Discussed By | Outcome |",
+        "|-------|--------------|---------|",
+    ]
+    for topic in data["topics"]:
+        lines.append(f"| {_cell(topic['topic'])} | {_cell(topic['discussed_by'])} | {_cell(topic['outcome'])} |")
+
+    lines += [
+        "",
+        "## Action Items Summary",
+        "| Priority | Task | Owner | Due Date |",
+        "|----------|------|-------|----------|",
+    ]
+    for action in sorted(actions, key=lambda a: PRIORITY_ORDER[a["priority"]]):
+        lines.append(f"| {action['priority']} | {_cell(action['description'])} | {_cell(', '.join(action['assignees']))} | {_cell(action['due'])} |")
+    return "\n".join(lines)
+
+def _participation(data):
+    """ Counts information items shared and actions assigned per participant """
+    counts = {p["name"]: {"information": 0, "actions": 0} for p in data["participants"]}
+    for item in data["information_items"]:
+        counts.setdefault(item["shared_by"], {"information": 0, "actions": 0})["information"] += 1
+    for item in data["action_items"]:
+        for name in item["assignees"]:
+            counts.setdefault(name, {"information": 0, "actions": 0})["actions"] += 1
+    counts.pop("All", None)
+    return counts
+
+def render_speaker_analysis(data):
+    """ Renders the speaker contribution analysis from the extracted items """
+    counts = _participation(data)
+    contributions = {p["name"]: p["contributions"] for p in data["participants"]}
+    busiest = max((c["information"] + c["actions"] for c in counts.values()), default=0)
+
+    lines = [
+        "## Speaker Contribution Analysis",
+        "",
+        "| Speaker | Information Shared | Actions Assigned | Key Contributions | Participation Level |",
+        "|---------|-------------------|------------------|-------------------|-------------------|",
+    ]
+    for name, count in counts.items():
+        total = count["information"] + count["actions"]
+        level = "High" if busiest and total >= busiest * 2 / 3 else "Medium" if total >= busiest / 3 and total else "Low"
+        key = "; ".join(contributions.get(name) or []) or "-"
+        lines.append(f"| {_cell(name)} | {count['information']} | {count['actions']} | {_cell(key)} | {level} |")
+
+    lines += [
+        "",
+        "## Discussion Timeline",
+        "| Order | Speaker | Type | Topic |",
+        "|-------|---------|------|-------|",
+    ]
+    for order, topic in enumerate(data["topics"], start=1):
+        lines.append(f"| {order} | {_cell(topic['discussed_by'])} | {_cell(topic['outcome'])} | {_cell(topic['topic'])} |")
+
+    def leader(*keys):
+        total = lambda n: sum(counts[n][key] for key in keys)
+        name = max(counts, key=total, default=None)
+        return name if name and total(name) else "-"
+
+    lines += [
+        "",
+        "## Meeting Engagement Metrics",
+        "| Metric | Value |",
+        "|--------|-------|",
+        f"| Most Active Speaker | {leader('information', 'actions')} |",
+        f"| Most Action Items Assigned | {leader('actions')} |",
+        f"| Most Information Shared | {leader('information')} |",
+    ]
+    return "\n".join(lines)
+
+def render_action_items(data):
+    """ Renders the action items tracker with locally computed totals """
+    actions = data["action_items"]
+    lines = [
+        "## Action Items Tracker",
+        "",
+        "| # | Action Item | Assigned To | Due Date | Priority | Status | Notes |",
+        "|---|-------------|-------------|----------|----------|--------|-------|",
+    ]
+    for number, action in enumerate(actions, start=1):
+        lines.append(
+            f"| {number} | {_cell(action['description'])} | {_cell(', '.join(action['assignees']))} | "
+            f"{_cell(action['due'])} | {action['priority']} | {DEFAULT_STATUS} | {_cell(action['notes'])} |"
+        )
+    lines += [
+        "",
+        "## Action Items Summary",
+        f"- **Total Action Items**: {len(actions)}",
+        f"- **Items with Due Dates**: {sum(1 for a in actions if a['due'])}",
+        f"- **High Priority Items**: {sum(1 for a in actions if a['priority'] == 'High')}",
+        f"- **Unassigned Items**: {sum(1 for a in actions if a['assignees'] == ['All'])}",
+    ]
+    return "\n".join(lines)
+
+def render_all(data):
+    """ Renders every view from one extraction so they always agree with each other """
+    return {
+        "mom": render_mom(data),
+        "summary": render_summary(data),
+        "summary_table": render_summary_table(data),
+        "speaker_analysis": render_speaker_analysis(data),
+        "action_items": render_action_items(data),
+    }
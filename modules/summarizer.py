@@ -1,14 +1,13 @@
 from modules.llm_client import invoke_llm
+from modules.mom_generator import transcript_prompt
 
 def summarize_transcript(transcript, llm_type="ollama", api_key=None):
     """ Summarizes transcript using the selected LLM """
     
-    prompt = f"""
-    Summarize the following meeting transcript into key points:
-
-    {transcript}
+    prompt = transcript_prompt(transcript, """
+    Summarize the transcript above into key points.
 
     Ensure clarity, concise structure, and keep important decisions & action items.
-    """
+    """)
 
     return invoke_llm(prompt, llm_type=llm_type, api_key=api_key)
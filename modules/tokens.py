@@ -0,0 +1,8 @@
+# Rough tokens-per-character ratio for English text with BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text):
+    """ Cheap local estimate of the number of tokens in text """
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
@@ -0,0 +1,136 @@
+import re
+from typing import NamedTuple
+from config import TRANSCRIPT_COMPACTION
+from modules.tokens import estimate_tokens, CHARS_PER_TOKEN
+from modules.transcript_parser import iter_cues, format_cues
+from modules.metrics import timed
+
+class CompactTranscript(NamedTuple):
+    """ Prompt-ready transcript plus the stats of the compaction that produced it """
+    text: str
+    legend: dict          # short speaker ID -> full name
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def reduction(self):
+        return 1 - self.tokens_after / self.tokens_before if self.tokens_before else 0.0
+
+    @property
+    def legend_line(self):
+        """ The SPEAKERS line that opens text, or "" without speaker IDs """
+        return format_legend(self.legend)
+
+    @property
+    def body(self):
+        """ text without the legend line, e.g. to split it and put the legend on every chunk """
+        return split_legend(self.text)[1]
+
+_LEGEND_PREFIX = "SPEAKERS: "
+
+def format_legend(legend):
+    """ The line mapping short speaker IDs to full names, as the first line of a compacted transcript """
+    if not legend:
+        return ""
+    return _LEGEND_PREFIX + "; ".join(f"{sid} = {name}" for sid, name in legend.items()) + " (use full names in your output)"
+
+def split_legend(text):
+    """ Returns (legend line, rest) for a compacted transcript; the legend is "" when it has none """
+    first, _, rest = text.partition("\n")
+    if first.startswith(_LEGEND_PREFIX):
+        return first, rest
+    return "", text
+
+# Utterances made up only of these phrases carry no content for the minutes. Assent
+# ("Yes.", "Sure.", "Go ahead.") is kept: it shows who agreed to or accepted an item.
+_FILLER_PHRASES = [
+    "um", "uh", "erm", "er", "hmm", "mm", "mhm", "mm-hmm", "uh-huh", "ah", "oh",
+    "thanks", "thank you", "thank you so much", "hi", "hello", "hey",
+    "bye", "good morning", "good afternoon", "can you hear me", "you can hear me", "i can hear you",
+    "can you see my screen", "are you able to hear me", "one second", "just a second", "sorry",
+    "you are on mute", "you're on mute", "i'm here", "so", "and",
+]
+_FILLER_UTTERANCE_RE = re.compile(
+    r"^(?:(?:%s)[\s,.!?]*)+$" % "|".join(sorted((re.escape(p) for p in _FILLER_PHRASES), key=len, reverse=True)),
+    re.IGNORECASE,
+)
+# Hesitation sounds are dropped wherever they appear
+_HESITATION_RE = re.compile(r"(?:,\s*)?\b(?:um+|uh+|erm+|hmm+|mm-hmm|uh-huh)\b,?", re.IGNORECASE)
+# Stutters are repeated words; numbers ("20 20 dollars") and grammatical repeats ("had had") stay
+_REPEATED_WORD_RE = re.compile(r"\b([^\W\d_]+)(?:\s+\1\b)+", re.IGNORECASE)
+_GRAMMATICAL_REPEATS = {"had", "that", "is"}
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+def _collapse_stutter(match):
+    word = match.group(1)
+    return match.group(0) if word.lower() in _GRAMMATICAL_REPEATS else word
+
+def clean_utterance(text):
+    """ Strips hesitations, stutters and back-to-back repeated sentences from one utterance """
+    if _FILLER_UTTERANCE_RE.match(text.strip()):
+        return ""
+    text = _HESITATION_RE.sub("", text)
+    text = " ".join(_REPEATED_WORD_RE.sub(_collapse_stutter, text).split())
+
+    sentences = []
+    for sentence in _SENTENCE_RE.split(text):
+        sentence = sentence.strip()
+        if not sentence or _FILLER_UTTERANCE_RE.match(sentence):
+            continue
+        if sentences and sentence.lower() == sentences[-1].lower():
+            continue
+        sentences.append(sentence)
+    return " ".join(sentences)
+
+def compact_cues(cues):
+    """
+    Merges consecutive cues from the same speaker and drops filler and duplicates. Speaker
+    names are replaced with short IDs (S1, S2, ...) only when that beats the legend it
+    needs, and the plain transcript is kept if compacting would not shorten it.
+    Returns a CompactTranscript.
+    """
+    cues = list(cues)
+    original = format_cues(cues, with_speakers=True)
+    speaker_ids = {}
+    turns = []              # [speaker, [sentences]]
+
+    for cue in cues:
+        # Speakers keep their place in the legend even if everything they said was filler
+        if cue.speaker:
+            speaker_ids.setdefault(cue.speaker, f"S{len(speaker_ids) + 1}")
+
+        text = clean_utterance(cue.text)
+        if not text:
+            continue
+
+        if turns and turns[-1][0] == cue.speaker:
+            # Teams repeats the tail of a caption at the start of the next one
+            if text.lower() != turns[-1][1][-1].lower():
+                turns[-1][1].append(text)
+        else:
+            turns.append([cue.speaker, [text]])
+
+    def render(labels):
+        return [f"{labels[speaker]}: {' '.join(texts)}" if speaker else " ".join(texts) for speaker, texts in turns]
+
+    legend = {sid: name for name, sid in speaker_ids.items()}
+    abbreviated = "\n".join(([format_legend(legend)] if legend else []) + render(speaker_ids))
+    named = "\n".join(render({name: name for name in speaker_ids}))
+    # On a tie the less rewritten text wins; a transcript of nothing but filler is sent as is
+    options = [(original, {})] + ([(named, {}), (abbreviated, legend)] if turns else [])
+    text, legend = min(options, key=lambda option: estimate_tokens(option[0]))
+    return CompactTranscript(
+        text=text,
+        legend=legend,
+        tokens_before=estimate_tokens(original),
+        tokens_after=estimate_tokens(text),
+    )
+
+@timed("parse")
+def prepare_transcript(file_path, compact=TRANSCRIPT_COMPACTION):
+    """ Parses a transcript file into the text sent to the LLM stages """
+    if not compact:
+        text = format_cues(iter_cues(file_path), with_speakers=True)
+        tokens = estimate_tokens(text)
+        return CompactTranscript(text, {}, tokens, tokens)
+    return compact_cues(iter_cues(file_path))
@@ -1,35 +1,198 @@
 import os
-import webvtt
-import docx
+import re
+import html
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from modules.metrics import span
 
-def extract_transcript(file_path: str) -> str:
+class Cue(NamedTuple):
+    """ One caption/utterance: times are in seconds, speaker is "" when unknown """
+    start: Optional[float]
+    end: Optional[float]
+    speaker: str
+    text: str
+
+_TIMING_RE = re.compile(r"^\s*((?:\d+:)?\d{1,2}:\d{2}(?:[.,]\d{1,3})?)\s+-->\s+((?:\d+:)?\d{1,2}:\d{2}(?:[.,]\d{1,3})?)")
+_VOICE_RE = re.compile(r"<v(?:\.[^\s>]+)*\s+([^>]+)>")
+_TAG_RE = re.compile(r"<[^>]+>")
+# End of a cue block: a line break followed by an empty line
+_BLOCK_END_RE = re.compile(rb"\r?\n[ \t]*\r?\n")
+
+def extract_transcript(file_path: str, with_speakers: bool = False) -> str:
     """
     Extract transcript text from VTT or DOCX file.
     Supported extensions: .vtt, .docx
+    With with_speakers=True each line is prefixed with its speaker ("Name: text").
     """
     try:
         if file_path.endswith(".vtt"):
-            return extract_from_vtt(file_path)
+            with span("parse", format="vtt"):
+                return extract_from_vtt(file_path, with_speakers=with_speakers)
         elif file_path.endswith(".docx"):
-            return extract_from_docx(file_path)
+            with span("parse", format="docx"):
+                return extract_from_docx(file_path, with_speakers=with_speakers)
         else:
             raise ValueError("❌ Unsupported file format! Please upload a .vtt or .docx file.")
     except Exception as e:
         return f"⚠️ Error extracting transcript: {str(e)}"
 
-def extract_from_vtt(file_path: str) -> str:
+def extract_from_vtt(file_path: str, with_speakers: bool = False) -> str:
     """Extracts transcript text from VTT (WebVTT) file."""
     try:
-        text = [caption.text for caption in webvtt.read(file_path)]
-        return "\n".join(text)
+        return format_cues(iter_vtt_cues(file_path), with_speakers=with_speakers)
     except Exception as e:
         return f"⚠️ Error parsing VTT file: {str(e)}"
 
-def extract_from_docx(file_path: str) -> str:
+def extract_from_docx(file_path: str, with_speakers: bool = False) -> str:
     """Extracts transcript text from DOCX file."""
     try:
-        doc = docx.Document(file_path)
-        text = [para.text for para in doc.paragraphs if para.text.strip()]
-        return "\n".join(text)
+        return format_cues(iter_docx_cues(file_path), with_speakers=with_speakers)
     except Exception as e:
         return f"⚠️ Error parsing DOCX file: {str(e)}"
+
+def format_cues(cues, with_speakers: bool = True) -> str:
+    """Joins cues into one line per cue, optionally labelled with the speaker."""
+    lines = []
+    for cue in cues:
+        if with_speakers and cue.speaker:
+            lines.append(f"{cue.speaker}: {cue.text}")
+        else:
+            lines.append(cue.text)
+    return "\n".join(lines)
+
+def iter_cues(file_path: str) -> Iterator[Cue]:
+    """Yields cue records for any supported transcript format."""
+    if file_path.endswith(".vtt"):
+        yield from iter_vtt_cues(file_path)
+    elif file_path.endswith(".docx"):
+        yield from iter_docx_cues(file_path)
+    else:
+        raise ValueError("❌ Unsupported file format! Please upload a .vtt or .docx file.")
+
+# ---------------------- Streaming VTT Parser ------------------------
+
+def parse_timestamp(value: str) -> float:
+    """Converts a WebVTT timestamp (hh:mm:ss.ttt or mm:ss.ttt) to seconds."""
+    seconds = 0.0
+    for part in value.replace(",", ".").split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+def iter_vtt_cues(file_path: str) -> Iterator[Cue]:
+    """
+    Single-pass WebVTT parser that yields one Cue per caption block.
+    Reads the file line by line, so memory stays flat however long the meeting is.
+    Teams voice tags (<v Speaker Name>) become the cue speaker.
+    """
+    with open(file_path, encoding="utf-8-sig", errors="replace") as f:
+        yield from parse_vtt_lines(f)
+
+def parse_vtt_lines(lines: Iterable[str]) -> Iterator[Cue]:
+    """Yields the cues of WebVTT text given line by line."""
+    timing, text_lines = None, []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            cue = _build_cue(timing, text_lines)
+            if cue:
+                yield cue
+            timing, text_lines = None, []
+            continue
+
+        if timing is None:
+            # Header, NOTE/STYLE blocks and cue identifiers sit before the timing line
+            match = _TIMING_RE.match(line)
+            if match:
+                timing = match.groups()
+        else:
+            text_lines.append(line)
+
+    cue = _build_cue(timing, text_lines)
+    if cue:
+        yield cue
+
+def read_new_vtt_cues(file_path: str, offset: int = 0) -> Tuple[List[Cue], int]:
+    """
+    Parses the cues appended to a VTT file after byte offset, for files that are still being written.
+    Only complete cue blocks (followed by an empty line) are read; returns them with the offset to resume from.
+    """
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+
+    end = None
+    for end in _BLOCK_END_RE.finditer(data):
+        pass
+    if end is None:
+        return [], offset
+
+    text = data[:end.end()].decode("utf-8-sig" if offset == 0 else "utf-8", errors="replace")
+    return list(parse_vtt_lines(text.splitlines())), offset + end.end()
+
+def _build_cue(timing, text_lines) -> Optional[Cue]:
+    if not timing or not text_lines:
+        return None
+    raw = " ".join(text_lines)
+    voice = _VOICE_RE.search(raw)
+    speaker = html.unescape(voice.group(1).strip()) if voice else ""
+    text = " ".join(html.unescape(_TAG_RE.sub("", raw)).split())
+    if not text:
+        return None
+    return Cue(parse_timestamp(timing[0]), parse_timestamp(timing[1]), speaker, text)
+
+# ---------------------- Streaming DOCX Parser ------------------------
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# Teams puts "Speaker Name   0:03:12" (or "12:05") on its own line before each utterance
+_DOCX_HEADER_RE = re.compile(r"^\s*(?P<speaker>\S.*?)(?:\s{2,}|\t)(?P<time>(?:\d+:)?\d{1,2}:\d{2})\s*$")
+
+def iter_docx_lines(file_path: str) -> Iterator[str]:
+    """
+    Streams the text lines of a DOCX straight from word/document.xml. Paragraphs and line
+    breaks end a line; each paragraph is dropped once read, so memory stays flat.
+    """
+    import zipfile
+    from xml.etree.ElementTree import iterparse
+
+    with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as xml:
+        body, parts = None, []
+        for event, element in iterparse(xml, events=("start", "end")):
+            if event == "start":
+                if element.tag == f"{_W}body":
+                    body = element
+                continue
+            tag = element.tag
+            if tag == f"{_W}t":
+                parts.append(element.text or "")
+            elif tag == f"{_W}tab":
+                parts.append("\t")
+            elif tag in (f"{_W}br", f"{_W}cr"):
+                parts.append("\n")
+            elif tag == f"{_W}p":
+                for line in "".join(parts).split("\n"):
+                    if line.strip():
+                        yield line
+                parts = []
+                # Finished paragraphs (and tables around them) are no longer needed
+                element.clear()
+                if body is not None:
+                    body.clear()
+
+def iter_docx_cues(file_path: str) -> Iterator[Cue]:
+    """
+    Yields one Cue per utterance of a Teams DOCX transcript. A cue runs from its speaker header
+    to the next one, which also gives its end time. Documents without Teams headers yield one
+    cue per line, with no speaker or times.
+    """
+    speaker, start, text_lines = None, None, []
+    for line in iter_docx_lines(file_path):
+        header = _DOCX_HEADER_RE.match(line)
+        if header:
+            if speaker is not None and text_lines:
+                yield Cue(start, parse_timestamp(header.group("time")), speaker, " ".join(text_lines))
+            speaker, start, text_lines = header.group("speaker").strip(), parse_timestamp(header.group("time")), []
+        elif speaker is None:
+            yield Cue(None, None, "", " ".join(line.split()))
+        else:
+            text_lines.append(" ".join(line.split()))
+    if speaker is not None and text_lines:
+        yield Cue(start, None, speaker, " ".join(text_lines))
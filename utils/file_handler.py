@@ -1,48 +1,229 @@
 import os
-from fpdf import FPDF
-from docx import Document
-from config import UPLOAD_FOLDER, DOWNLOAD_FOLDER
+import io
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from config import UPLOAD_FOLDER, DOWNLOAD_FOLDER, EXPORT_CACHE_SIZE, MOM_TEMPLATE_COLUMNS
+from models.mom_state import Meeting
+from utils.markdown_table import iter_table_spans
+from modules.metrics import timed
 
 def save_uploaded_file(uploaded_file):
-    """Save uploaded file to UPLOAD_FOLDER and return file path."""
+    """Saves the upload under a hash of its content and returns the path; identical uploads share one file."""
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-    file_path = os.path.join(UPLOAD_FOLDER, uploaded_file.name)
-    with open(file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+    data = uploaded_file.getbuffer()
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    file_path = os.path.join(UPLOAD_FOLDER, hashlib.sha256(data).hexdigest()[:32] + extension)
+    if not os.path.exists(file_path):
+        # Written to a temp file first so a concurrent upload of the same file never reads it half-written
+        temp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, file_path)
 
     return file_path
 
+def file_digest(file_path):
+    """SHA-256 of a file's content, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ---------------------- In-Memory Export ------------------------
+
+_export_cache = OrderedDict()
+_export_lock = threading.Lock()
+
+def _cached_export(kind, content, title, render):
+    """Returns rendered bytes for (kind, title, content), rendering at most once per content hash."""
+    text = content.to_markdown() if isinstance(content, Meeting) else content
+    key = hashlib.sha256(f"{kind}\0{title}\0{text}".encode("utf-8")).hexdigest()
+    with _export_lock:
+        if key in _export_cache:
+            _export_cache.move_to_end(key)
+            return _export_cache[key]
+
+    data = render(content, title)
+
+    with _export_lock:
+        _export_cache[key] = data
+        while len(_export_cache) > EXPORT_CACHE_SIZE:
+            _export_cache.popitem(last=False)
+    return data
+
+def _iter_blocks(text):
+    """Splits markdown into ("table", header, rows), ("heading", level, text), ("bullet", text) and ("text", text) blocks."""
+    if isinstance(text, Meeting):
+        # A parsed MoM already has its table as items, only the text around it is markdown
+        yield from _iter_blocks(text.header_markdown())
+        yield "table", list(MOM_TEMPLATE_COLUMNS), [item.to_row() for item in text.items]
+        yield from _iter_blocks(text.footer)
+        return
+    lines = text.strip().split("\n")
+    tables = {start: (end, header, rows) for start, end, header, rows in iter_table_spans(lines)}
+    i = 0
+    while i < len(lines):
+        if i in tables:
+            end, header, rows = tables[i]
+            yield "table", header, rows
+            i = end
+            continue
+
+        line = lines[i].strip()
+        i += 1
+        if not line or re.match(r"^-{3,}$", line):
+            continue
+        heading = re.match(r"^(#{1,6})\s+(.*)", line)
+        if heading:
+            yield "heading", len(heading.group(1)), heading.group(2)
+        elif re.match(r"^[-*]\s+", line):
+            yield "bullet", re.sub(r"^[-*]\s+", "", line)
+        else:
+            yield "text", line
+
+def _plain(text):
+    """Strips inline markdown emphasis."""
+    return re.sub(r"\*\*(.+?)\*\*|__(.+?)__", lambda m: m.group(1) or m.group(2), text)
+
+def _latin1(text):
+    # The core PDF fonts only cover latin-1, anything else (emoji, CJK) is dropped
+    return _plain(text).replace("–", "-").replace("—", "-").replace("’", "'") \
+        .encode("latin-1", "ignore").decode("latin-1").strip()
+
+def _pdf_bytes(pdf):
+    # PyFPDF returns a latin-1 str, fpdf2 returns a bytearray
+    data = pdf.output(dest="S")
+    return data.encode("latin-1") if isinstance(data, str) else bytes(data)
+
+def _wrapped_lines(pdf, text, width):
+    """Number of lines multi_cell will need for text in a cell of the given width."""
+    lines, current = 1, 0.0
+    space = pdf.get_string_width(" ")
+    for word in text.split():
+        word_width = pdf.get_string_width(word)
+        if current and current + space + word_width > width:
+            lines += 1
+            current = word_width
+        else:
+            current += (space if current else 0) + word_width
+        lines += int(word_width // width) if word_width > width else 0
+    return lines
+
+def _pdf_table(pdf, header, rows):
+    line_height = 5
+    usable = pdf.w - pdf.l_margin - pdf.r_margin
+    # Column widths follow content length, clamped so no column gets squeezed out
+    weights = [min(max(len(name), *(len(row[i]) for row in rows or [[""] * len(header)]), 6), 60)
+               for i, name in enumerate(header)]
+    widths = [usable * weight / sum(weights) for weight in weights]
+
+    for is_header, cells in [(True, header)] + [(False, row) for row in rows]:
+        pdf.set_font("Arial", style="B" if is_header else "", size=9)
+        cells = [_latin1(cell) for cell in cells]
+        height = line_height * max(_wrapped_lines(pdf, cell, width - 2) for cell, width in zip(cells, widths))
+        if pdf.get_y() + height > pdf.page_break_trigger:
+            pdf.add_page()
+
+        x, y = pdf.l_margin, pdf.get_y()
+        for cell, width in zip(cells, widths):
+            pdf.rect(x, y, width, height)
+            pdf.set_xy(x, y)
+            pdf.multi_cell(width, line_height, txt=cell)
+            x += width
+        pdf.set_xy(pdf.l_margin, y + height)
+    pdf.ln(4)
+
+@timed("export_pdf")
+def render_pdf(text, title="Meeting Minutes"):
+    """Renders markdown text (or a parsed Meeting) to PDF bytes in memory, with tables drawn as real tables."""
+    from fpdf import FPDF  # Imported on first export to keep app startup fast
 
-def export_to_pdf(mom_text, filename="Meeting_Minutes.pdf"):
-    """Export MoM text to a structured PDF file."""
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
     pdf.set_font("Arial", style='B', size=14)
-    pdf.cell(200, 10, txt="Meeting Minutes", ln=True, align="C")
-    
-    pdf.set_font("Arial", size=12)
-    pdf.ln(10)  # Line break
+    pdf.cell(0, 10, txt=_latin1(title), ln=True, align="C")
+    pdf.ln(4)
 
-    for line in mom_text.strip().split("\n"):
-        pdf.multi_cell(0, 10, txt=line.strip())
+    for block in _iter_blocks(text):
+        if block[0] == "table":
+            _pdf_table(pdf, block[1], block[2])
+        elif block[0] == "heading":
+            pdf.set_font("Arial", style='B', size=max(10, 15 - block[1]))
+            pdf.multi_cell(0, 8, txt=_latin1(block[2]))
+        elif block[0] == "bullet":
+            pdf.set_font("Arial", size=11)
+            pdf.multi_cell(0, 6, txt=_latin1(f"- {block[1]}"))
+        else:
+            pdf.set_font("Arial", size=11)
+            pdf.multi_cell(0, 6, txt=_latin1(block[1]))
+    return _pdf_bytes(pdf)
 
-    os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
-    file_path = os.path.join(DOWNLOAD_FOLDER, filename)
-    pdf.output(file_path)
-    return file_path
+def _docx_runs(paragraph, text):
+    """Adds text to a paragraph, turning **bold** spans into bold runs."""
+    for index, part in enumerate(re.split(r"\*\*(.+?)\*\*", text)):
+        if part:
+            paragraph.add_run(part).bold = index % 2 == 1
 
+@timed("export_docx")
+def render_docx(text, title="Meeting Minutes"):
+    """Renders markdown text (or a parsed Meeting) to DOCX bytes in memory, with tables as native Word tables."""
+    from docx import Document  # Imported on first export to keep app startup fast
 
-def export_to_docx(mom_text, filename="Meeting_Minutes.docx"):
-    """Export MoM text to a structured DOCX file."""
     doc = Document()
-    doc.add_heading("Meeting Minutes", level=1)
+    doc.add_heading(title, level=1)
+
+    for block in _iter_blocks(text):
+        if block[0] == "table":
+            header, rows = block[1], block[2]
+            table = doc.add_table(rows=1, cols=len(header))
+            table.style = "Table Grid"
+            for cell, name in zip(table.rows[0].cells, header):
+                cell.text = ""
+                cell.paragraphs[0].add_run(_plain(name)).bold = True
+            for row in rows:
+                for cell, value in zip(table.add_row().cells, row):
+                    cell.text = ""
+                    _docx_runs(cell.paragraphs[0], value)
+            doc.add_paragraph()
+        elif block[0] == "heading":
+            doc.add_heading(_plain(block[2]), level=min(block[1] + 1, 9))
+        elif block[0] == "bullet":
+            _docx_runs(doc.add_paragraph(style="List Bullet"), block[1])
+        else:
+            _docx_runs(doc.add_paragraph(), block[1])
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def get_pdf_bytes(text, title="Meeting Minutes"):
+    """PDF bytes for text, served from the content-hash cache when already rendered."""
+    return _cached_export("pdf", text, title, render_pdf)
+
+def get_docx_bytes(text, title="Meeting Minutes"):
+    """DOCX bytes for text, served from the content-hash cache when already rendered."""
+    return _cached_export("docx", text, title, render_docx)
 
-    for line in mom_text.strip().split("\n"):
-        doc.add_paragraph(line.strip())
 
-    os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
-    file_path = os.path.join(DOWNLOAD_FOLDER, filename)
-    doc.save(file_path)
+def export_to_pdf(mom_text, filename="Meeting_Minutes.pdf", folder=DOWNLOAD_FOLDER, title="Meeting Minutes"):
+    """Export MoM text to a structured PDF file."""
+    os.makedirs(folder, exist_ok=True)
+    file_path = os.path.join(folder, filename)
+    with open(file_path, "wb") as f:
+        f.write(get_pdf_bytes(mom_text, title))
+    return file_path
+
+
+def export_to_docx(mom_text, filename="Meeting_Minutes.docx", folder=DOWNLOAD_FOLDER, title="Meeting Minutes"):
+    """Export MoM text to a structured DOCX file."""
+    os.makedirs(folder, exist_ok=True)
+    file_path = os.path.join(folder, filename)
+    with open(file_path, "wb") as f:
+        f.write(get_docx_bytes(mom_text, title))
     return file_path
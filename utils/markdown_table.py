@@ -0,0 +1,48 @@
+import re
+
+_SEPARATOR_RE = re.compile(r"^\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?$")
+
+def split_row(line):
+    """Splits one markdown table row into stripped cell values."""
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|"):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split("|")]
+
+def format_row(cells):
+    """Formats cell values as one markdown table row, escaping pipes and newlines."""
+    return "| " + " | ".join(str(cell).replace("|", "/").replace("\n", " ").strip() for cell in cells) + " |"
+
+def iter_table_spans(lines):
+    """Yields (start, end, header, rows) for each table; lines[start:end] is the whole table."""
+    i = 0
+    while i < len(lines) - 1:
+        line, following = lines[i].strip(), lines[i + 1].strip()
+        if line.startswith("|") and _SEPARATOR_RE.match(following):
+            start = i
+            header = split_row(line)
+            rows = []
+            i += 2
+            while i < len(lines) and lines[i].strip().startswith("|"):
+                row = split_row(lines[i])
+                # Pad or trim rows so they always line up with the header
+                rows.append((row + [""] * len(header))[:len(header)])
+                i += 1
+            yield start, i, header, rows
+        else:
+            i += 1
+
+def parse_markdown_tables(text):
+    """Returns every table in the markdown text as a (header, rows) tuple."""
+    return [(header, rows) for _, _, header, rows in iter_table_spans((text or "").splitlines())]
+
+def find_table(text, *columns):
+    """Returns the rows of the first table containing all given columns, as dicts."""
+    wanted = [column.lower() for column in columns]
+    for header, rows in parse_markdown_tables(text):
+        names = [name.lower().strip("* ") for name in header]
+        if all(column in names for column in wanted):
+            return [dict(zip(header, row)) for row in rows]
+    return []